@@ -0,0 +1,9 @@
+"""
+Замеры производительности зоопарка на синтетических данных.
+
+Запуск из корня проекта:
+    python -m benchmarks.run                              # размеры 1k, 10k, 100k
+    python -m benchmarks.run --sizes 1000 1000000         # до миллиона сущностей
+    python -m benchmarks.run --save-baseline baseline.json
+    python -m benchmarks.run --baseline baseline.json     # сравнение с базовым прогоном
+"""
@@ -0,0 +1,189 @@
+# Замеряемые операции зоопарка
+import os  # Модуль для работы с файлами замеров
+
+from zoo_models import Zoo
+from zoo_care import CareScheduler
+from zoo_simulation import SimulationEngine
+from benchmarks.synthetic import entity_specs, make_zoo
+
+# Запросы фильтра: подстрока имени и класс (None - все классы)
+FILTER_QUERIES = [("ка", None), ("мур", "Bird"), ("вер", "Mammal"), ("а", None)]
+
+
+# Исключение SkipCase - замер невозможен в этом окружении (нет Tk или дисплея)
+class SkipCase(Exception):
+    pass
+
+
+# Функция для замера поштучного добавления через Zoo.add_animal и Zoo.add_staff
+def add_animal(size, seed, workdir):
+    animals, staff = entity_specs(size, seed)
+
+    # Замеряемая операция
+    def run():
+        zoo = Zoo("Замер")
+        for animal_class, name, age in animals:
+            zoo.add_animal(animal_class(name, age))
+        for staff_class, name in staff:
+            zoo.add_staff(staff_class(name))
+    return run
+
+
+# Функция для замера пакетного добавления через Zoo.add_animals и Zoo.add_staff_bulk
+def add_bulk(size, seed, workdir):
+    animals, staff = entity_specs(size, seed)
+
+    # Замеряемая операция
+    def run():
+        zoo = Zoo("Замер")
+        zoo.add_animals(animal_class(name, age) for animal_class, name, age in animals)
+        zoo.add_staff_bulk(staff_class(name) for staff_class, name in staff)
+    return run
+
+
+# Функция для замера сохранения в pickle через Zoo.save_zoo
+def save_pickle(size, seed, workdir):
+    zoo = make_zoo(size, seed)
+    path = os.path.join(workdir, f"zoo_{size}.pkl")
+    return lambda: zoo.save_zoo(path)
+
+
+# Функция для замера загрузки из pickle через Zoo.load_zoo
+def load_pickle(size, seed, workdir):
+    path = os.path.join(workdir, f"zoo_{size}.pkl")
+    make_zoo(size, seed).save_zoo(path)
+    return lambda: Zoo.load_zoo(path)
+
+
+# Функция для замера записи двоичного снимка (формат журнала last_zoo.pkl)
+def save_snapshot(size, seed, workdir):
+    zoo = make_zoo(size, seed)
+    path = os.path.join(workdir, f"zoo_{size}.snap")
+    zoo.enable_journal(path)
+    return lambda: zoo.journal.compact()
+
+
+# Функция для замера загрузки двоичного снимка с первым обращением ко всем животным
+def load_snapshot(size, seed, workdir):
+    path = os.path.join(workdir, f"zoo_{size}.snap")
+    zoo = make_zoo(size, seed)
+    zoo.enable_journal(path)
+    zoo.journal.compact()
+    zoo.journal.close()
+
+    # Замеряемая операция: загрузка и построение индекса имён (как при первом поиске)
+    def run():
+        loaded = Zoo.load_zoo(path)
+        loaded.find_animal("")
+    return run
+
+
+# Функция для замера воспроизведения звуков всех животных
+def make_all_sounds(size, seed, workdir):
+    zoo = make_zoo(size, seed)
+    return zoo.make_all_sounds
+
+
+# Функция для замера поиска по подстроке имени (без интерфейса)
+def search(size, seed, workdir):
+    zoo = make_zoo(size, seed)
+    zoo.animals.search("")  # Построение поискового индекса до замера
+
+    # Замеряемая операция
+    def run():
+        for text, class_name in FILTER_QUERIES:
+            zoo.animals.search(text, class_name)
+            zoo.staff.search(text, class_name)
+    return run
+
+
+# Вспомогательная функция: скрытое окно Tk с таблицами животных и сотрудников
+def _views(zoo):
+    # Tk и окно программы импортируются только для замеров таблиц: остальные замеры работают и без Tk
+    try:
+        import tkinter as tk
+        from main import VirtualTreeview
+    except ImportError as e:
+        raise SkipCase(f"нет Tk: {e}") from e
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise SkipCase(f"нет дисплея: {e}") from e
+    root.withdraw()
+    animal_view = VirtualTreeview(root, ("name", "age", "type"),
+                                  lambda entity_id: zoo.animals.get(entity_id).name)
+    staff_view = VirtualTreeview(root, ("name", "position"),
+                                 lambda entity_id: zoo.staff.get(entity_id).name)
+    animal_view.frame.pack(fill='both', expand=True)
+    staff_view.frame.pack(fill='both', expand=True)
+    return root, animal_view, staff_view
+
+
+# Функция для замера обновления таблиц окна просмотра (refresh_data)
+def refresh_data(size, seed, workdir):
+    zoo = make_zoo(size, seed)
+    root, animal_view, staff_view = _views(zoo)
+
+    # Замеряемая операция
+    def run():
+        animal_view.set_rows(zoo.animals.ids())
+        staff_view.set_rows(zoo.staff.ids())
+        root.update_idletasks()
+    run.close = root.destroy  # Окно закрывается после замера
+    return run
+
+
+# Функция для замера фильтрации в окне просмотра (apply_filter)
+def apply_filter(size, seed, workdir):
+    zoo = make_zoo(size, seed)
+    root, animal_view, staff_view = _views(zoo)
+
+    # Замеряемая операция
+    def run():
+        for text, class_name in FILTER_QUERIES:
+            animal_view.set_rows(zoo.animals.search(text, class_name))
+            staff_view.set_rows(zoo.staff.search(text, class_name))
+            root.update_idletasks()
+    run.close = root.destroy  # Окно закрывается после замера
+    return run
+
+
+# Функция для замера планирования и распределения дня ухода (кормления и осмотры)
+def care_day(size, seed, workdir):
+    zoo = make_zoo(size, seed)
+
+    # Замеряемая операция
+    def run():
+        scheduler = CareScheduler(zoo)
+        scheduler.plan_day()
+        scheduler.run()
+    return run
+
+
+# Функция для замера моделирования недели на пуле процессов (по числу ядер)
+def simulate_week(size, seed, workdir):
+    zoo = make_zoo(size, seed)
+    engine = SimulationEngine(zoo)
+
+    # Замеряемая операция (пул процессов создаётся при первом прогоне)
+    def run():
+        engine.run(7, seed)
+    run.close = engine.close
+    return run
+
+
+# Замеряемые операции по имени (порядок вывода)
+CASES = {
+    "add_animal": add_animal,
+    "add_bulk": add_bulk,
+    "save_pickle": save_pickle,
+    "load_pickle": load_pickle,
+    "save_snapshot": save_snapshot,
+    "load_snapshot": load_snapshot,
+    "make_all_sounds": make_all_sounds,
+    "search": search,
+    "refresh_data": refresh_data,
+    "apply_filter": apply_filter,
+    "care_day": care_day,
+    "simulate_week": simulate_week,
+}
@@ -0,0 +1,118 @@
+# Запуск замеров и сравнение с базовым прогоном
+import argparse  # Модуль для разбора аргументов командной строки
+import gc  # Модуль для сборки мусора между замерами
+import json  # Модуль для файлов результатов
+import os  # Модуль для работы с файлами
+import platform  # Модуль для описания машины в результатах
+import sys  # Модуль для кода завершения
+import tempfile  # Модуль для временного каталога замеров
+import time  # Модуль для измерения времени
+import tracemalloc  # Модуль для измерения пиковой памяти
+
+from zoo_logging import configure_logging
+from benchmarks.cases import CASES, SkipCase
+
+# Размеры зоопарков по умолчанию
+DEFAULT_SIZES = [1000, 10000, 100000]
+# Допустимое замедление относительно базового прогона (0.25 - на 25%)
+DEFAULT_TOLERANCE = 0.25
+
+
+# Функция для замера одной операции (возвращает лучшее время и пиковую память)
+def measure(case, size, seed, repeat, workdir):
+    run = case(size, seed, workdir)
+    try:
+        # Время: лучший из нескольких прогонов без трассировки памяти
+        best = None
+        for _ in range(repeat):
+            gc.collect()
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        # Пиковая память: отдельный прогон, так как трассировка замедляет код
+        gc.collect()
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        close = getattr(run, "close", None)
+        if close is not None:
+            close()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+# Функция для сравнения результатов с базовым прогоном (возвращает список строк с регрессиями)
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        ratio = result["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        memory_ratio = result["peak_bytes"] / base["peak_bytes"] if base["peak_bytes"] else 1.0
+        result["time_ratio"] = ratio
+        result["memory_ratio"] = memory_ratio
+        if ratio > 1 + tolerance or memory_ratio > 1 + tolerance:
+            regressions.append(key)
+    return regressions
+
+
+# Функция для вывода таблицы результатов
+def print_table(results, regressions):
+    print(f"{'операция@размер':<28}{'время, с':>12}{'пик, МБ':>10}{'время/база':>12}{'память/база':>13}")
+    for key, result in results.items():
+        time_ratio = f"{result['time_ratio']:.2f}x" if "time_ratio" in result else "-"
+        memory_ratio = f"{result['memory_ratio']:.2f}x" if "memory_ratio" in result else "-"
+        mark = "  РЕГРЕССИЯ" if key in regressions else ""
+        print(f"{key:<28}{result['seconds']:>12.4f}{result['peak_bytes'] / 1e6:>10.1f}"
+              f"{time_ratio:>12}{memory_ratio:>13}{mark}")
+
+
+# Главная функция
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности зоопарка")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Размеры зоопарков")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES), help="Операции")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно генератора данных")
+    parser.add_argument("--repeat", type=int, default=3, help="Прогонов на замер (берётся лучший)")
+    parser.add_argument("--baseline", help="Файл базового прогона для сравнения")
+    parser.add_argument("--save-baseline", help="Сохранить результаты как базовый прогон")
+    parser.add_argument("--output", help="Сохранить результаты в JSON")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Допустимое замедление относительно базы (доля)")
+    parser.add_argument("--log-file", default=os.devnull, help="Файл лога зоопарка во время замеров")
+    args = parser.parse_args(argv)
+
+    # Лог зоопарка не должен попадать в zoo_log.txt и в консоль
+    configure_logging(args.log_file, echo=False)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="zoo_bench_") as workdir:
+        for name in args.cases:
+            for size in args.sizes:
+                key = f"{name}@{size}"
+                try:
+                    results[key] = measure(CASES[name], size, args.seed, args.repeat, workdir)
+                except SkipCase as e:  # Нет Tk или дисплея - замеры интерфейса пропускаются
+                    print(f"{key}: пропущено ({e})", file=sys.stderr)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file)["results"], args.tolerance)
+    print_table(results, regressions)
+
+    document = {"meta": {"python": sys.version.split()[0], "platform": platform.platform(),
+                         "seed": args.seed, "repeat": args.repeat},
+                "results": results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(document, file, ensure_ascii=False, indent=2)
+    # Ненулевой код завершения при регрессии (для автоматических проверок)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+# Генератор синтетических зоопарков для замеров производительности
+import random  # Модуль для воспроизводимых случайных данных
+
+from zoo_models import Zoo, Bird, Mammal, Reptile, ZooKeeper, Veterinarian
+
+# Слоги для составления имён (одинаковые имена встречаются, как в настоящем зоопарке)
+SYLLABLES = ["ка", "ша", "ми", "ро", "ту", "ле", "бо", "ни", "за", "вер", "гор", "лин", "мур", "пе", "ся"]
+# Виды животных и должности сотрудников
+ANIMAL_CLASSES = (Bird, Mammal, Reptile)
+STAFF_CLASSES = (ZooKeeper, Veterinarian)
+# Доля сотрудников среди всех сущностей
+STAFF_RATIO = 0.01
+
+
+# Функция для получения случайного имени
+def make_name(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+# Функция для получения описаний сущностей без создания объектов
+def entity_specs(size, seed=0, staff_ratio=STAFF_RATIO):
+    """
+    Возвращает (животные, сотрудники): списки кортежей (класс, имя, возраст)
+    и (класс, имя). Всего size сущностей; одинаковый seed даёт одинаковые данные.
+    """
+    rng = random.Random(seed)
+    staff_count = int(size * staff_ratio)
+    animals = [(rng.choice(ANIMAL_CLASSES), make_name(rng), round(rng.uniform(1, 240), 1))
+               for _ in range(size - staff_count)]
+    staff = [(rng.choice(STAFF_CLASSES), make_name(rng)) for _ in range(staff_count)]
+    return animals, staff
+
+
+# Функция для создания зоопарка заданного размера
+def make_zoo(size, seed=0, staff_ratio=STAFF_RATIO):
+    animals, staff = entity_specs(size, seed, staff_ratio)
+    zoo = Zoo(f"Синтетический зоопарк {size}")
+    # Пакетное добавление - быстрый способ заполнить большой зоопарк
+    zoo.add_animals(animal_class(name, age) for animal_class, name, age in animals)
+    zoo.add_staff_bulk(staff_class(name) for staff_class, name in staff)
+    return zoo
@@ -1,225 +1,479 @@
-# Импорт необходимых модулей
-import tkinter as tk  # Основной модуль для создания графического интерфейса
-from tkinter import messagebox  # Модуль для отображения диалоговых окон
-from tkinter import simpledialog  # Модуль для простых диалогов ввода
-from tkinter import filedialog  # Модуль для диалогов работы с файлами
-from tkinter import ttk  # Модуль для расширенных виджетов Tkinter
+# Отметка времени запуска (до импорта остальных модулей) для отчёта о запуске
+import time  # Модуль для измерения времени запуска
+
+STARTUP_STARTED = time.perf_counter()
+
+# Импорт необходимых модулей (tkinter импортируется при создании окна, см. run_gui)
 import logging  # Модуль для логирования событий
 import os  # Модуль для работы с операционной системой
-import pickle  # Модуль для сериализации объектов
-
-# Попытка импорта библиотеки pygame для работы со звуками
-try:
-    import pygame  # Импорт библиотеки pygame
-
-    pygame.mixer.init()  # Инициализация звукового модуля pygame
-    pygame_available = True  # Установка флага доступности pygame
-except ImportError:  # Обработка ошибки, если pygame не установлен
-    pygame = None  # Установка значения None для pygame
-    pygame_available = False  # Установка флага недоступности pygame
-    print("Pygame не установлен, звуки отключены")  # Вывод сообщения об ошибке в консоль
-
-# Настройка системы логирования
-logging.basicConfig(
-    filename="zoo_log.txt",  # Имя файла для сохранения логов
-    level=logging.INFO,  # Уровень логирования (запись информационных сообщений)
-    format="%(asctime)s — %(levelname)s — %(message)s"  # Формат записей в логе
-)
+import threading  # Модуль для фонового сохранения и загрузки
+import queue  # Модуль для передачи прогресса из рабочего потока в поток Tk
+
+# Модель зоопарка, лог и звук импортируются без побочных эффектов
+from zoo_logging import configure_logging, log_index, LOG_MAX_BYTES  # Настройка лога и индекс лога
+from zoo_audio import sound_bank  # Кэш звуков (pygame инициализируется при первом звуке)
+from zoo_models import Zoo, Bird, Mammal, Reptile, ZooKeeper, Veterinarian, ZooImporter, ZooHistory, ZooAutosave
+from zoo_perf import perf_monitor  # Необязательные замеры времени (включаются в окне производительности)
 
 # Пароль администратора по умолчанию
 admin_password = "admin123"
 
-
-# Класс Animal - базовый класс для всех животных в зоопарке
-class Animal:
-    # Конструктор класса Animal
-    def __init__(self, name, age):
-        self.name = name  # Имя животного
-        self.age = age  # Возраст животного
-
-    # Метод для издания звука (должен быть переопределен в дочерних классах)
-    def make_sound(self):
-        pass  # Заглушка, реализация будет в наследниках
-
-    # Метод, описывающий процесс питания животного
-    def eat(self):
-        logging.info(f"{self.name} ест.")  # Запись действия в лог
-        print(f"{self.name} ест.")  # Вывод действия в консоль
-
-    # Метод для строкового представления объекта
-    def __str__(self):
-        # Возвращает строку с информацией о животном
-        return f"{self.__class__.__name__} - {self.name}, возраст {self.age} лет"
-
-
-# Класс Bird (Птица) - наследуется от класса Animal
-class Bird(Animal):
-    # Реализация метода издания звука для птицы
-    def make_sound(self):
-        logging.info(f"{self.name} чирикает.")  # Запись действия в лог
-        print(f"{self.name} чирикает.")  # Вывод действия в консоль
-        # Проверка доступности библиотеки pygame
-        if pygame_available:
-            try:
-                # Загрузка звукового файла для птицы
-                pygame.mixer.music.load("bird_sound.mp3")
-                # Воспроизведение звука
-                pygame.mixer.music.play()
-            except Exception as e:  # Обработка возможных ошибок
-                # Вывод сообщения об ошибке в консоль
-                print(f"Ошибка воспроизведения звука птицы: {e}")
-
-
-# Класс Mammal (Млекопитающее) - наследуется от класса Animal
-class Mammal(Animal):
-    # Реализация метода издания звука для млекопитающего
-    def make_sound(self):
-        logging.info(f"{self.name} рычит.")  # Запись действия в лог
-        print(f"{self.name} рычит.")  # Вывод действия в консоль
-        # Проверка доступности библиотеки pygame
-        if pygame_available:
-            try:
-                # Загрузка звукового файла для млекопитающего
-                pygame.mixer.music.load("mammal_sound.mp3")
-                # Воспроизведение звука
-                pygame.mixer.music.play()
-            except Exception as e:  # Обработка возможных ошибок
-                # Вывод сообщения об ошибке в консоль
-                print(f"Ошибка воспроизведения звука млекопитающего: {e}")
-
-
-# Класс Reptile (Рептилия) - наследуется от класса Animal
-class Reptile(Animal):
-    # Реализация метода издания звука для рептилии
-    def make_sound(self):
-        logging.info(f"{self.name} шипит.")  # Запись действия в лог
-        print(f"{self.name} шипит.")  # Вывод действия в консоль
-        # Проверка доступности библиотеки pygame
-        if pygame_available:
+# Режимы отображения больших списков в окне просмотра
+LIST_MODE_VIRTUAL = "virtual"  # Создаются только строки, видимые в области прокрутки
+LIST_MODE_BACKGROUND = "background"  # Все строки вставляются порциями через after()
+# Пауза в наборе текста фильтра, после которой фильтр применяется, в миллисекундах
+FILTER_DEBOUNCE_MS = 200
+# Тип файла базы SQLite в диалогах открытия и сохранения
+ZOO_DATABASE_FILETYPE = ("База SQLite | SQLite database", "*.db *.sqlite *.sqlite3")
+# Период обновления окна производительности, в миллисекундах
+PERF_REFRESH_MS = 1000
+# Наибольшее количество записей в окне журнала событий
+LOG_VIEW_LIMIT = 100000
+# Автосохранение: пауза после последнего изменения в секундах, порог изменённых сущностей
+# и период проверки в миллисекундах
+AUTOSAVE_INTERVAL = 5.0
+AUTOSAVE_THRESHOLD = 1000
+AUTOSAVE_POLL_MS = 500
+
+
+# Класс VirtualTreeview - таблица Treeview для списков любого размера
+class VirtualTreeview:
+    """
+    Обёртка над ttk.Treeview с собственной полосой прокрутки.
+    В виртуальном режиме в таблице существуют только строки рядом с областью
+    прокрутки, а остальные строятся при прокрутке. В режиме фонового заполнения
+    строки вставляются порциями через after(), не блокируя окно.
+    ID строки таблицы (iid) совпадает с ID сущности зоопарка.
+    """
+
+    # Высота строки по умолчанию (до первой отрисовки), в пикселях
+    DEFAULT_ROW_HEIGHT = 20
+    # Количество строк, которое отрисовывается до того, как станет известна высота окна
+    INITIAL_ROWS = 40
+    # Количество строк за одну прокрутку колесом мыши
+    WHEEL_STEP = 3
+
+    # Конструктор класса VirtualTreeview
+    def __init__(self, parent, columns, row_values, mode=LIST_MODE_VIRTUAL, chunk_size=500):
+        self._row_values = row_values  # Функция: ID сущности -> значения столбцов
+        self._mode = mode  # Текущий режим отображения
+        self._chunk_size = chunk_size  # Размер порции для фонового заполнения
+        self._ids = []  # ID всех строк текущего результата (в порядке отображения, None - удалённая строка)
+        self._positions = {}  # ID строки -> её позиция в self._ids
+        self._removed = 0  # Количество удалённых строк (None), ещё не убранных из self._ids
+        self._offset = 0  # Позиция в self._ids первой видимой строки (виртуальный режим)
+        self._fill_pos = 0  # Позиция в self._ids, до которой строки уже вставлены (фоновый режим)
+        self._fill_job = None  # Отложенное задание after() фонового заполнения
+        self._selected = None  # Запомненная выбранная строка (может быть вне экрана)
+        self._row_height = self.DEFAULT_ROW_HEIGHT  # Измеренная высота строки
+        self._header_height = self.DEFAULT_ROW_HEIGHT  # Измеренная высота заголовков
+        self._rendered_rows = 0  # Количество строк в последней отрисовке окна
+
+        from tkinter import ttk  # Модуль уже загружен окном-родителем
+
+        # Фрейм, объединяющий таблицу и полосу прокрутки
+        self.frame = ttk.Frame(parent)
+        # Таблица с одиночным выбором строки
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings", selectmode="browse")
+        # Полоса прокрутки, управляемая вручную в виртуальном режиме
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
+
+        # Прокрутка колесом мыши (Windows/macOS и Linux)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", self._on_mousewheel)
+        self.tree.bind("<Button-5>", self._on_mousewheel)
+        # Перемещение выбора клавишами за пределы отрисованного окна
+        for key in ("<Up>", "<Down>", "<Prior>", "<Next>"):
+            self.tree.bind(key, self._on_key)
+        # Перерисовка при изменении размера таблицы
+        self.tree.bind("<Configure>", self._on_configure)
+        # Отмена фонового заполнения при закрытии окна
+        self.tree.bind("<Destroy>", lambda event: self._cancel_fill())
+
+        self._apply_mode()  # Привязка полосы прокрутки к режиму
+
+    # Метод для смены режима отображения
+    def set_mode(self, mode):
+        if mode == self._mode:
+            return
+        self._sync_selection()  # Сохранение выбора перед перестроением
+        self._mode = mode
+        self._apply_mode()
+        self._rebuild()  # Перестроение таблицы в новом режиме
+
+    # Метод для замены всех строк таблицы списком ID
+    def set_rows(self, ids):
+        self._sync_selection()  # Сохранение выбора перед перестроением
+        self._ids = list(ids)
+        self._positions = {entity_id: index for index, entity_id in enumerate(self._ids)}
+        self._removed = 0
+        self._offset = 0
+        # Сброс выбора, если выбранная строка не вошла в новый результат
+        if self._selected is not None and int(self._selected) not in self._positions:
+            self._selected = None
+        self._rebuild()
+
+    # Метод для удаления одной строки по её iid
+    def remove_row(self, iid):
+        index = self._positions.pop(int(iid), None)  # Позиция строки в результате
+        if index is None:
+            return
+        # Строка помечается удалённой без сдвига остальных строк списка
+        self._ids[index] = None
+        self._removed += 1
+        # Удалённые строки убираются из списка, когда их становится больше половины
+        if self._removed * 2 > len(self._ids):
+            self._compact()
+        if self._selected == iid:
+            self._selected = None  # Удалённая строка больше не выбрана
+        if self._mode == LIST_MODE_VIRTUAL:
+            self._render_window()
+        elif self.tree.exists(iid):
+            # Удаление строки из таблицы, если она уже была вставлена
+            self.tree.delete(iid)
+
+    # Метод для обновления значений одной строки по её iid
+    def update_row(self, iid):
+        # Обновляется только уже отрисованная строка, остальные построятся при прокрутке
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=self._row_values(int(iid)))
+
+    # Метод для получения значений строки (в том числе вне экрана)
+    def values(self, iid):
+        return self._row_values(int(iid))
+
+    # Метод для получения выбранных строк (аналог Treeview.selection)
+    def selection(self):
+        self._sync_selection()
+        return (self._selected,) if self._selected is not None else ()
+
+    # Метод для получения ID строк текущего результата
+    def row_ids(self):
+        # Порядок словаря позиций совпадает с порядком строк
+        return list(self._positions)
+
+    # Количество строк в текущем результате
+    def __len__(self):
+        return len(self._positions)
+
+    # Вспомогательный метод: удаление помеченных строк из списка
+    def _compact(self):
+        ids = self._ids
+        # Смещение окна и позиция заполнения уменьшаются на число удалённых строк перед ними
+        self._offset -= ids[:self._offset].count(None)
+        self._fill_pos -= ids[:self._fill_pos].count(None)
+        self._ids = list(self._positions)
+        self._positions = {entity_id: index for index, entity_id in enumerate(self._ids)}
+        self._removed = 0
+
+    # Вспомогательный метод: привязка полосы прокрутки к режиму
+    def _apply_mode(self):
+        if self._mode == LIST_MODE_VIRTUAL:
+            # Положение ползунка вычисляется по окну строк, а не по таблице
+            self.tree.configure(yscrollcommand="")
+        else:
+            # Обычная прокрутка встроенными средствами Treeview
+            self.tree.configure(yscrollcommand=self.scrollbar.set)
+
+    # Вспомогательный метод: запоминание выбранной пользователем строки
+    def _sync_selection(self):
+        selection = self.tree.selection()
+        if selection:
+            self._selected = selection[0]
+
+    # Вспомогательный метод: полное перестроение таблицы в текущем режиме
+    def _rebuild(self):
+        self._cancel_fill()
+        if self._mode == LIST_MODE_VIRTUAL:
+            self._render_window()
+        else:
+            self._start_fill()
+
+    # Вспомогательный метод: количество строк, помещающихся в таблицу
+    def _visible_rows(self):
+        children = self.tree.get_children()
+        # Измерение высоты строки и заголовков по первой отрисованной строке
+        if children:
+            bbox = self.tree.bbox(children[0])
+            if bbox:
+                self._header_height = bbox[1]
+                self._row_height = max(1, bbox[3])
+        height = self.tree.winfo_height()
+        # Окно ещё не показано - отрисовывается начальное количество строк
+        if height <= 1:
+            return self.INITIAL_ROWS
+        return max(1, (height - self._header_height) // self._row_height)
+
+    # Вспомогательный метод: отрисовка окна видимых строк (виртуальный режим)
+    def _render_window(self):
+        tree = self.tree
+        self._sync_selection()
+        visible = self._visible_rows()
+        # Ограничение смещения границами результата
+        self._offset = max(0, min(self._offset, len(self._ids) - visible))
+        # Сбор строк окна с пропуском удалённых
+        ids = self._ids
+        window = []
+        position = self._offset
+        while position < len(ids) and len(window) < visible:
+            if ids[position] is not None:
+                window.append(ids[position])
+            position += 1
+        # Добор строк выше окна, если в конце результата не хватило строк
+        above = []
+        while self._offset > 0 and len(window) + len(above) < visible:
+            self._offset -= 1
+            if ids[self._offset] is not None:
+                above.append(ids[self._offset])
+        window[:0] = reversed(above)
+        # Замена отрисованных строк строками нового окна
+        tree.delete(*tree.get_children())
+        row_values = self._row_values  # Локальная ссылка для ускорения цикла
+        for entity_id in window:
+            tree.insert("", "end", iid=str(entity_id), values=row_values(entity_id))
+        self._rendered_rows = visible
+        # Восстановление выбора, если выбранная строка попала в окно
+        if self._selected is not None and tree.exists(self._selected):
+            tree.selection_set(self._selected)
+        self._update_scrollbar(visible)
+
+    # Вспомогательный метод: установка ползунка по положению окна строк
+    def _update_scrollbar(self, visible):
+        total = len(self._ids)
+        if total <= visible:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._offset / total, (self._offset + visible) / total)
+
+    # Вспомогательный метод: прокрутка окна к указанной строке
+    def _scroll_to(self, offset):
+        offset = max(0, min(offset, len(self._ids) - self._rendered_rows))
+        if offset != self._offset:
+            self._offset = offset
+            self._render_window()
+
+    # Обработчик команд полосы прокрутки
+    def _on_scrollbar(self, *args):
+        # В режиме фонового заполнения прокручивается сама таблица
+        if self._mode != LIST_MODE_VIRTUAL:
+            self.tree.yview(*args)
+            return
+        if args[0] == "moveto":
+            # Перетаскивание ползунка: доля от общего количества строк
+            self._scroll_to(int(float(args[1]) * len(self._ids)))
+        elif args[0] == "scroll":
+            # Стрелки полосы прокрутки (units) или щелчок по полосе (pages)
+            step = self._rendered_rows if args[2] == "pages" else 1
+            self._scroll_to(self._offset + int(args[1]) * step)
+
+    # Обработчик прокрутки колесом мыши
+    def _on_mousewheel(self, event):
+        if self._mode != LIST_MODE_VIRTUAL:
+            return None  # Встроенная прокрутка Treeview
+        # Направление прокрутки: вверх для Button-4 и положительного delta
+        direction = -1 if event.num == 4 or event.delta > 0 else 1
+        self._scroll_to(self._offset + direction * self.WHEEL_STEP)
+        return "break"
+
+    # Обработчик клавиш перемещения выбора
+    def _on_key(self, event):
+        if self._mode != LIST_MODE_VIRTUAL:
+            return None  # Встроенная навигация Treeview
+        children = self.tree.get_children()
+        focus = self.tree.focus()
+        # Сдвиг окна на одну строку или на страницу
+        if event.keysym == "Up" and children and focus == children[0]:
+            step = -1
+        elif event.keysym == "Down" and children and focus == children[-1]:
+            step = 1
+        elif event.keysym == "Prior":
+            step = -self._rendered_rows
+        elif event.keysym == "Next":
+            step = self._rendered_rows
+        else:
+            return None  # Перемещение внутри окна выполняет Treeview
+        self._scroll_to(self._offset + step)
+        children = self.tree.get_children()
+        if children:
+            # Выбор крайней строки в направлении движения
+            target = children[0] if step < 0 else children[-1]
+            self.tree.selection_set(target)
+            self.tree.focus(target)
+            self._selected = target
+        return "break"
+
+    # Обработчик изменения размера таблицы
+    def _on_configure(self, event):
+        # Перерисовка, только если изменилось количество помещающихся строк
+        if self._mode == LIST_MODE_VIRTUAL and self._visible_rows() != self._rendered_rows:
+            self._render_window()
+
+    # Вспомогательный метод: запуск фонового заполнения таблицы
+    def _start_fill(self):
+        tree = self.tree
+        tree.delete(*tree.get_children())
+        self._fill_pos = 0
+        self._fill_step()
+
+    # Вспомогательный метод: вставка очередной порции строк
+    def _fill_step(self):
+        self._fill_job = None
+        if not self.tree.winfo_exists():
+            return  # Окно уже закрыто
+        tree = self.tree
+        row_values = self._row_values  # Локальная ссылка для ускорения цикла
+        end = min(len(self._ids), self._fill_pos + self._chunk_size)
+        for entity_id in self._ids[self._fill_pos:end]:
+            if entity_id is None:
+                continue  # Строка удалена до вставки
+            iid = str(entity_id)
+            tree.insert("", "end", iid=iid, values=row_values(entity_id))
+            # Восстановление выбора, как только выбранная строка вставлена
+            if iid == self._selected:
+                tree.selection_set(iid)
+        self._fill_pos = end
+        # Планирование следующей порции, пока не вставлены все строки
+        if end < len(self._ids):
+            self._fill_job = tree.after(1, self._fill_step)
+
+    # Вспомогательный метод: отмена незавершённого фонового заполнения
+    def _cancel_fill(self):
+        if self._fill_job is not None:
+            from tkinter import TclError  # Модуль уже загружен окном
             try:
-                # Загрузка звукового файла для рептилии
-                pygame.mixer.music.load("reptile_sound.mp3")
-                # Воспроизведение звука
-                pygame.mixer.music.play()
-            except Exception as e:  # Обработка возможных ошибок
-                # Вывод сообщения об ошибке в консоль
-                print(f"Ошибка воспроизведения звука рептилии: {e}")
-
-
-# Класс Zoo для управления зоопарком
-class Zoo:
-    # Конструктор класса Zoo
-    def __init__(self, name):
-        self.name = name  # Название зоопарка
-        self.animals = []  # Список животных в зоопарке
-        self.staff = []  # Список сотрудников зоопарка
-
-    # Метод для добавления животного в зоопарк
-    def add_animal(self, animal):
-        self.animals.append(animal)  # Добавление животного в список
-        # Запись информации о добавлении животного в лог
-        logging.info(f"Животное {animal.name} добавлено в зоопарк.")
-
-    # Метод для добавления сотрудника в зоопарк
-    def add_staff(self, staff_member):
-        self.staff.append(staff_member)  # Добавление сотрудника в список
-        # Запись информации о добавлении сотрудника в лог
-        logging.info(f"Сотрудник {staff_member.name} нанят.")
-
-    # Метод для воспроизведения звуков всех животных в зоопарке
-    def make_all_sounds(self):
-        """
-        Проходит по всем животным в зоопарке и вызывает их метод make_sound().
-        Демонстрирует полиморфное поведение - разные типы животных издают разные звуки.
-        """
-        # Проверка наличия животных в зоопарке
-        if not self.animals:
-            # Запись предупреждения в лог
-            logging.warning("Попытка воспроизвести звуки, но в зоопарке нет животных")
-            return False  # Возврат статуса неудачи
-
-        # Запись в лог о начале воспроизведения звуков
-        logging.info("Начато воспроизведение звуков всех животных")
-
-        # Перебор всех животных в зоопарке
-        for animal in self.animals:
-            # Вызов метода издания звука для каждого животного
-            # Полиморфизм: для каждого типа животного будет вызван свой метод make_sound()
-            animal.make_sound()
+                self.tree.after_cancel(self._fill_job)
+            except TclError:
+                pass  # Таблица уже уничтожена
+            self._fill_job = None
+
+
+# Класс BackgroundJob - выполнение долгой операции в рабочем потоке без блокировки окна
+class BackgroundJob:
+    """
+    Выполняет work(progress) в рабочем потоке. Прогресс, результат и ошибка
+    передаются в поток Tk через очередь, которую опрашивает after(), поэтому
+    обработчики on_progress, on_done и on_error вызываются в потоке Tk.
+    """
+
+    # Период опроса очереди в миллисекундах
+    POLL_MS = 50
+
+    # Конструктор класса BackgroundJob
+    def __init__(self, widget, work, on_progress=None, on_done=None, on_error=None):
+        self._widget = widget  # Виджет для планирования опроса через after()
+        self._work = work  # Функция, выполняемая в рабочем потоке
+        self._on_progress = on_progress  # Обработчик прогресса (сделано, всего)
+        self._on_done = on_done  # Обработчик результата
+        self._on_error = on_error  # Обработчик исключения
+        self._queue = queue.Queue()  # Сообщения из рабочего потока
+        self._thread = None  # Рабочий поток
+
+    # Метод для запуска рабочего потока и опроса очереди
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="zoo-background-job")
+        self._thread.start()
+        self._widget.after(self.POLL_MS, self._poll)
+        return self
+
+    # Выполняется ли операция
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # Метод для ожидания завершения рабочего потока
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+    # Вспомогательный метод: тело рабочего потока
+    def _run(self):
+        try:
+            result = self._work(self._progress)
+        except Exception as e:  # Ошибка передаётся в поток Tk
+            self._queue.put(("error", e))
+        else:
+            self._queue.put(("done", result))
 
-        return True  # Возврат статуса успеха
+    # Вспомогательный метод: обработчик прогресса в рабочем потоке
+    def _progress(self, done, total):
+        self._queue.put(("progress", (done, total)))
 
-    # Метод для сохранения состояния зоопарка в файл
-    def save_zoo(self, filename="zoo_data.pkl"):
-        try:
-            # Открытие файла для бинарной записи
-            with open(filename, 'wb') as file:
-                # Сериализация объекта зоопарка и запись в файл
-                pickle.dump(self, file)
-            # Запись информации о сохранении в лог
-            logging.info(f"Состояние зоопарка сохранено в {filename}.")
-            return True  # Возврат успешного статуса
-        except (IOError, pickle.PicklingError) as e:  # Обработка ошибок ввода/вывода и сериализации
-            # Запись ошибки в лог
-            logging.error(f"Ошибка сохранения зоопарка: {e}")
-            return False  # Возврат статуса ошибки
-
-    # Статический метод для загрузки состояния зоопарка из файла
-    @staticmethod
-    def load_zoo(filename="zoo_data.pkl"):
+    # Вспомогательный метод: разбор сообщений рабочего потока в потоке Tk
+    def _poll(self):
+        latest = None  # Из накопившихся значений прогресса показывается последнее
+        while True:
+            try:
+                kind, value = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                latest = value
+                continue
+            handler = self._on_done if kind == "done" else self._on_error
+            if handler is not None:
+                handler(value)
+            return
+        if latest is not None and self._on_progress is not None:
+            self._on_progress(*latest)
+        from tkinter import TclError  # Модуль уже загружен окном
         try:
-            # Открытие файла для бинарного чтения
-            with open(filename, 'rb') as file:
-                # Десериализация объекта зоопарка из файла
-                zoo_obj = pickle.load(file)
-            # Запись информации о загрузке в лог
-            logging.info(f"Состояние зоопарка загружено из {filename}.")
-            return zoo_obj  # Возврат загруженного объекта
-        except FileNotFoundError:  # Обработка ошибки отсутствия файла
-            # Запись ошибки в лог
-            logging.error(f"Файл {filename} не найден.")
-            raise  # Повторное возбуждение исключения
-        except (IOError, pickle.UnpicklingError) as e:  # Обработка других ошибок
-            # Запись ошибки в лог
-            logging.error(f"Ошибка загрузки зоопарка: {e}")
-            raise  # Повторное возбуждение исключения
-
-
-# Базовый класс Staff для сотрудников зоопарка
-class Staff:
-    # Конструктор класса Staff
-    def __init__(self, name):
-        self.name = name  # Имя сотрудника
-
-
-# Класс ZooKeeper (Смотритель) - наследуется от класса Staff
-class ZooKeeper(Staff):
-    # Метод для кормления животного
-    def feed_animal(self, animal):
-        # Запись действия в лог
-        logging.info(f"{self.name} кормит {animal.name}.")
-        # Вывод действия в консоль
-        print(f"{self.name} кормит {animal.name}.")
-
-
-# Класс Veterinarian (Ветеринар) - наследуется от класса Staff
-class Veterinarian(Staff):
-    # Метод для лечения животного
-    def heal_animal(self, animal):
-        # Запись действия в лог
-        logging.info(f"{self.name} лечит {animal.name}.")
-        # Вывод действия в консоль
-        print(f"{self.name} лечит {animal.name}.")
+            self._widget.after(self.POLL_MS, self._poll)
+        except TclError:
+            pass  # Окно уже закрыто
+
+
+# Класс StartupReport - длительность этапов запуска программы
+class StartupReport:
+    """
+    Замер запуска по этапам: mark(этап) записывает время, прошедшее с конца
+    предыдущего этапа (первый этап отсчитывается от started). log() пишет
+    отчёт одной строкой в лог.
+    """
+
+    # Конструктор класса StartupReport
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started  # Начало запуска
+        self._last = self.started  # Конец предыдущего этапа
+        self.phases = []  # Пары (этап, длительность в секундах)
+
+    # Метод для отметки окончания этапа
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    # Общая длительность отмеченных этапов в секундах
+    @property
+    def total(self):
+        return self._last - self.started
+
+    # Метод для получения отчёта одной строкой
+    def report(self):
+        parts = [f"{phase} {seconds * 1000:.1f} мс" for phase, seconds in self.phases]
+        return f"Запуск: {', '.join(parts)}; всего {self.total * 1000:.1f} мс"
+
+    # Метод для записи отчёта в лог
+    def log(self):
+        logging.info(self.report())
 
 
 # Функция для запуска графического интерфейса управления зоопарком
-def run_gui(zoo):
+def run_gui(zoo, startup=None):
+    # Графическая библиотека загружается только при создании окна
+    import tkinter as tk  # Основной модуль для создания графического интерфейса
+    from tkinter import messagebox  # Модуль для отображения диалоговых окон
+    from tkinter import simpledialog  # Модуль для простых диалогов ввода
+    from tkinter import filedialog  # Модуль для диалогов работы с файлами
+    from tkinter import ttk  # Модуль для расширенных виджетов Tkinter
+
     # Создание главного окна приложения
     root_window = tk.Tk()
     # Установка заголовка окна с названием зоопарка
     root_window.title(f"Управление зоопарком: {zoo.name} | Zoo Management: {zoo.name}")
     # Установка размеров главного окна
-    root_window.geometry("500x780")  # Увеличена высота для новой кнопки
+    root_window.geometry("500x970")  # Увеличена высота для новой кнопки
 
     # Цветовая схема приложения
     colors = {
@@ -320,6 +574,12 @@ def run_gui(zoo):
             elif isinstance(widget, tk.OptionMenu):
                 # Настройка цветов меню
                 widget.configure(bg=colors['btn_color'], fg=colors['text_color'])
+            # Для фреймов с кнопками (отмена и повтор)
+            elif isinstance(widget, tk.Frame):
+                widget.configure(bg=colors['bg_color'])
+                for button in widget.winfo_children():
+                    if isinstance(button, tk.Button):
+                        button.configure(bg=colors['btn_color'], fg=colors['text_color'])
 
     # Функция для отображения сообщения об успехе
     def show_success_message(title, message):
@@ -467,10 +727,25 @@ def run_gui(zoo):
         # Проверка правильности пароля
         return password == admin_password
 
+    # История изменений для отмены и повтора
+    history = ZooHistory(zoo)
+    # Функции обновления открытых окон просмотра (после отмены и повтора)
+    view_refreshers = []
+    # Фоновое автосохранение изменений в файл журнала зоопарка (тот же, что сохраняется при выходе)
+    autosave = None
+    if zoo.journal is not None:
+        autosave = ZooAutosave(zoo, zoo.journal.snapshot_path, AUTOSAVE_INTERVAL, AUTOSAVE_THRESHOLD)
+
+    # Функция для периодической проверки автосохранения (пока идёт сохранение или загрузка - пропускается)
+    def autosave_tick():
+        if not background_jobs:
+            autosave.poll()
+        root_window.after(AUTOSAVE_POLL_MS, autosave_tick)
+
     # Функция для просмотра объектов зоопарка (животных и сотрудников)
     def view_entities():
         # Создание окна для просмотра объектов
-        view_window = create_toplevel("Объекты зоопарка | Zoo Entities", 650, 450)
+        view_window = create_toplevel("Объекты зоопарка | Zoo Entities", 650, 480)
 
         # Словарь для перевода типов объектов на два языка
         type_translations = {
@@ -510,82 +785,145 @@ def run_gui(zoo):
         # Добавление вкладки сотрудников с названием
         notebook.add(staff_frame, text="Сотрудники | Staff")
 
+        # Функция для получения значений строки животного по его ID
+        def animal_row_values(entity_id):
+            animal = zoo.animals.get(entity_id)  # Поиск животного по индексу ID
+            # Получение переведенного типа животного
+            animal_type = type_translations.get(animal.__class__.__name__, animal.__class__.__name__)
+            return animal.name, animal.age, animal_type
+
+        # Функция для получения значений строки сотрудника по его ID
+        def staff_row_values(entity_id):
+            staff_member = zoo.staff.get(entity_id)  # Поиск сотрудника по индексу ID
+            # Получение переведенного типа сотрудника
+            staff_type = type_translations.get(staff_member.__class__.__name__, staff_member.__class__.__name__)
+            return staff_member.name, staff_type
+
+        # Сортировка таблиц: (поле, по убыванию) или None - порядок добавления
+        sort_state = {"animals": None, "staff": None}
+
+        # Функция для упорядочивания строк таблицы (ids=None - все сущности)
+        def sorted_rows(kind, ids=None):
+            registry = zoo.animals if kind == "animals" else zoo.staff
+            state = sort_state[kind]
+            if state is None:
+                return registry.ids() if ids is None else ids
+            # Порядок берётся из упорядоченного индекса зоопарка, строки не пересортировываются
+            return registry.sorted_ids(state[0], state[1], ids)
+
         # Функция для обновления данных в таблицах
+        @perf_monitor.timed("refresh_data")
         def refresh_data():
-            # Очистка таблицы животных
-            animal_tree.delete(*animal_tree.get_children())
-            # Перебор всех животных в зоопарке
-            for animal in zoo.animals:
-                # Получение переведенного типа животного
-                animal_type = type_translations.get(animal.__class__.__name__, animal.__class__.__name__)
-                # Добавление животного в таблицу
-                animal_tree.insert("", "end", values=(animal.name, animal.age, animal_type))
-
-            # Очистка таблицы персонала
-            staff_tree.delete(*staff_tree.get_children())
-            # Перебор всех сотрудников в зоопарке
-            for staff_member in zoo.staff:
-                # Получение переведенного типа сотрудника
-                staff_type = type_translations.get(staff_member.__class__.__name__, staff_member.__class__.__name__)
-                # Добавление сотрудника в таблицу
-                staff_tree.insert("", "end", values=(staff_member.name, staff_type))
+            # Передача таблицам ID всех животных и сотрудников (строки строятся по мере показа)
+            animal_view.set_rows(sorted_rows("animals"))
+            staff_view.set_rows(sorted_rows("staff"))
 
         # Названия столбцов для таблицы животных
         animal_columns = ("Имя | Name", "Возраст | Age", "Тип | Type")
         # Создание таблицы для животных
-        animal_tree = ttk.Treeview(animals_frame, columns=animal_columns, show="headings")
-        # Настройка заголовков столбцов
+        animal_view = VirtualTreeview(animals_frame, animal_columns, animal_row_values)
+        # Настройка заголовков столбцов (щелчок по заголовку сортирует таблицу)
         for col in animal_columns:
-            animal_tree.heading(col, text=col)  # Установка названия столбца
-            animal_tree.column(col, width=100)  # Установка ширины столбца
+            animal_view.tree.heading(col, text=col, command=lambda c=col: sort_by("animals", c))
+            animal_view.tree.column(col, width=100)  # Установка ширины столбца
         # Размещение таблицы с заполнением пространства
-        animal_tree.pack(fill='both', expand=True)
+        animal_view.frame.pack(fill='both', expand=True)
 
         # Названия столбцов для таблицы персонала
         staff_columns = ("Имя | Name", "Должность | Position")
         # Создание таблицы для персонала
-        staff_tree = ttk.Treeview(staff_frame, columns=staff_columns, show="headings")
-        # Настройка заголовков столбцов
+        staff_view = VirtualTreeview(staff_frame, staff_columns, staff_row_values)
+        # Настройка заголовков столбцов (щелчок по заголовку сортирует таблицу)
         for col in staff_columns:
-            staff_tree.heading(col, text=col)  # Установка названия столбца
-            staff_tree.column(col, width=100)  # Установка ширины столбца
+            staff_view.tree.heading(col, text=col, command=lambda c=col: sort_by("staff", c))
+            staff_view.tree.column(col, width=100)  # Установка ширины столбца
         # Размещение таблицы с заполнением пространства
-        staff_tree.pack(fill='both', expand=True)
+        staff_view.frame.pack(fill='both', expand=True)
 
         # Первоначальное заполнение таблиц данными
         refresh_data()
 
+        # Последний результат фильтра для уточнения при наборе текста
+        last_filter = {"text": None, "class": None, "ages": None, "versions": None, "animal_ids": [], "staff_ids": []}
+        # Отложенное задание after() для фильтрации во время набора
+        filter_job = [None]
+
+        # Функция для чтения границы возраста из поля (пустое или неверное поле - без границы)
+        def read_age_bound(entry):
+            text = entry.get().strip().replace(",", ".")
+            try:
+                value = float(text) if text else None
+            except ValueError:
+                value = None
+                entry.config(fg="red")  # Неверное число выделяется, граница не применяется
+            else:
+                entry.config(fg=colors['text_color'])
+            return value
+
         # Функция для применения фильтра
+        @perf_monitor.timed("apply_filter")
         def apply_filter():
+            filter_job[0] = None  # Отложенная фильтрация выполнена
+            # Окно могло быть закрыто до срабатывания отложенной фильтрации
+            if not view_window.winfo_exists():
+                return
             # Получение текста фильтра и приведение к нижнему регистру
             filter_text = filter_entry.get().lower()
-            # Получение выбранного типа для фильтрации
+            # Получение выбранного типа для фильтрации (имя класса или None для всех)
             selected_type = filter_type_var.get()
-
-            # Очистка таблицы животных
-            animal_tree.delete(*animal_tree.get_children())
-            # Применение фильтра к животным
-            for animal in zoo.animals:
-                # Проверка соответствия типу и имени
-                if selected_type == "Все | All" or animal.__class__.__name__ == selected_type.split(" | ")[0]:
-                    if filter_text in animal.name.lower():
-                        # Получение переведенного типа
-                        animal_type = type_translations.get(animal.__class__.__name__, animal.__class__.__name__)
-                        # Добавление животного в таблицу
-                        animal_tree.insert("", "end", values=(animal.name, animal.age, animal_type))
-
-            # Очистка таблицы персонала
-            staff_tree.delete(*staff_tree.get_children())
-            # Применение фильтра к сотрудникам
-            for staff_member in zoo.staff:
-                # Проверка соответствия типу и имени
-                if selected_type == "Все | All" or staff_member.__class__.__name__ == selected_type.split(" | ")[0]:
-                    if filter_text in staff_member.name.lower():
-                        # Получение переведенного типа
-                        staff_type = type_translations.get(staff_member.__class__.__name__,
-                                                           staff_member.__class__.__name__)
-                        # Добавление сотрудника в таблицу
-                        staff_tree.insert("", "end", values=(staff_member.name, staff_type))
+            class_name = None if selected_type == "Все | All" else selected_type.split(" | ")[0]
+            # Диапазон возраста в месяцах (только животные, в порядке возраста)
+            ages = (read_age_bound(age_min_entry), read_age_bound(age_max_entry))
+            # Версии реестров: при любом изменении зоопарка прошлый результат устаревает
+            versions = (zoo.animals.version, zoo.staff.version)
+
+            # Если текст только дополнился, уточняется прошлый результат, а не весь зоопарк
+            within = None
+            if (last_filter["text"] is not None and last_filter["text"] in filter_text
+                    and last_filter["class"] == class_name and last_filter["ages"] == ages
+                    and last_filter["versions"] == versions):
+                within = (last_filter["animal_ids"], last_filter["staff_ids"])
+            # Поиск по индексу подстрок с ограничением корзиной класса и отрезком индекса возраста
+            # (или запросом к базе SQLite)
+            animal_ids, staff_ids = zoo.search_entities(filter_text, class_name, within, *ages)
+
+            # Запоминание результата для следующего уточнения
+            last_filter.update({"text": filter_text, "class": class_name, "ages": ages, "versions": versions,
+                                "animal_ids": animal_ids, "staff_ids": staff_ids})
+            # Передача результата таблицам в выбранном порядке
+            animal_view.set_rows(sorted_rows("animals", animal_ids))
+            staff_view.set_rows(sorted_rows("staff", staff_ids))
+
+        # Поля сортировки по столбцам таблиц
+        sort_fields = {"animals": dict(zip(animal_columns, ("name", "age", "type"))),
+                       "staff": dict(zip(staff_columns, ("name", "type")))}
+
+        # Функция для сортировки таблицы по столбцу (повторный щелчок меняет направление)
+        def sort_by(kind, col):
+            field = sort_fields[kind][col]
+            state = sort_state[kind]
+            sort_state[kind] = (field, state is not None and state[0] == field and not state[1])
+            # Стрелка в заголовке отсортированного столбца
+            view = animal_view if kind == "animals" else staff_view
+            for column, column_field in sort_fields[kind].items():
+                arrow = (" ▼" if sort_state[kind][1] else " ▲") if column_field == field else ""
+                view.tree.heading(column, text=column + arrow)
+            # Текущий фильтр применяется заново в новом порядке
+            apply_filter()
+
+        # Функция для отложенной фильтрации во время набора текста
+        def schedule_filter(event=None):
+            # Отмена предыдущего задания: фильтр применяется после паузы в наборе
+            if filter_job[0] is not None:
+                view_window.after_cancel(filter_job[0])
+            filter_job[0] = view_window.after(FILTER_DEBOUNCE_MS, apply_filter)
+
+        # Функция для смены режима отображения таблиц
+        def change_list_mode(*_):
+            # Режим из выбранного пункта меню
+            mode = list_modes[list_mode_var.get()]
+            animal_view.set_mode(mode)
+            staff_view.set_mode(mode)
 
         # Создание фрейма для элементов фильтрации
         filter_frame = tk.Frame(view_window, bg=colors['bg_color'])
@@ -602,6 +940,23 @@ def run_gui(zoo):
         filter_entry = tk.Entry(filter_row1)
         # Размещение поля ввода с отступами и заполнением по горизонтали
         filter_entry.pack(side='left', padx=5, fill='x', expand=True)
+        # Фильтрация по мере набора текста
+        filter_entry.bind("<KeyRelease>", schedule_filter)
+
+        # Создание строки фильтра по возрасту
+        filter_row_age = tk.Frame(filter_frame, bg=colors['bg_color'])
+        filter_row_age.pack(fill='x', pady=5)
+
+        # Поля границ возраста в месяцах (пустое поле - без границы)
+        create_label(filter_row_age, "Возраст (мес.) от: | Age (months) from:").pack(side='left')
+        age_min_entry = tk.Entry(filter_row_age, width=8)
+        age_min_entry.pack(side='left', padx=5)
+        create_label(filter_row_age, "до: | to:").pack(side='left')
+        age_max_entry = tk.Entry(filter_row_age, width=8)
+        age_max_entry.pack(side='left', padx=5)
+        # Фильтрация по мере набора границ
+        age_min_entry.bind("<KeyRelease>", schedule_filter)
+        age_max_entry.bind("<KeyRelease>", schedule_filter)
 
         # Создание второй строки фильтра
         filter_row2 = tk.Frame(filter_frame, bg=colors['bg_color'])
@@ -618,6 +973,8 @@ def run_gui(zoo):
         filter_menu = create_option_menu(filter_row2, filter_type_var, filter_types, width=25)
         # Размещение меню с отступом
         filter_menu.pack(side='left', padx=5)
+        # Фильтрация сразу при выборе типа
+        filter_type_var.trace_add("write", lambda *_: apply_filter())
 
         # Создание кнопки для применения фильтра
         apply_filter_btn = create_button(filter_row2, "Применить фильтр | Apply Filter", apply_filter, width=30,
@@ -625,7 +982,26 @@ def run_gui(zoo):
         # Размещение кнопки с отступом
         apply_filter_btn.pack(side='left', padx=5)
 
+        # Создание третьей строки фильтра (режим отображения списка)
+        filter_row3 = tk.Frame(filter_frame, bg=colors['bg_color'])
+        filter_row3.pack(fill='x', pady=5)
+
+        # Режимы отображения: подпись пункта меню -> режим таблицы
+        list_modes = {
+            "Виртуальный | Virtual": LIST_MODE_VIRTUAL,
+            "Фоновое заполнение | Background fill": LIST_MODE_BACKGROUND
+        }
+        # Переменная для режима отображения (по умолчанию виртуальный)
+        list_mode_var = tk.StringVar(value="Виртуальный | Virtual")
+        # Создание метки для режима
+        create_label(filter_row3, "Режим списка: | List mode:").pack(side='left')
+        # Создание выпадающего меню для выбора режима
+        create_option_menu(filter_row3, list_mode_var, list(list_modes), width=30).pack(side='left', padx=5)
+        # Смена режима сразу при выборе пункта меню
+        list_mode_var.trace_add("write", change_list_mode)
+
         # Функция для удаления выбранной сущности
+        @perf_monitor.timed("delete_entity")
         def delete_entity():
             # Проверка аутентификации администратора
             if not authenticate_admin():
@@ -640,53 +1016,40 @@ def run_gui(zoo):
             # Если активна вкладка животных
             if current_tab == 0:
                 # Получение выбранных элементов
-                selected = animal_tree.selection()
+                selected = animal_view.selection()
                 # Проверка наличия выбранных элементов
                 if not selected:
                     return
-                # Получение данных выбранного элемента
-                item_data = animal_tree.item(selected[0])
-                # Извлечение имени животного
-                name = item_data['values'][0]
+                # Извлечение имени животного из данных выбранной строки
+                name = animal_view.values(selected[0])[0]
 
                 # Подтверждение удаления
                 if messagebox.askyesno("Подтверждение | Confirm", f"Удалить животное {name}? | Delete animal {name}?"):
-                    # Поиск и удаление животного
-                    for animal in zoo.animals[:]:
-                        if animal.name == name:
-                            zoo.animals.remove(animal)
-                            # Запись в лог об удалении
-                            logging.info(f"Животное {name} удалено. | Animal {name} deleted.")
-                            break
-                    # Обновление данных
-                    refresh_data()
+                    # Удаление животного по ID строки таблицы
+                    zoo.remove_entity(int(selected[0]))
+                    # Удаление только этой строки из таблицы
+                    animal_view.remove_row(selected[0])
 
             # Если активна вкладка персонала
             elif current_tab == 1:
                 # Получение выбранных элементов
-                selected = staff_tree.selection()
+                selected = staff_view.selection()
                 # Проверка наличия выбранных элементов
                 if not selected:
                     return
-                # Получение данных выбранного элемента
-                item_data = staff_tree.item(selected[0])
-                # Извлечение имени сотрудника
-                name = item_data['values'][0]
+                # Извлечение имени сотрудника из данных выбранной строки
+                name = staff_view.values(selected[0])[0]
 
                 # Подтверждение удаления
                 if messagebox.askyesno("Подтверждение | Confirm",
                                        f"Удалить сотрудника {name}? | Delete staff member {name}?"):
-                    # Поиск и удаление сотрудника
-                    for staff_member in zoo.staff[:]:
-                        if staff_member.name == name:
-                            zoo.staff.remove(staff_member)
-                            # Запись в лог об удалении
-                            logging.info(f"Сотрудник {name} удален. | Staff {name} deleted.")
-                            break
-                    # Обновление данных
-                    refresh_data()
+                    # Удаление сотрудника по ID строки таблицы
+                    zoo.remove_entity(int(selected[0]))
+                    # Удаление только этой строки из таблицы
+                    staff_view.remove_row(selected[0])
 
         # Функция для редактирования выбранной сущности
+        @perf_monitor.timed("edit_entity")
         def edit_entity():
             # Проверка аутентификации администратора
             if not authenticate_admin():
@@ -698,7 +1061,7 @@ def run_gui(zoo):
             # Определение текущей активной вкладки
             current_tab = notebook.index(notebook.select())
             # Получение выбранных элементов в зависимости от вкладки
-            selected = animal_tree.selection() if current_tab == 0 else staff_tree.selection()
+            selected = animal_view.selection() if current_tab == 0 else staff_view.selection()
 
             # Проверка наличия выбранных элементов
             if not selected:
@@ -706,12 +1069,10 @@ def run_gui(zoo):
 
             # Если активна вкладка животных
             if current_tab == 0:
-                # Получение данных выбранного элемента
-                item_data = animal_tree.item(selected[0])
-                # Извлечение данных о животном
-                name, age, animal_class = item_data['values']
-                # Поиск животного по имени
-                animal = next((a for a in zoo.animals if a.name == name), None)
+                # Извлечение данных о животном из выбранной строки
+                name, age, animal_class = animal_view.values(selected[0])
+                # Поиск животного по ID строки таблицы
+                animal = zoo.get_entity(int(selected[0]))
                 # Проверка найден ли объект
                 if not animal:
                     return
@@ -769,14 +1130,12 @@ def run_gui(zoo):
                         messagebox.showerror("Ошибка | Error", "Некорректное значение возраста! | Invalid age value!")
                         return
 
-                    # Обновление имени животного
-                    animal.name = new_name
-                    # Обновление возраста животного
-                    animal.age = new_age
-                    # Запись в лог об обновлении
-                    logging.info(f"Животное {name} обновлено: {new_name}, возраст {new_age}")
-                    # Обновление данных в таблице
-                    refresh_data()
+                    # Обновление имени и возраста животного через индексы зоопарка
+                    zoo.update_entity(animal.entity_id, name=new_name, age=new_age)
+                    # Обновление только этой строки таблицы (в отсортированной таблице - и её места)
+                    animal_view.update_row(selected[0])
+                    if sort_state["animals"] is not None:
+                        apply_filter()
                     # Закрытие окна редактирования
                     edit_window.destroy()
                     # Отображение сообщения об успехе
@@ -791,12 +1150,10 @@ def run_gui(zoo):
 
             # Если активна вкладка персонала
             elif current_tab == 1:
-                # Получение данных выбранного элемента
-                item_data = staff_tree.item(selected[0])
-                # Извлечение имени сотрудника
-                name = item_data['values'][0]
-                # Поиск сотрудника по имени
-                staff = next((s for s in zoo.staff if s.name == name), None)
+                # Извлечение имени сотрудника из выбранной строки
+                name = staff_view.values(selected[0])[0]
+                # Поиск сотрудника по ID строки таблицы
+                staff = zoo.get_entity(int(selected[0]))
                 # Проверка найден ли объект
                 if not staff:
                     return
@@ -828,12 +1185,12 @@ def run_gui(zoo):
                 def save_changes():
                     # Получение нового имени из переменной
                     new_name = name_var.get()
-                    # Обновление имени сотрудника
-                    staff.name = new_name
-                    # Запись в лог об обновлении
-                    logging.info(f"Сотрудник {name} обновлен: {new_name}")
-                    # Обновление данных в таблице
-                    refresh_data()
+                    # Обновление имени сотрудника через индексы зоопарка
+                    zoo.update_entity(staff.entity_id, name=new_name)
+                    # Обновление только этой строки таблицы (в отсортированной таблице - и её места)
+                    staff_view.update_row(selected[0])
+                    if sort_state["staff"] is not None:
+                        apply_filter()
                     # Закрытие окна редактирования
                     edit_window.destroy()
                     # Отображение сообщения об успехе
@@ -863,11 +1220,61 @@ def run_gui(zoo):
         # Размещение кнопки слева с заполнением пространства
         edit_btn.pack(side='left', padx=2, fill='x', expand=True)
 
+        # Функция для экспорта текущего результата фильтра
+        def export_entities():
+            if background_busy():
+                return
+            # Открытие диалога сохранения файла
+            export_filename = filedialog.asksaveasfilename(
+                parent=view_window,
+                defaultextension=".csv",  # Расширение по умолчанию
+                # Фильтры типов файлов
+                filetypes=[("CSV", "*.csv"), ("JSONL", "*.jsonl"),
+                           ("Столбцовый файл | Columnar file", "*.zcol"), ("Все файлы | All files", "*.*")],
+                title="Экспорт | Export"  # Заголовок диалога
+            )
+            # Проверка выбран ли файл
+            if not export_filename:
+                return
+            # Строки, показанные в таблицах (результат фильтра), и согласованная копия зоопарка
+            animal_ids, staff_ids = animal_view.row_ids(), staff_view.row_ids()
+            snapshot = zoo.snapshot()
+
+            # Завершение экспорта
+            def on_done(exporter):
+                show_success_message("Успех | Success",
+                                     f"Экспортировано записей: {exporter.rows} | Exported records: {exporter.rows}")
+
+            # Ошибка при экспорте
+            def on_error(export_exc):
+                logging.error(f"Ошибка экспорта в {export_filename}: {export_exc}")
+                messagebox.showerror("Ошибка | Error", f"Не удалось экспортировать: {export_exc} | Export failed")
+
+            run_in_background("Экспорт... | Exporting...",
+                              lambda progress: snapshot.export_file(export_filename, animal_ids=animal_ids,
+                                                                    staff_ids=staff_ids, progress=progress),
+                              on_done, on_error)
+
+        # Создание кнопки экспорта
+        export_btn = create_button(btn_frame, "Экспорт | Export", export_entities, width=14, font_size=9)
+        # Размещение кнопки слева с заполнением пространства
+        export_btn.pack(side='left', padx=2, fill='x', expand=True)
+
         # Создание кнопки обновления
         refresh_btn = create_button(btn_frame, "Обновить | Refresh", refresh_data, width=18, font_size=9)
         # Размещение кнопки справа с заполнением пространства
         refresh_btn.pack(side='right', padx=2, fill='x', expand=True)
 
+        # После отмены и повтора таблицы окна применяют текущий фильтр заново
+        view_refreshers.append(apply_filter)
+
+        # Функция для отписки окна при закрытии
+        def on_view_destroy(event):
+            if event.widget is view_window and apply_filter in view_refreshers:
+                view_refreshers.remove(apply_filter)
+
+        view_window.bind("<Destroy>", on_view_destroy)
+
     # Функция для воспроизведения звука животного
     def play_animal_sound():
         # Проверка наличия животных в зоопарке
@@ -905,19 +1312,20 @@ def run_gui(zoo):
             if not selected_name:
                 return
 
-            # Поиск животного по имени
-            animal = next((a for a in zoo.animals if a.name == selected_name), None)
+            # Поиск животного по индексу имён
+            animal = zoo.find_animal(selected_name)
             # Проверка найден ли объект
             if animal:
                 # Воспроизведение звука животного
                 animal.make_sound()
                 # Запись в лог о воспроизведении
-                logging.info(f"Воспроизведен звук животного: {animal.name}")
+                logging.info("Воспроизведен звук животного: %s", animal.name)
 
         # Создание кнопки воспроизведения звука
         create_button(sound_window, "Воспроизвести звук | Play Sound", play_sound, width=30).pack(pady=10)
 
     # Функция для воспроизведения звуков ВСЕХ животных
+    @perf_monitor.timed("make_all_sounds")
     def play_all_animal_sounds():
         """
         Вызывает метод зоопарка для воспроизведения звуков всех животных.
@@ -944,6 +1352,7 @@ def run_gui(zoo):
             messagebox.showerror("Ошибка | Error", f"Не удалось воспроизвести звуки: {str(e)}")
 
     # Функция для добавления животного через GUI
+    @perf_monitor.timed("add_animal")
     def add_animal_gui():
         # Получение имени животного из поля ввода
         name = name_entry.get()
@@ -992,7 +1401,7 @@ def run_gui(zoo):
         show_success_message("Успех | Success",
                              f"{russian_type} {name} добавлен в зоопарк. | {english_type} {name} added to zoo.")
         # Запись в лог о добавлении животного
-        logging.info(f"Добавлено животное: {name} ({russian_type})")
+        logging.info("Добавлено животное: %s (%s)", name, russian_type)
 
         # Очистка поля ввода имени
         name_entry.delete(0, tk.END)
@@ -1000,6 +1409,7 @@ def run_gui(zoo):
         age_entry.delete(0, tk.END)
 
     # Функция для добавления смотрителя
+    @perf_monitor.timed("add_staff")
     def add_keeper():
         # Получение имени смотрителя из поля ввода
         name = keeper_entry.get()
@@ -1014,11 +1424,12 @@ def run_gui(zoo):
         # Отображение сообщения об успехе
         show_success_message("Успех | Success", f"Смотритель {name} добавлен. | ZooKeeper {name} added.")
         # Запись в лог о добавлении смотрителя
-        logging.info(f"Добавлен сотрудник: {name} (Смотритель)")
+        logging.info("Добавлен сотрудник: %s (Смотритель)", name)
         # Очистка поля ввода
         keeper_entry.delete(0, tk.END)
 
     # Функция для добавления ветеринара
+    @perf_monitor.timed("add_staff")
     def add_vet():
         # Получение имени ветеринара из поля ввода
         name = vet_entry.get()
@@ -1033,51 +1444,382 @@ def run_gui(zoo):
         # Отображение сообщения об успехе
         show_success_message("Успех | Success", f"Ветеринар {name} добавлен. | Veterinarian {name} added.")
         # Запись в лог о добавлении ветеринара
-        logging.info(f"Добавлен сотрудник: {name} (Ветеринар)")
+        logging.info("Добавлен сотрудник: %s (Ветеринар)", name)
         # Очистка поле ввода
         vet_entry.delete(0, tk.END)
 
+    # Фоновые операции сохранения и загрузки, выполняемые сейчас
+    background_jobs = []
+
+    # Функция для показа окна производительности (замеры времени вызовов)
+    def show_performance():
+        # Создание окна производительности
+        perf_window = create_toplevel("Производительность | Performance", 820, 520)
+
+        # Переменная включения замеров
+        enabled_var = tk.BooleanVar(value=perf_monitor.enabled)
+
+        # Функция для включения и выключения замеров
+        def toggle_monitor():
+            if enabled_var.get():
+                perf_monitor.enable()
+            else:
+                perf_monitor.disable()
+
+        # Создание флажка включения замеров
+        tk.Checkbutton(perf_window, text="Включить замеры | Enable timing", variable=enabled_var,
+                       command=toggle_monitor, bg=colors['bg_color'], fg=colors['text_color'],
+                       activebackground=colors['bg_color']).pack(pady=5)
+
+        # Столбцы таблицы вызовов
+        columns = ("Вызов | Call", "Кол-во | Count", "Всего, мс | Total, ms", "Среднее | Mean",
+                   "p50", "p90", "p99", "Макс | Max")
+        # Создание таблицы вызовов
+        calls_tree = ttk.Treeview(perf_window, columns=columns, show="headings", height=10)
+        for col in columns:
+            calls_tree.heading(col, text=col)  # Установка названия столбца
+            calls_tree.column(col, width=150 if col == columns[0] else 85, anchor='w' if col == columns[0] else 'e')
+        # Размещение таблицы вызовов
+        calls_tree.pack(fill='both', expand=True, padx=5)
+
+        # Создание метки для медленных вызовов
+        create_label(perf_window, f"Медленные вызовы (от {perf_monitor.slow_ms:g} мс) | "
+                                  f"Slow calls (from {perf_monitor.slow_ms:g} ms)").pack(pady=(5, 0))
+        # Создание таблицы медленных вызовов
+        slow_columns = ("Время | Time", "Вызов | Call", "мс | ms", "Аргументы | Arguments")
+        slow_tree = ttk.Treeview(perf_window, columns=slow_columns, show="headings", height=6)
+        for col, width in zip(slow_columns, (80, 150, 70, 480)):
+            slow_tree.heading(col, text=col)  # Установка названия столбца
+            slow_tree.column(col, width=width)
+        # Размещение таблицы медленных вызовов
+        slow_tree.pack(fill='both', expand=True, padx=5)
+
+        # Функция для обновления таблиц (повторяется, пока окно открыто)
+        def refresh_stats():
+            if not perf_window.winfo_exists():
+                return
+            rows = perf_monitor.snapshot()
+            calls_tree.delete(*calls_tree.get_children())
+            for row in rows:
+                calls_tree.insert('', 'end', values=(
+                    row["name"], row["count"], f"{row['total_ms']:.1f}", f"{row['mean_ms']:.3f}",
+                    f"{row['p50_ms']:.3f}", f"{row['p90_ms']:.3f}", f"{row['p99_ms']:.3f}", f"{row['max_ms']:.1f}"))
+            # Медленные вызовы всех функций - самые новые сверху
+            slow = sorted(((sample["time"], row["name"], sample["ms"], sample["args"])
+                           for row in rows for sample in row["slow"]), reverse=True)
+            slow_tree.delete(*slow_tree.get_children())
+            for started, name, ms, args in slow:
+                slow_tree.insert('', 'end', values=(time.strftime("%H:%M:%S", time.localtime(started)),
+                                                    name, f"{ms:.1f}", args))
+            perf_window.after(PERF_REFRESH_MS, refresh_stats)
+
+        # Функция для сброса статистики
+        def reset_stats():
+            perf_monitor.reset()
+            calls_tree.delete(*calls_tree.get_children())
+            slow_tree.delete(*slow_tree.get_children())
+
+        # Функция для экспорта статистики в JSON
+        def export_stats():
+            export_filename = filedialog.asksaveasfilename(
+                parent=perf_window,
+                defaultextension=".json",  # Расширение по умолчанию
+                # Фильтры типов файлов
+                filetypes=[("JSON", "*.json"), ("Все файлы | All files", "*.*")],
+                title="Экспорт замеров | Export Timings"  # Заголовок диалога
+            )
+            # Проверка выбран ли файл
+            if not export_filename:
+                return
+            try:
+                perf_monitor.export_json(export_filename)
+                show_success_message("Успех | Success",
+                                     f"Замеры сохранены в {os.path.basename(export_filename)} | "
+                                     f"Timings saved to {os.path.basename(export_filename)}")
+            except OSError as export_exc:  # Обработка ошибок записи
+                logging.error(f"Ошибка экспорта замеров: {export_exc}")
+                messagebox.showerror("Ошибка | Error", f"Не удалось сохранить замеры: {export_exc} | Export failed")
+
+        # Создание фрейма для кнопок
+        btn_frame = tk.Frame(perf_window, bg=colors['bg_color'])
+        # Размещение фрейма кнопок
+        btn_frame.pack(fill='x', padx=5, pady=5)
+        # Создание кнопок сброса и экспорта
+        create_button(btn_frame, "Сбросить | Reset", reset_stats, width=20).pack(side='left', padx=2, fill='x',
+                                                                               expand=True)
+        create_button(btn_frame, "Экспорт JSON | Export JSON", export_stats, width=20).pack(side='left', padx=2,
+                                                                                          fill='x', expand=True)
+        refresh_stats()
+
+    # Функция для показа журнала событий (поиск по индексу лога)
+    def show_log_viewer():
+        index = log_index()
+        # Проверка ведётся ли индекс лога
+        if index is None:
+            messagebox.showinfo("Информация | Info", "Индекс лога не ведётся. | The log index is disabled.")
+            return
+        # Создание окна журнала событий
+        log_window = create_toplevel("Журнал событий | Log Viewer", 820, 560)
+
+        # Фрейм условий поиска
+        query_frame = tk.Frame(log_window, bg=colors['bg_color'])
+        query_frame.pack(fill='x', padx=5, pady=5)
+        # Поле ввода имени животного или сотрудника
+        create_label(query_frame, "Имя: | Name:").pack(side='left')
+        name_entry_log = tk.Entry(query_frame, width=20, bg=colors['entry_bg'], fg=colors['text_color'])
+        name_entry_log.pack(side='left', padx=5)
+
+        # Уровни записей (наименьший уровень или None - все)
+        levels = {"Все | All": None, "Предупреждения | Warnings": logging.WARNING, "Ошибки | Errors": logging.ERROR}
+        level_var = tk.StringVar(value="Все | All")
+        create_option_menu(query_frame, level_var, list(levels), width=22).pack(side='left', padx=5)
+        # Периоды (дней или None - весь индекс)
+        periods = {"Сутки | Day": 1, "Неделя | Week": 7, "Месяц | Month": 30, "Всё | All": None}
+        period_var = tk.StringVar(value="Неделя | Week")
+        create_option_menu(query_frame, period_var, list(periods), width=14).pack(side='left', padx=5)
+
+        # Найденные записи: ID записи -> значения столбцов
+        found_rows = {}
+        # Таблица записей
+        log_columns = ("Время | Time", "Уровень | Level", "Сообщение | Message")
+        log_view = VirtualTreeview(log_window, log_columns, found_rows.get)
+        for col, width in zip(log_columns, (140, 90, 560)):
+            log_view.tree.heading(col, text=col)  # Установка названия столбца
+            log_view.tree.column(col, width=width)  # Установка ширины столбца
+        # Количество найденных записей
+        count_label = create_label(log_window, "")
+
+        # Функция для поиска записей в индексе
+        def search_log(event=None):
+            days = periods[period_var.get()]
+            rows = index.query(name=name_entry_log.get(), level=levels[level_var.get()],
+                               since=None if days is None else time.time() - days * 86400, limit=LOG_VIEW_LIMIT)
+            found_rows.clear()
+            for entry_id, created, level, _, message in rows:
+                found_rows[entry_id] = (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created)),
+                                        logging.getLevelName(level), message)
+            log_view.set_rows([row[0] for row in rows])
+            count_label.config(text=f"Найдено записей: {len(rows)} | Records found: {len(rows)}")
+
+        # Кнопка поиска и поиск по Enter
+        create_button(query_frame, "Найти | Search", search_log, width=12).pack(side='left', padx=5)
+        name_entry_log.bind("<Return>", search_log)
+        # Размещение таблицы и счётчика
+        log_view.frame.pack(fill='both', expand=True, padx=5)
+        count_label.pack(pady=5)
+        # Последние записи за выбранный период
+        search_log()
+
+    # Функция для создания окна с индикатором прогресса (возвращает окно и функцию обновления)
+    def create_progress_window(title):
+        # Окно с индикатором прогресса (пока размер неизвестен - бегущая полоса)
+        progress_window = create_toplevel(title, 360, 130)
+        create_label(progress_window, title, font_size=11).pack(pady=(15, 5))
+        progress_bar = ttk.Progressbar(progress_window, length=300, mode="indeterminate")
+        progress_bar.pack(pady=5)
+        progress_bar.start(15)
+        # Строка состояния под индикатором
+        status_label = create_label(progress_window, "")
+        status_label.pack()
+
+        # Обновление индикатора (вызывается в потоке Tk)
+        def on_progress(done, total, status=None):
+            if not progress_window.winfo_exists():
+                return
+            if status is not None:
+                status_label.config(text=status)
+            if not total:
+                return
+            if str(progress_bar.cget("mode")) != "determinate":
+                progress_bar.stop()
+                progress_bar.configure(mode="determinate", maximum=total)
+            progress_bar["value"] = done
+
+        return progress_window, on_progress
+
+    # Функция для выполнения операции в фоне с окном прогресса
+    def run_in_background(title, work, on_done, on_error):
+        progress_window, on_progress = create_progress_window(title)
+
+        # Завершение операции: закрытие окна прогресса и вызов обработчика
+        def finish(handler, value):
+            background_jobs.remove(job)
+            if progress_window.winfo_exists():
+                progress_window.destroy()
+            handler(value)
+
+        job = BackgroundJob(root_window, work, on_progress,
+                            lambda result: finish(on_done, result),
+                            lambda error: finish(on_error, error))
+        background_jobs.append(job)
+        job.start()
+
+    # Функция для проверки, не выполняется ли уже фоновая операция
+    def background_busy():
+        if background_jobs:
+            messagebox.showwarning("Подождите | Please wait",
+                                   "Сохранение или загрузка ещё выполняется. | Save or load is still in progress.")
+            return True
+        return False
+
+    # Функция для импорта животных и сотрудников из файла CSV или JSONL
+    def import_entities():
+        if background_busy():
+            return
+        # Открытие диалога выбора файла
+        import_filename = filedialog.askopenfilename(
+            # Фильтры типов файлов
+            filetypes=[("CSV и JSONL | CSV and JSONL", "*.csv *.jsonl *.ndjson"),
+                       ("Все файлы | All files", "*.*")],
+            title="Импорт животных и персонала | Import Animals and Staff"  # Заголовок диалога
+        )
+        # Проверка выбран ли файл
+        if not import_filename:
+            return
+        importer = ZooImporter(zoo, chunk_rows=1000)  # Небольшие пачки, чтобы окно оставалось отзывчивым
+        # Все пачки импорта отменяются одним шагом
+        history.begin_group(f"импорт из {os.path.basename(import_filename)}")
+        progress_window, on_progress = create_progress_window("Импорт... | Importing...")
+        chunks = importer.chunks(import_filename)  # Файл читается по мере обработки пачек
+
+        # Обработка одной пачки за один проход цикла событий Tk
+        def import_step():
+            try:
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    importer.insert(chunk)
+                    on_progress(importer.bytes_read, importer.total_bytes,
+                                f"{importer.rows} строк, {importer.rows_per_second:.0f} строк/с | rows, rows/s")
+                    root_window.after(1, import_step)
+                    return
+            except Exception as import_exc:  # Обработка ошибок чтения файла
+                history.end_group()
+                if progress_window.winfo_exists():
+                    progress_window.destroy()
+                logging.error(f"Ошибка импорта из {import_filename}: {import_exc}")
+                messagebox.showerror("Ошибка | Error",
+                                     f"Импорт прерван: {import_exc} | Import aborted: {import_exc}")
+                return
+            history.end_group()
+            if progress_window.winfo_exists():
+                progress_window.destroy()
+            # Файл прочитан полностью
+            logging.info(f"Импорт из {import_filename}: {importer.summary()}")
+            message = (f"Добавлено животных: {importer.animals}, сотрудников: {importer.staff}, "
+                       f"пропущено строк: {importer.skipped} ({importer.rows_per_second:.0f} строк/с) | "
+                       f"Imported {importer.animals} animals, {importer.staff} staff, skipped {importer.skipped}")
+            if importer.errors:
+                message += "\n\n" + "\n".join(importer.errors[:10])
+            show_success_message("Импорт завершён | Import complete", message)
+
+        root_window.after(1, import_step)
+
+    # Функция для отмены или повтора последнего изменения (redo=True - повтор)
+    def undo_change(event=None, redo=False):
+        # Отмена во время фонового сохранения изменила бы сохраняемые реестры
+        if background_busy():
+            return
+        label = history.redo() if redo else history.undo()
+        if label is None:
+            messagebox.showinfo("Информация | Info",
+                                "Нечего повторять. | Nothing to redo." if redo else "Нечего отменять. | Nothing to undo.")
+            return
+        # Обновление открытых окон просмотра
+        for refresh in list(view_refreshers):
+            refresh()
+        show_success_message("Успех | Success",
+                             f"Повторено: {label} | Redone" if redo else f"Отменено: {label} | Undone")
+
     # Функция для сохранения зоопарка в файл
     def save_zoo():
+        if background_busy():
+            return
+        # Запись автосохранения завершается до сохранения вручную (файл журнала может совпадать)
+        if autosave is not None:
+            autosave.wait()
         # Открытие диалога сохранения файла
         save_filename = filedialog.asksaveasfilename(
             defaultextension=".pkl",  # Расширение по умолчанию
             # Фильтры типов файлов
-            filetypes=[("Файлы pickle | Pickle files", "*.pkl"), ("Все файлы | All files", "*.*")],
+            filetypes=[("Файлы pickle | Pickle files", "*.pkl"), ZOO_DATABASE_FILETYPE,
+                       ("Все файлы | All files", "*.*")],
             title="Сохранить зоопарк | Save Zoo"  # Заголовок диалога
         )
         # Проверка выбран ли файл
         if save_filename:
-            # Попытка сохранения зоопарка
-            if zoo.save_zoo(save_filename):
-                # Отображение сообщения об успехе
-                show_success_message("Успех | Success",
-                                     f"Зоопарк сохранен в {os.path.basename(save_filename)} | Zoo saved to {os.path.basename(save_filename)}")
-                # Запись в лог о сохранении
-                logging.info(f"Зоопарк сохранен в {save_filename}")
+            # Файл журнала или подключённой базы сохраняет сам журнал или хранилище: записываются
+            # только накопленные изменения (или копия целиком), как при автосохранении
+            writer = None
+            if zoo.storage is not None and os.path.abspath(save_filename) == zoo.storage.filename:
+                writer = zoo.storage
+            elif zoo.journal is not None and os.path.abspath(save_filename) == zoo.journal.snapshot_path:
+                writer = zoo.journal
+            if writer is not None:
+                write_changes, finish = writer.begin_save()
             else:
+                # Файл, отображённый в память, освобождается до снимка, чтобы снимок не читал перезаписываемый файл
+                zoo.release_file(save_filename)
+                # Согласованная копия сохраняется в фоне, а зоопарк остаётся доступным для изменений
+                snapshot = zoo.snapshot()
+                finish = None
+
+            # Запись в рабочем потоке
+            @perf_monitor.timed("save_zoo")
+            def work(progress):
+                if writer is not None:
+                    return write_changes()
+                return snapshot.save_zoo(save_filename, progress)
+
+            # Завершение сохранения
+            def on_done(saved):
+                if finish is not None:
+                    finish(saved)
+                if saved:
+                    # Отображение сообщения об успехе
+                    show_success_message("Успех | Success",
+                                         f"Зоопарк сохранен в {os.path.basename(save_filename)} | Zoo saved to {os.path.basename(save_filename)}")
+                    # Запись в лог о сохранении
+                    logging.info(f"Зоопарк сохранен в {save_filename}")
+                else:
+                    # Отображение сообщения об ошибке
+                    messagebox.showerror("Ошибка | Error", "Не удалось сохранить зоопарк! | Failed to save zoo!")
+
+            # Ошибка при сохранении (журнал или хранилище вернут изменения в следующее сохранение)
+            def on_error(save_exc):
+                if finish is not None:
+                    finish(False)
+                # Запись ошибки в лог
+                logging.error(f"Ошибка сохранения зоопарка: {save_exc}")
                 # Отображение сообщения об ошибке
                 messagebox.showerror("Ошибка | Error", "Не удалось сохранить зоопарк! | Failed to save zoo!")
 
+            run_in_background("Сохранение зоопарка... | Saving zoo...", work, on_done, on_error)
+
     # Функция для загрузки зоопарка из файла
     def load_zoo():
+        if background_busy():
+            return
+        if autosave is not None:
+            autosave.wait()
         # Открытие диалога выбора файла
         load_filename = filedialog.askopenfilename(
             # Фильтры типов файлов
-            filetypes=[("Файлы pickle | Pickle files", "*.pkl"), ("Все файлы | All files", "*.*")],
+            filetypes=[("Файлы pickle | Pickle files", "*.pkl"), ZOO_DATABASE_FILETYPE,
+                       ("Все файлы | All files", "*.*")],
             title="Загрузить зоопарк | Load Zoo"  # Заголовок диалога
         )
         # Проверка выбран ли файл
         if load_filename:
-            try:
-                # Загрузка зоопарка из файла
-                loaded_zoo = Zoo.load_zoo(load_filename)
-                # Обновление списка животных
-                zoo.animals = loaded_zoo.animals
-                # Обновление списка сотрудников
-                zoo.staff = loaded_zoo.staff
-                # Обновление названия зоопарка
-                zoo.name = loaded_zoo.name
+            # Завершение загрузки
+            def on_done(loaded_zoo):
+                # Замена животных, сотрудников и названия загруженными
+                zoo.replace_with(loaded_zoo)
+                # База SQLite остаётся подключённой и получает следующие изменения,
+                # а база прежнего зоопарка после загрузки другого файла закрывается
+                if loaded_zoo.storage is not None:
+                    zoo.attach_storage(loaded_zoo.storage, needs_full=False)
+                else:
+                    zoo.close_storage()
                 # Обновление заголовка главного окна
                 root_window.title(f"Управление зоопарком: {zoo.name} | Zoo Management: {zoo.name}")
                 # Отображение сообщения об успехе
@@ -1085,23 +1827,29 @@ def run_gui(zoo):
                                      f"Зоопарк загружен из {os.path.basename(load_filename)} | Zoo loaded from {os.path.basename(load_filename)}")
                 # Запись в лог о загрузке
                 logging.info(f"Зоопарк загружен из {load_filename}")
-            except Exception as load_exc:  # Обработка ошибок загрузки
+
+            # Ошибка при загрузке
+            def on_error(load_exc):
                 # Запись ошибки в лог
                 logging.error(f"Ошибка загрузки зоопарка: {load_exc}")
                 # Предложение создать новый зоопарк при ошибке
                 if messagebox.askyesno("Ошибка | Error",
                                        "Не удалось загрузить зоопарк. Создать новый? | Failed to load zoo. Create new zoo?"):
-                    # Очистка списка животных
-                    zoo.animals = []
-                    # Очистка списка сотрудников
-                    zoo.staff = []
-                    # Установка нового названия зоопарка
-                    zoo.name = "Новый зоопарк | New Zoo"
+                    # Очистка зоопарка и установка нового названия (прежняя база закрывается)
+                    zoo.replace_with(Zoo("Новый зоопарк | New Zoo"))
+                    zoo.close_storage()
                     # Обновление заголовка главного окна
                     root_window.title(f"Управление зоопарком: {zoo.name} | Zoo Management: {zoo.name}")
                     # Запись в лог о создании нового зоопарка
                     logging.info("Создан новый зоопарк после ошибки загрузки")
 
+            # Загрузка выполняется в рабочем потоке и не затрагивает текущий зоопарк
+            @perf_monitor.timed("load_zoo")
+            def work(progress):
+                return Zoo.load_zoo(load_filename, progress=progress)
+
+            run_in_background("Загрузка зоопарка... | Loading zoo...", work, on_done, on_error)
+
     # Установка единой ширины для элементов интерфейса
     element_width = 50  # Ширина в символах
 
@@ -1171,10 +1919,26 @@ def run_gui(zoo):
     # Создание кнопки для просмотра объектов зоопарка
     create_button(root_window, "Просмотр животных и персонала | View Animals and Staff", view_entities,
                   width=element_width).pack(pady=7)
+    # Создание кнопки для импорта из CSV/JSONL
+    create_button(root_window, "Импорт из CSV/JSONL | Import CSV/JSONL", import_entities,
+                  width=element_width).pack(pady=7)
     # Создание кнопки для сохранения зоопарка
     create_button(root_window, "Сохранить зоопарк | Save Zoo", save_zoo, width=element_width).pack(pady=7)
     # Создание кнопки для загрузки зоопарка
     create_button(root_window, "Загрузить зоопарк | Load Zoo", load_zoo, width=element_width).pack(pady=7)
+    # Создание кнопки для окна производительности
+    create_button(root_window, "Производительность | Performance", show_performance,
+                  width=element_width).pack(pady=7)
+    # Создание фрейма для кнопок отмены и повтора
+    undo_frame = tk.Frame(root_window, bg=colors['bg_color'])
+    undo_frame.pack(pady=7)
+    # Создание кнопок отмены и повтора (также Ctrl+Z и Ctrl+Y)
+    create_button(undo_frame, "Отменить | Undo", undo_change, width=24).pack(side='left', padx=2)
+    create_button(undo_frame, "Повторить | Redo", lambda: undo_change(redo=True), width=24).pack(side='left', padx=2)
+    root_window.bind_all("<Control-z>", undo_change)
+    root_window.bind_all("<Control-y>", lambda event: undo_change(event, redo=True))
+    # Создание кнопки для журнала событий
+    create_button(root_window, "Журнал событий | Log Viewer", show_log_viewer, width=element_width).pack(pady=7)
     # Создание кнопки для смены пароля администратора
     create_button(root_window, "Сменить пароль администратора | Change Admin Password", change_admin_password,
                   width=element_width).pack(pady=7)
@@ -1185,22 +1949,52 @@ def run_gui(zoo):
 
     # Применение цветовой схемы
     apply_colors()
+    # Инициализация звука и фоновая загрузка звуков после появления окна
+    root_window.after_idle(sound_bank.preload, [Bird.SOUND_FILE, Mammal.SOUND_FILE, Reptile.SOUND_FILE])
+    # Отчёт о запуске: окно построено, первый кадр - когда главный цикл впервые простаивает
+    if startup is not None:
+        startup.mark("построение окна")
+
+        # Отметка первого кадра и запись отчёта в лог
+        def report_startup():
+            startup.mark("первый кадр")
+            startup.log()
+
+        root_window.after_idle(report_startup)
+    # Запуск проверки автосохранения
+    if autosave is not None:
+        root_window.after(AUTOSAVE_POLL_MS, autosave_tick)
     # Запуск главного цикла обработки событий
     root_window.mainloop()
+    # Ожидание фоновых операций, начатых перед закрытием окна
+    for job in list(background_jobs):
+        job.join()
+    # Остаток изменений дописывается при выходе, текущая запись автосохранения дожидается завершения
+    if autosave is not None:
+        autosave.close()
 
 
 # Основной блок выполнения программы
 if __name__ == "__main__":
+    # Замер этапов запуска (импорт модулей отсчитывается от начала main.py)
+    startup_report = StartupReport(STARTUP_STARTED)
+    startup_report.mark("импорт модулей")
+    # Лог пишется фоновым потоком пачками, чтобы массовые операции не ждали диска;
+    # файл лога ротируется со сжатием, а записи попадают в индекс для журнала событий
+    configure_logging(async_mode=True, max_bytes=LOG_MAX_BYTES, index=True, fast_records=True)
+    startup_report.mark("настройка лога")
     zoo_instance = None  # Переменная для экземпляра зоопарка
 
     try:
         # Попытка загрузить последнее состояние зоопарка
-        zoo_instance = Zoo.load_zoo("last_zoo.pkl")
+        zoo_instance = Zoo.load_zoo("last_zoo.pkl", journaled=True)
         # Запись в лог об успешной загрузке
         logging.info("Автоматически загружено состояние зоопарка")
     except Exception as auto_load_error:  # Обработка ошибок загрузки
         # Запись предупреждения в лог
         logging.warning(f"Ошибка автоматической загрузки: {auto_load_error}")
+        # Диалоги нужны только при ошибке загрузки
+        from tkinter import messagebox, filedialog
         # Предложение создать новый зоопарк
         if messagebox.askyesno("Ошибка загрузки | Load Error",
                                "Не удалось загрузить зоопарк. Создать новый? | Failed to load zoo. Create new zoo?"):
@@ -1212,7 +2006,8 @@ if __name__ == "__main__":
             # Ручной выбор файла зоопарка
             manual_filename = filedialog.askopenfilename(
                 # Фильтры типов файлов
-                filetypes=[("Файлы pickle | Pickle files", "*.pkl"), ("Все файлы | All files", "*.*")],
+                filetypes=[("Файлы pickle | Pickle files", "*.pkl"), ZOO_DATABASE_FILETYPE,
+                           ("Все файлы | All files", "*.*")],
                 title="Выберите файл зоопарка | Select Zoo File"  # Заголовок диалога
             )
             # Проверка выбран ли файл
@@ -1234,13 +2029,18 @@ if __name__ == "__main__":
                 # Создание нового зоопарка
                 zoo_instance = Zoo("Новый зоопарк | New Zoo")
 
+    # Зоопарк, загруженный не из last_zoo.pkl, начинает новый журнал с полного снимка
+    if zoo_instance and zoo_instance.journal is None:
+        zoo_instance.enable_journal("last_zoo.pkl")
+    startup_report.mark("загрузка зоопарка")
+
     # Проверка создан ли экземпляр зоопарка
     if zoo_instance:
         # Запуск графического интерфейса
-        run_gui(zoo_instance)
+        run_gui(zoo_instance, startup_report)
 
     try:
-        # Попытка сохранения состояния зоопарка при выходе
+        # Попытка сохранения состояния зоопарка при выходе (дописываются только изменения)
         zoo_instance.save_zoo("last_zoo.pkl")
         # Запись в лог об успешном сохранении
         logging.info("Состояние зоопарка сохранено при выходе")
@@ -0,0 +1,50 @@
+"""
+Общие фикстуры тестов: небольшой зоопарк, зоопарк с журналом, история
+изменений и сравнение содержимого зоопарков.
+"""
+
+# Импорт необходимых модулей
+import pytest
+
+from zoo_models import Zoo, ZooHistory, Bird, Mammal, ZooKeeper
+
+
+# Вспомогательная функция: набор сущностей зоопарка (записи животных, записи сотрудников)
+def _entity_set(zoo):
+    return sorted(zoo.animals.records()), sorted(zoo.staff.records())
+
+
+# Сравнение содержимого зоопарков: entity_set(zoo) -> (записи животных, записи сотрудников)
+@pytest.fixture
+def entity_set():
+    return _entity_set
+
+
+# Зоопарк с двумя животными и смотрителем
+@pytest.fixture
+def zoo():
+    zoo = Zoo("Тест")
+    zoo.add_animal(Bird("Кеша", 2))
+    zoo.add_animal(Mammal("Бобик", 24))
+    zoo.add_staff(ZooKeeper("Иван"))
+    return zoo
+
+
+# История изменений зоопарка (подписана до изменений теста)
+@pytest.fixture
+def history(zoo):
+    return ZooHistory(zoo)
+
+
+# Путь к файлу снимка во временном каталоге теста
+@pytest.fixture
+def snap_path(tmp_path):
+    return str(tmp_path / "zoo.snap")
+
+
+# Зоопарк с журналом и записанным первым снимком
+@pytest.fixture
+def journaled_zoo(zoo, snap_path):
+    zoo.enable_journal(snap_path)
+    assert zoo.save_zoo(snap_path)  # Первое сохранение пишет полный снимок
+    return zoo
@@ -0,0 +1,22 @@
+"""
+Планировщик звуков (SoundScheduler): ошибка микшера в фоновом потоке
+не оставляет планировщик с «занятым» потоком.
+"""
+
+# Импорт необходимых модулей
+import zoo_audio
+from zoo_audio import SoundScheduler
+
+
+# После ошибки пула каналов поток сбрасывается, и следующий вызов запускает новый
+def test_worker_is_cleared_after_error(monkeypatch):
+    monkeypatch.setattr(zoo_audio, "pygame", None)  # Микшер недоступен: _pool() завершится ошибкой
+    scheduler = SoundScheduler(bank=None)
+    # Повторный вызов не добавляет звук (он ещё в очереди), но снова запускает поток
+    for added in (1, 0):
+        assert scheduler.schedule(["bird_sound.mp3"]) == added
+        worker = scheduler._worker
+        assert worker is not None
+        worker.join(timeout=5)
+        assert scheduler._worker is None
+    assert scheduler.pending == 1
@@ -0,0 +1,56 @@
+"""
+Планировщик ухода (CareScheduler): задания достаются раньше всех
+освобождающимся сотрудникам нужной должности, нагрузка ровная, а наём
+и увольнение между вызовами run() учитываются.
+"""
+
+# Импорт необходимых модулей
+from zoo_care import CareScheduler, FEED, HEAL
+from zoo_models import Bird, ZooKeeper, Veterinarian
+
+
+# Кормления делятся поровну между смотрителями, осмотры выполняет ветеринар
+def test_day_is_balanced(zoo):
+    zoo.add_animals([Bird(f"Птица {number}", 1) for number in range(10)])
+    zoo.add_staff_bulk([ZooKeeper("Пётр"), Veterinarian("Айболит")])
+    scheduler = CareScheduler(zoo)
+    planned = scheduler.plan_day(day=0, checkup_days=1)
+    scheduler.run()
+    assert planned == 12 * 3 + 12
+    assert (scheduler.assigned, scheduler.unassigned, scheduler.skipped, scheduler.pending) == (planned, 0, 0, 0)
+    loads = {name: tasks for _, _, name, tasks, _ in scheduler.load_table()}
+    assert loads == {"Иван": 18, "Пётр": 18, "Айболит": 12}
+
+
+# Без ветеринаров осмотры не назначаются, а удалённое животное пропускается
+def test_unassigned_and_skipped(zoo):
+    scheduler = CareScheduler(zoo)
+    bobik = zoo.find_animal("Бобик").entity_id
+    scheduler.add_task(HEAL, bobik, due=9 * 60)
+    scheduler.add_task(FEED, bobik, due=9 * 60)
+    scheduler.add_task(FEED, zoo.find_animal("Кеша").entity_id, due=9 * 60)
+    zoo.remove_entity(bobik)
+    scheduler.run()
+    assert (scheduler.assigned, scheduler.unassigned, scheduler.skipped) == (1, 1, 1)
+
+
+# Сотрудники, нанятые или уволенные между вызовами run(), учитываются, занятость сохраняется
+def test_staff_changes_between_runs(zoo):
+    kesha = zoo.find_animal("Кеша").entity_id
+    ivan = zoo.find_staff("Иван").entity_id
+    scheduler = CareScheduler(zoo)
+    scheduler.add_task(FEED, kesha, due=8 * 60)
+    scheduler.run(until=9 * 60)
+    assert scheduler.per_staff == {ivan: 1}
+    # Иван занят до 8:02, поэтому следующее кормление в 8:00 достаётся новому смотрителю
+    petr = zoo.add_staff(ZooKeeper("Пётр"))
+    scheduler.add_task(FEED, kesha, due=8 * 60)
+    scheduler.run()
+    assert scheduler.per_staff == {ivan: 1, petr: 1}
+    assert scheduler.wait_minutes == 0
+    # Уволенный сотрудник больше не получает заданий
+    zoo.remove_entity(petr)
+    for _ in range(3):
+        scheduler.add_task(FEED, kesha, due=10 * 60)
+    scheduler.run()
+    assert scheduler.per_staff == {ivan: 4, petr: 1}
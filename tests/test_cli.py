@@ -0,0 +1,92 @@
+"""
+Командная строка (zoo_cli): добавление, вывод, изменение и удаление через
+журнал рядом с файлом, импорт, преобразование в другие форматы и коды
+завершения при ошибках.
+"""
+
+# Импорт необходимых модулей
+import json
+
+import pytest
+
+import zoo_cli
+from zoo_models import Zoo
+
+
+# Запуск команды: (код завершения, вывод, вывод ошибок)
+@pytest.fixture
+def cli(monkeypatch, capsys):
+    # Лог процесса тестов не перенастраивается
+    monkeypatch.setattr(zoo_cli, "configure_logging", lambda *args, **kwargs: None)
+
+    def run(*argv):
+        code = zoo_cli.main([str(argument) for argument in argv])
+        out, err = capsys.readouterr()
+        return code, out, err
+
+    return run
+
+
+# Добавление в новый файл, изменение и удаление сохраняются в журнал и видны при загрузке
+def test_add_edit_delete(cli, snap_path):
+    code, out, _ = cli(snap_path, "add", "птица", "Кеша", "2")
+    assert code == 0
+    kesha = int(out)
+    assert cli(snap_path, "add", "ZooKeeper", "Иван")[0] == 0
+    code, out, _ = cli(snap_path, "edit", kesha, "--name", "Иннокентий", "--age", "3")
+    assert (code, out) == (0, f"{kesha}\tBird\tИннокентий\t3.0\n")
+    code, _, err = cli(snap_path, "delete", kesha, 999)
+    assert code == 1 and "999" in err
+    loaded = Zoo.load_zoo(snap_path)
+    assert [record[2] for record in loaded.staff.records()] == ["Иван"]
+    assert len(loaded.animals) == 0
+
+
+# Вывод списков в CSV и JSONL с фильтром по подстроке, классу и возрасту
+def test_list_and_filter(cli, zoo, snap_path):
+    zoo.enable_journal(snap_path)
+    assert zoo.save_zoo(snap_path)
+    code, out, _ = cli(snap_path, "list", "--format", "csv")
+    assert code == 0
+    assert out.splitlines() == ["id,type,name,age", "1,Bird,Кеша,2.0", "2,Mammal,Бобик,24.0", "3,ZooKeeper,Иван,"]
+    code, out, _ = cli(snap_path, "filter", "БОБ", "--format", "jsonl")
+    assert [json.loads(line)["name"] for line in out.splitlines()] == ["Бобик"]
+    code, out, _ = cli(snap_path, "list", "--class", "птица", "--max-age", "12")
+    assert out == "1\tBird\tКеша\t2.0\n"
+    code, out, _ = cli(snap_path, "list", "--kind", "staff", "--limit", "1")
+    assert out == "3\tZooKeeper\tИван\t\n"
+
+
+# Импорт с ошибочной строкой завершается кодом 1, но добавленные строки сохраняются
+def test_import_reports_skipped_rows(cli, tmp_path, snap_path):
+    source = tmp_path / "animals.csv"
+    source.write_text("type,name,age\nBird,Гоша,3\nBird,Плохой,abc\n", encoding="utf-8")
+    code, out, err = cli(snap_path, "import", source)
+    assert code == 1
+    assert "Строка 3" in err and "животных 1" in out
+    assert Zoo.load_zoo(snap_path).find_animal("Гоша") is not None
+
+
+# Преобразование в базу SQLite и pickle сохраняет сущности
+@pytest.mark.parametrize("extension", ["db", "pkl"])
+def test_convert(cli, zoo, snap_path, tmp_path, entity_set, extension):
+    zoo.enable_journal(snap_path)
+    assert zoo.save_zoo(snap_path)
+    destination = str(tmp_path / f"copy.{extension}")
+    code = cli(snap_path, "convert", destination, *(["--to", "pickle"] if extension == "pkl" else []))[0]
+    assert code == 0
+    loaded = Zoo.load_zoo(destination)
+    assert entity_set(loaded) == entity_set(zoo)
+    if loaded.storage is not None:
+        loaded.storage.close()
+
+
+# Отсутствующий файл и неверные аргументы - код 1 и сообщение в stderr
+def test_errors(cli, snap_path):
+    code, _, err = cli(snap_path, "list")
+    assert code == 1 and "не найден" in err
+    cli(snap_path, "add", "Bird", "Кеша", "2")
+    code, _, err = cli(snap_path, "edit", 1)
+    assert code == 1 and "--name" in err
+    code, _, err = cli(snap_path, "add", "Dragon", "Змей", "5")
+    assert code == 1 and "Dragon" in err
@@ -0,0 +1,50 @@
+"""
+Федерация зоопарков (ZooFederation): диапазоны возрастов из индексов
+возраста совпадают с перебором таблицы, а сравнение с последовательной
+загрузкой пропускается, если работает один процесс.
+"""
+
+# Импорт необходимых модулей
+import math
+
+import pytest
+
+import zoo_federation
+from benchmarks.synthetic import make_zoo
+from zoo_federation import ZooFederation
+
+
+# Два файла зоопарков во временном каталоге
+@pytest.fixture
+def zoo_files(tmp_path):
+    files = []
+    for seed in (1, 2):
+        path = str(tmp_path / f"zoo{seed}.snap")
+        zoo = make_zoo(500, seed=seed)
+        zoo.remove_entity(zoo.animals.ids()[0])  # Свободная строка таблицы не учитывается
+        assert zoo.save_zoo(path)
+        files.append((path, zoo))
+    return files
+
+
+# Количество, границы и среднее возраста по классам - как при переборе всех животных
+def test_age_ranges_match_brute_force(zoo_files):
+    expected = {}
+    for _, zoo in zoo_files:
+        for _, class_name, _, age in zoo.animals.records():
+            expected.setdefault(class_name, []).append(age)
+    with ZooFederation([path for path, _ in zoo_files], workers=2) as federation:
+        ranges = federation.age_ranges()
+    assert set(ranges) == set(expected)
+    for class_name, ages in expected.items():
+        count, low, high, mean = ranges[class_name]
+        assert (count, low, high) == (len(ages), min(ages), max(ages))
+        assert math.isclose(mean, sum(ages) / len(ages))
+
+
+# С одним процессом ускорение не измеряется
+def test_compare_skipped_with_one_process(zoo_files, monkeypatch, capsys):
+    monkeypatch.setattr(zoo_federation, "configure_logging", lambda *args, **kwargs: None)
+    assert zoo_federation.main([zoo_files[0][0], "--workers", "1", "--compare"]) == 0
+    out = capsys.readouterr().out
+    assert "Сравнение пропущено" in out and "ускорение" not in out
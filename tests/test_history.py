@@ -0,0 +1,82 @@
+"""
+Отмена и повтор изменений (ZooHistory): каждая запись об изменении
+отменяется своей обратной записью и повторяется исходной.
+"""
+
+# Импорт необходимых модулей
+import pytest
+
+from zoo_models import Zoo, Bird, Mammal, Reptile, ZooKeeper, Veterinarian
+
+
+# Изменения каждого вида (операция записи -> изменение зоопарка)
+CHANGES = {
+    "add_animal": lambda zoo: zoo.add_animal(Reptile("Гена", 36)),
+    "add_staff": lambda zoo: zoo.add_staff(Veterinarian("Айболит")),
+    "add_animals": lambda zoo: zoo.add_animals([Bird("Чижик", 1), Mammal("Мурка", 5)]),
+    "add_staff_bulk": lambda zoo: zoo.add_staff_bulk([ZooKeeper("Пётр"), Veterinarian("Пилюлькин")]),
+    "update_name": lambda zoo: zoo.update_entity(zoo.find_animal("Кеша").entity_id, name="Иннокентий"),
+    "update_age": lambda zoo: zoo.update_entity(zoo.find_animal("Бобик").entity_id, age=25),
+    "update_staff": lambda zoo: zoo.update_entity(zoo.find_staff("Иван").entity_id, name="Иван Петрович"),
+    "remove_animal": lambda zoo: zoo.remove_entity(zoo.find_animal("Бобик").entity_id),
+    "remove_staff": lambda zoo: zoo.remove_entity(zoo.staff.search("", "ZooKeeper")[0]),
+}
+
+
+# Отмена возвращает зоопарк к состоянию до изменения, повтор - к состоянию после
+@pytest.mark.parametrize("change", list(CHANGES))
+def test_undo_redo_each_change(change, zoo, history, entity_set):
+    before = entity_set(zoo)
+    CHANGES[change](zoo)
+    after = entity_set(zoo)
+    assert history.can_undo
+    assert history.undo() is not None
+    assert entity_set(zoo) == before
+    assert history.can_redo
+    assert history.redo() is not None
+    assert entity_set(zoo) == after
+    # Повторная отмена после повтора
+    history.undo()
+    assert entity_set(zoo) == before
+
+
+# Группа изменений отменяется и повторяется одним шагом в обратном порядке
+def test_group_undo_redo(zoo, history, entity_set):
+    before = entity_set(zoo)
+    with history.group("всё сразу"):
+        for change in CHANGES.values():
+            change(zoo)
+    after = entity_set(zoo)
+    assert history.undo() == "всё сразу"
+    assert entity_set(zoo) == before
+    assert not history.can_undo
+    assert history.redo() == "всё сразу"
+    assert entity_set(zoo) == after
+
+
+# Отмена и повтор доходят до журнала как обычные изменения
+def test_undo_is_journaled(journaled_zoo, history, snap_path, entity_set):
+    journaled_zoo.remove_entity(journaled_zoo.find_animal("Кеша").entity_id)
+    history.undo()
+    assert journaled_zoo.save_zoo(snap_path)
+    assert entity_set(Zoo.load_zoo(snap_path)) == entity_set(journaled_zoo)
+
+
+# Замена зоопарка целиком очищает историю
+def test_replace_clears_history(zoo, history):
+    zoo.add_animal(Bird("Гоша", 3))
+    zoo.replace_with(Zoo("Другой"))
+    assert not history.can_undo
+    assert history.undo() is None
+
+
+# Восстановленная отменой сущность занимает в результатах поиска место по своему ID
+@pytest.mark.parametrize("count", [3, 40])
+def test_undo_remove_keeps_search_order(count, zoo, history):
+    zoo.add_animals([Bird(f"Птица {i}", i + 1) for i in range(count)])
+    zoo.remove_entity(zoo.find_animal("Кеша").entity_id)
+    history.undo()
+    for text in ("", "а", "Кеша"):
+        found = zoo.animals.search(text)
+        assert found == sorted(found)
+    assert zoo.search_entities("")[0] == sorted(zoo.animals.ids())
@@ -0,0 +1,64 @@
+"""
+Потоковый импорт (ZooImporter): CSV с разными разделителями и BOM, JSONL,
+пропуск ошибочных строк, пачки записей и обратимость экспорта.
+"""
+
+# Импорт необходимых модулей
+import pytest
+
+from zoo_models import Zoo, ZooImporter
+
+
+# CSV с BOM, точкой с запятой и русскими названиями видов; ошибочные строки пропускаются
+def test_csv_with_aliases_and_errors(zoo, tmp_path):
+    path = tmp_path / "import.csv"
+    path.write_text("\ufeffType;Name;Age\n"
+                    "птица;Гоша;3\n"
+                    "Reptile;Гена;36.5\n"
+                    "ветеринар;Айболит;\n"
+                    "Dragon;Змей;100\n"
+                    "Mammal;;5\n"
+                    "Mammal;Мурка;-1\n", encoding="utf-8")
+    importer = zoo.import_file(str(path))
+    assert (importer.rows, importer.animals, importer.staff, importer.skipped) == (6, 2, 1, 3)
+    assert [error.split(":")[0] for error in importer.errors] == ["Строка 5", "Строка 6", "Строка 7"]
+    assert zoo.find_animal("Гена").age == 36.5
+    assert zoo.find_staff("Айболит").__class__.__name__ == "Veterinarian"
+    assert importer.bytes_read == importer.total_bytes
+
+
+# JSONL: повреждённая строка и не-объект пропускаются, пустые строки не считаются
+def test_jsonl(zoo, tmp_path):
+    path = tmp_path / "import.jsonl"
+    path.write_text('{"type": "Bird", "name": "Чижик", "age": 1}\n'
+                    '\n'
+                    '{"type": "zookeeper", "name": "Пётр"}\n'
+                    '{"type": "Bird", "name": \n'
+                    '[1, 2]\n', encoding="utf-8")
+    importer = zoo.import_file(str(path))
+    assert (importer.rows, importer.animals, importer.staff, importer.skipped) == (4, 1, 1, 2)
+    assert zoo.find_staff("Пётр") is not None
+
+
+# Пачки по chunk_rows строк добавляются отдельными пакетными записями
+def test_chunks_notify_once_per_batch(zoo, tmp_path):
+    path = tmp_path / "import.csv"
+    path.write_text("type,name,age\n" + "".join(f"Bird,Птица {i},{i + 1}\n" for i in range(5)), encoding="utf-8")
+    records = []
+    zoo.add_listener(records.append)
+    ZooImporter(zoo, chunk_rows=2).import_file(str(path))
+    assert [len(record["items"]) for record in records] == [2, 2, 1]
+    assert {record["op"] for record in records} == {"add_animals"}
+
+
+# Экспортированный файл импортируется в пустой зоопарк с теми же сущностями
+@pytest.mark.parametrize("extension", ["csv", "jsonl"])
+def test_export_import_round_trip(zoo, tmp_path, extension):
+    path = str(tmp_path / f"zoo.{extension}")
+    zoo.export_file(path)
+    copy = Zoo("Копия")
+    copy.import_file(path)
+    assert sorted(record[1:] for record in copy.animals.records()) == \
+        sorted(record[1:] for record in zoo.animals.records())
+    assert sorted(record[1:] for record in copy.staff.records()) == \
+        sorted(record[1:] for record in zoo.staff.records())
@@ -0,0 +1,121 @@
+"""
+Журнал изменений (ZooJournal): дописывание, воспроизведение при загрузке
+и восстановление после сбоев (оборванная последняя строка, сбой между
+заменой снимка и очисткой журнала).
+"""
+
+# Импорт необходимых модулей
+import os
+
+from zoo_models import Zoo, ZooJournal, ZooSnapshot, Bird, Mammal, Reptile, Veterinarian
+
+
+# Вспомогательная функция: изменения всех видов после снимка
+def change_everything(zoo):
+    ids = zoo.add_animals([Reptile("Гена", 36), Bird("Чижик", 1)])
+    zoo.add_staff_bulk([Veterinarian("Айболит")])
+    zoo.update_entity(ids[0], name="Геннадий", age=37)
+    zoo.remove_entity(ids[1])
+    zoo.remove_entity(zoo.find_staff("Иван").entity_id)
+
+
+# Изменения после снимка дописываются в журнал и воспроизводятся при загрузке
+def test_journal_appends_and_replays(journaled_zoo, snap_path, entity_set):
+    snapshot_size = os.path.getsize(snap_path)
+    change_everything(journaled_zoo)
+    assert journaled_zoo.save_zoo(snap_path)
+    # Снимок не переписан, изменения лежат в журнале
+    assert os.path.getsize(snap_path) == snapshot_size
+    assert os.path.getsize(snap_path + ZooJournal.SUFFIX) > 0
+    loaded = Zoo.load_zoo(snap_path)
+    assert entity_set(loaded) == entity_set(journaled_zoo)
+    assert loaded.change_seq == journaled_zoo.change_seq
+
+
+# Записи с номером не больше change_seq снимка пропускаются
+def test_replay_skips_records_already_in_snapshot(journaled_zoo, snap_path, entity_set):
+    change_everything(journaled_zoo)
+    assert journaled_zoo.save_zoo(snap_path)
+    journal_path = snap_path + ZooJournal.SUFFIX
+    with open(journal_path, 'rb') as file:
+        lines = file.readlines()
+    # Повтор уже применённых строк журнала не меняет зоопарк
+    with open(journal_path, 'ab') as file:
+        file.writelines(lines)
+    loaded = Zoo.load_zoo(snap_path)
+    assert entity_set(loaded) == entity_set(journaled_zoo)
+
+
+# Сбой между заменой снимка и очисткой журнала: старые записи журнала уже в снимке
+def test_crash_between_rename_and_truncate(journaled_zoo, snap_path, entity_set):
+    change_everything(journaled_zoo)
+    assert journaled_zoo.save_zoo(snap_path)
+    # Новый снимок записан (временный файл заменил старый), а журнал не очищен
+    ZooSnapshot.write(journaled_zoo, snap_path)
+    assert os.path.getsize(snap_path + ZooJournal.SUFFIX) > 0
+    loaded = Zoo.load_zoo(snap_path, journaled=True)
+    assert entity_set(loaded) == entity_set(journaled_zoo)
+    # Дальнейшие изменения дописываются после старых записей и тоже воспроизводятся
+    loaded.add_animal(Bird("Гоша", 3))
+    assert loaded.save_zoo(snap_path)
+    assert entity_set(Zoo.load_zoo(snap_path)) == entity_set(loaded)
+
+
+# Оборванная последняя строка (сбой во время дописывания) пропускается
+def test_torn_tail_is_ignored(journaled_zoo, snap_path, entity_set):
+    change_everything(journaled_zoo)
+    assert journaled_zoo.save_zoo(snap_path)
+    expected = entity_set(journaled_zoo)
+    with open(snap_path + ZooJournal.SUFFIX, 'ab') as file:
+        file.write(b'{"op": "add_animal", "id": 99, "type": "Bi')
+    # Воспроизведение сообщает о повреждении, но применяет все целые записи
+    snapshot = ZooSnapshot.load(snap_path)
+    applied, clean = ZooJournal.replay(snapshot, snap_path + ZooJournal.SUFFIX)
+    assert applied > 0 and not clean
+    assert entity_set(snapshot) == expected
+    # Журнал с повреждённым хвостом при следующем сохранении сворачивается в снимок
+    loaded = Zoo.load_zoo(snap_path, journaled=True)
+    assert entity_set(loaded) == expected
+    loaded.add_animal(Mammal("Мурка", 5))
+    assert loaded.save_zoo(snap_path)
+    assert os.path.getsize(snap_path + ZooJournal.SUFFIX) == 0
+    assert entity_set(Zoo.load_zoo(snap_path)) == entity_set(loaded)
+
+
+# Сворачивание журнала, когда он становится больше снимка
+def test_compaction_empties_journal(journaled_zoo, snap_path, entity_set):
+    animal_id = journaled_zoo.find_animal("Кеша").entity_id
+    for number in range(3000):
+        journaled_zoo.update_entity(animal_id, name=f"Кеша {number}")
+    assert journaled_zoo.save_zoo(snap_path)
+    assert os.path.getsize(snap_path + ZooJournal.SUFFIX) == 0
+    assert entity_set(Zoo.load_zoo(snap_path)) == entity_set(journaled_zoo)
+
+
+# Снимок в рабочем потоке (begin_save) для зоопарка, отображённого из этого же файла
+def test_background_snapshot_of_mapped_zoo(journaled_zoo, snap_path, entity_set):
+    loaded = Zoo.load_zoo(snap_path)
+    assert loaded.animals.table.source_path == os.path.abspath(snap_path)
+    loaded.enable_journal(snap_path)  # Новый журнал начинается с полного снимка
+    loaded.add_animal(Bird("Гоша", 3))
+    work, finish = loaded.journal.begin_save()
+    # Изменение во время записи снимка попадает в следующее сохранение
+    loaded.add_animal(Reptile("Тортилла", 300))
+    assert work()
+    assert not finish(True)
+    assert loaded.journal.pending_count == 1
+    # Отображённая таблица по-прежнему читается после замены файла
+    assert loaded.find_animal("Кеша") is not None
+    assert loaded.save_zoo(snap_path)
+    assert entity_set(Zoo.load_zoo(snap_path)) == entity_set(loaded)
+
+
+# Изменение через представление животного (animal.age = ...) записывается в журнал
+def test_view_edits_are_journaled(journaled_zoo, snap_path, entity_set):
+    animal = journaled_zoo.find_animal("Кеша")
+    animal.age = 50
+    animal.name = "Иннокентий"
+    assert journaled_zoo.journal.pending_count == 2
+    assert journaled_zoo.save_zoo(snap_path)
+    assert entity_set(Zoo.load_zoo(snap_path)) == entity_set(journaled_zoo)
+    assert (animal.entity_id, "Bird", "Иннокентий", 50.0) in entity_set(journaled_zoo)[0]
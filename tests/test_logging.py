@@ -0,0 +1,67 @@
+"""
+Настройка лога (configure_logging): синхронный лог пишет индекс пачками,
+а настройки модуля logging для всего процесса меняются только по явному
+параметру fast_records.
+"""
+
+# Импорт необходимых модулей
+import logging
+import sqlite3
+
+import pytest
+
+import zoo_logging
+from zoo_logging import configure_logging, log_index
+
+
+# Путь к логу во временном каталоге; прежние обработчики и настройки logging восстанавливаются
+@pytest.fixture
+def log_path(tmp_path):
+    root_logger = logging.getLogger()
+    handlers, level = list(root_logger.handlers), root_logger.level
+    yield str(tmp_path / "zoo_log.txt")
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+        handler.close()
+    zoo_logging._log_index = None
+    for handler in handlers:
+        root_logger.addHandler(handler)
+    root_logger.setLevel(level)
+    (logging._srcfile, logging.logThreads,
+     logging.logProcesses, logging.logMultiprocessing) = zoo_logging._RECORD_DEFAULTS
+
+
+# Количество записей, уже записанных в базу индекса
+def _stored(path):
+    connection = sqlite3.connect(path + ".index")
+    try:
+        return connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    finally:
+        connection.close()
+
+
+# Синхронный лог пишет индекс пачками, а поиск видит и ещё не записанные записи
+def test_sync_index_is_batched(log_path):
+    configure_logging(log_path, echo=False, index=True, batch_size=3)
+    logging.info("Животное %s покормлено", "Кеша")
+    logging.info("Животное %s покормлено", "Бобик")
+    assert _stored(log_path) == 0
+    assert [row[4] for row in log_index().query(name="КЕША")] == ["Животное Кеша покормлено"]
+    assert _stored(log_path) == 2
+    for number in range(3):
+        logging.info("Запись %d", number)
+    assert _stored(log_path) == 5
+    logging.info("Последняя запись")
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+    assert _stored(log_path) == 6
+
+
+# Сбор потока и места вызова отключается только по явному запросу и возвращается обратно
+def test_fast_records_is_explicit(log_path):
+    configure_logging(log_path, echo=False)
+    assert logging.logThreads and logging._srcfile is not None
+    configure_logging(log_path, echo=False, fast_records=True)
+    assert not logging.logThreads and logging._srcfile is None
+    configure_logging(log_path, echo=False)
+    assert logging.logThreads and logging._srcfile is not None
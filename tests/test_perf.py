@@ -0,0 +1,29 @@
+"""
+Замеры времени (PerfMonitor): запись только при включённых замерах,
+одно имя на операцию и неизменные классы моделей.
+"""
+
+# Импорт необходимых модулей
+from zoo_models import Zoo
+from zoo_perf import PerfMonitor
+
+
+# Обёртка записывает вызовы только при включённых замерах, классы моделей не меняются
+def test_timed_records_only_when_enabled():
+    monitor = PerfMonitor(slow_ms=0.0)
+    methods = dict(Zoo.__dict__)
+
+    @monitor.timed("add_animal")
+    def handler(value):
+        return value * 2
+
+    assert handler(1) == 2
+    assert monitor.snapshot() == []
+    monitor.enable()
+    assert Zoo.__dict__ == methods
+    assert handler(2) == 4
+    monitor.disable()
+    handler(3)
+    rows = monitor.snapshot()
+    assert [(row["name"], row["count"]) for row in rows] == [("add_animal", 1)]
+    assert rows[0]["slow"][0]["args"] == "2"
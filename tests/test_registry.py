@@ -0,0 +1,70 @@
+"""
+Реестр сущностей (EntityRegistry, AnimalRegistry): стабильные ID, индексы
+по имени и по классу при добавлении, переименовании и удалении, ленивые
+индексы реестра из файла.
+"""
+
+# Импорт необходимых модулей
+from zoo_models import Zoo, Bird, Mammal, ZooKeeper, Veterinarian
+
+
+# ID общие для животных и сотрудников и не повторяются после удаления
+def test_ids_are_unique_and_stable(zoo):
+    ids = zoo.animals.ids() + zoo.staff.ids()
+    assert len(set(ids)) == len(ids) == 3
+    removed = zoo.find_animal("Бобик").entity_id
+    zoo.remove_entity(removed)
+    assert zoo.add_animal(Mammal("Бобик", 24)) > max(ids)
+    assert zoo.get_entity(removed) is None
+    assert zoo.get_entity(zoo.find_staff("Иван").entity_id).name == "Иван"
+
+
+# Индекс по имени хранит все сущности с повторяющимся именем в порядке добавления
+def test_duplicate_names(zoo):
+    second = zoo.add_animal(Bird("Кеша", 5))
+    first = zoo.find_animal("Кеша").entity_id
+    assert [animal.entity_id for animal in zoo.animals.find_all_by_name("Кеша")] == [first, second]
+    zoo.remove_entity(first)
+    assert zoo.find_animal("Кеша").entity_id == second
+
+
+# Переименование переносит ID в индексе по имени и в поисковом индексе
+def test_rename_reindexes(zoo):
+    kesha = zoo.find_animal("Кеша").entity_id
+    zoo.update_entity(kesha, name="Иннокентий")
+    assert zoo.find_animal("Кеша") is None
+    assert zoo.find_animal("Иннокентий").entity_id == kesha
+    assert zoo.animals.search("кент") == [kesha]
+    assert zoo.animals.search("кеш") == []
+
+
+# Индекс по классу и подсчёт по классам следуют за добавлением и удалением
+def test_class_index(zoo):
+    zoo.add_staff_bulk([Veterinarian("Айболит"), ZooKeeper("Пётр")])
+    assert zoo.staff.count_by_class() == {"ZooKeeper": 2, "Veterinarian": 1}
+    zoo.remove_entity(zoo.find_staff("Айболит").entity_id)
+    assert zoo.staff.count_by_class() == {"ZooKeeper": 2}
+    assert [member.name for member in zoo.staff.of_class("ZooKeeper")] == ["Иван", "Пётр"]
+    assert zoo.animals.count_by_class() == {"Bird": 1, "Mammal": 1}
+
+
+# ID сохраняются в файле pickle, а новые ID продолжают счётчик
+def test_ids_survive_pickle(zoo, tmp_path, entity_set):
+    path = str(tmp_path / "zoo.pkl")
+    assert zoo.save_zoo(path)
+    loaded = Zoo.load_zoo(path)
+    assert entity_set(loaded) == entity_set(zoo)
+    assert loaded.add_animal(Bird("Гоша", 3)) == zoo.add_animal(Bird("Гоша", 3))
+
+
+# Реестр из снимка строит индексы при первом обращении и затем поддерживает их
+def test_lazy_indexes_of_loaded_registry(zoo, snap_path):
+    zoo.enable_journal(snap_path)
+    assert zoo.save_zoo(snap_path)
+    loaded = Zoo.load_zoo(snap_path)
+    assert not loaded.animals._has_index("_by_name")
+    assert loaded.find_animal("Бобик").age == 24
+    assert loaded.animals._has_index("_by_name")
+    loaded.update_entity(loaded.find_animal("Бобик").entity_id, name="Шарик")
+    assert loaded.find_animal("Шарик") is not None
+    assert loaded.animals.count_by_class() == {"Bird": 1, "Mammal": 1}
@@ -0,0 +1,64 @@
+"""
+Поиск по подстроке имени (NameSearchIndex и search_entities): совпадение
+с полным перебором для коротких и длинных запросов, ограничение классом
+и возрастом, уточнение прошлого результата и обновление индекса при правках.
+"""
+
+# Импорт необходимых модулей
+import pytest
+
+from benchmarks.synthetic import make_zoo
+
+
+# Запросы: короче триграммы, ровно триграмма, длиннее, заглавные буквы и отсутствующие
+QUERIES = ["", "а", "ка", "мур", "ШАми", "линпе", "ёж", "zzz"]
+
+
+# Зоопарк из синтетических имён с частыми общими слогами
+@pytest.fixture(scope="module")
+def big_zoo():
+    return make_zoo(3000, seed=7)
+
+
+# Вспомогательная функция: ожидаемые ID полным перебором
+def brute_force(registry, text, class_name=None):
+    return [entity_id for entity_id, entity_class, name, _ in sorted(registry.records())
+            if text.lower() in name.lower() and class_name in (None, entity_class)]
+
+
+# Индекс находит те же ID, что и перебор, по возрастанию ID
+@pytest.mark.parametrize("text", QUERIES)
+@pytest.mark.parametrize("class_name", [None, "Bird", "Veterinarian"])
+def test_search_matches_brute_force(big_zoo, text, class_name):
+    assert big_zoo.animals.search(text, class_name) == brute_force(big_zoo.animals, text, class_name)
+    assert big_zoo.staff.search(text, class_name) == brute_force(big_zoo.staff, text, class_name)
+
+
+# Уточнение прошлого результата более длинным запросом равно новому поиску
+def test_refine_matches_new_search(big_zoo):
+    found = big_zoo.search_entities("ка")
+    refined = big_zoo.search_entities("кам", within=found)
+    assert refined == big_zoo.search_entities("кам")
+
+
+# Фильтр по возрасту возвращает животных диапазона в порядке возраста
+def test_search_with_age_range(big_zoo):
+    animal_ids, staff_ids = big_zoo.search_entities("ро", age_min=24, age_max=48)
+    ages = [big_zoo.animals.get(entity_id).age for entity_id in animal_ids]
+    assert staff_ids == []
+    assert ages == sorted(ages) and all(24 <= age <= 48 for age in ages)
+    expected = {entity_id for entity_id, _, name, age in big_zoo.animals.records()
+                if "ро" in name.lower() and 24 <= age <= 48}
+    assert set(animal_ids) == expected
+
+
+# Добавление, переименование и удаление сразу видны в поиске
+def test_index_follows_changes(zoo):
+    kesha = zoo.find_animal("Кеша").entity_id
+    assert zoo.search_entities("еш") == ([kesha], [])
+    zoo.update_entity(kesha, name="Попугай Кеша")
+    assert zoo.search_entities("попу") == ([kesha], [])
+    assert zoo.search_entities("кеша") == ([kesha], [])
+    zoo.remove_entity(kesha)
+    assert zoo.search_entities("кеш") == ([], [])
+    assert zoo.search_entities("ван") == ([], [zoo.find_staff("Иван").entity_id])
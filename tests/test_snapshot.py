@@ -0,0 +1,55 @@
+"""
+Двоичный снимок ZOOSNAP1 (ZooSnapshot): запись, загрузка через отображение
+файла в память и перезапись файла, из которого загружен зоопарк.
+"""
+
+# Импорт необходимых модулей
+import pytest
+
+from zoo_models import Zoo, ZooSnapshot, Bird, Mammal, Reptile, Veterinarian
+
+
+# Зоопарк со всеми видами сущностей и удалённой строкой таблицы
+@pytest.fixture
+def mixed_zoo(zoo):
+    zoo.name = "Зоопарк №1"
+    zoo.add_animals([Reptile("Тортилла", 300), Bird("Ёж 🦔", 1.5)])
+    zoo.add_staff(Veterinarian("Айболит"))
+    zoo.remove_entity(zoo.find_animal("Бобик").entity_id)  # Свободная строка не попадает в снимок
+    return zoo
+
+
+# Снимок сохраняет сущности, ID, название, номер изменения и счётчик ID
+def test_snapshot_round_trip(mixed_zoo, snap_path, entity_set):
+    ZooSnapshot.write(mixed_zoo, snap_path)
+    with open(snap_path, 'rb') as file:
+        assert file.read(len(ZooSnapshot.MAGIC)) == ZooSnapshot.MAGIC
+    assert ZooSnapshot.is_snapshot(snap_path)
+    loaded = Zoo.load_zoo(snap_path)
+    assert entity_set(loaded) == entity_set(mixed_zoo)
+    assert loaded.name == mixed_zoo.name
+    assert loaded.change_seq == mixed_zoo.change_seq
+    # Новые ID продолжают счётчик, а не повторяют занятые
+    assert loaded.add_animal(Mammal("Мурка", 5)) == mixed_zoo.add_animal(Mammal("Мурка", 5))
+
+
+# Файл pickle снимком не считается
+def test_pickle_is_not_snapshot(mixed_zoo, tmp_path):
+    path = str(tmp_path / "zoo.pkl")
+    assert mixed_zoo.save_zoo(path)
+    assert not ZooSnapshot.is_snapshot(path)
+
+
+# Зоопарк, отображённый из файла, изменяется и записывается в тот же файл
+def test_rewrite_mapped_file(mixed_zoo, snap_path, tmp_path, entity_set):
+    ZooSnapshot.write(mixed_zoo, snap_path)
+    loaded = Zoo.load_zoo(snap_path)
+    kesha = loaded.find_animal("Кеша").entity_id
+    loaded.update_entity(kesha, name="Иннокентий", age=3)
+    loaded.add_animal(Reptile("Гена", 36))
+    ZooSnapshot.write(loaded, snap_path)
+    assert entity_set(Zoo.load_zoo(snap_path)) == entity_set(loaded)
+    # Копия зоопарка (snapshot) записывается так же, как сам зоопарк
+    other = str(tmp_path / "copy.snap")
+    ZooSnapshot.write(loaded.snapshot(), other)
+    assert entity_set(Zoo.load_zoo(other)) == entity_set(loaded)
@@ -0,0 +1,92 @@
+"""
+Хранилище SQLite (SqliteStorage): полная запись и запись отдельных
+изменений, фильтр запросом к базе (триграммный индекс и перебор коротких
+подстрок), подключение базы прежней версии без триграммного индекса.
+"""
+
+# Импорт необходимых модулей
+import sqlite3
+
+import pytest
+
+from zoo_models import Zoo, ZooStorage, SqliteStorage, Bird, Reptile, Veterinarian
+
+
+# Путь к базе во временном каталоге теста
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "zoo.db")
+
+
+# Зоопарк, записанный в базу и загруженный из неё (фильтр выполняет база)
+@pytest.fixture
+def stored_zoo(zoo, db_path):
+    zoo.attach_storage(SqliteStorage(db_path))
+    assert zoo.save_zoo(db_path)
+    zoo.storage.close()
+    loaded = Zoo.load_zoo(db_path)
+    yield loaded
+    if loaded.storage is not None:
+        loaded.storage.close()
+
+
+# Хранилище без обязательных методов нельзя создать
+def test_incomplete_backend_fails_on_creation(db_path):
+    class Incomplete(ZooStorage):
+        def load(self):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete(db_path)
+
+
+# Изменения после загрузки записываются отдельными строками и видны при следующей загрузке
+def test_incremental_save(stored_zoo, db_path, entity_set):
+    ids = stored_zoo.add_animals([Reptile("Гена", 36), Bird("Чижик", 1)])
+    stored_zoo.add_staff(Veterinarian("Айболит"))
+    stored_zoo.update_entity(ids[0], name="Геннадий", age=37)
+    stored_zoo.remove_entity(ids[1])
+    assert stored_zoo.storage.pending_count == 4
+    assert stored_zoo.save_zoo(db_path)
+    assert stored_zoo.storage.is_current
+    loaded = Zoo.load_zoo(db_path)
+    assert entity_set(loaded) == entity_set(stored_zoo)
+    assert loaded.change_seq == stored_zoo.change_seq
+    loaded.storage.close()
+
+
+# Фильтр базы совпадает с фильтром индексов в памяти и следует за сохранёнными изменениями
+@pytest.mark.parametrize("text", ["", "к", "еш", "кеша", "ОБИ", "иннок", "нет такого"])
+def test_search_in_database(stored_zoo, db_path, text):
+    kesha = stored_zoo.find_animal("Кеша").entity_id
+    stored_zoo.update_entity(kesha, name="Иннокентий Кеша")
+    assert stored_zoo.save_zoo(db_path)
+    found = stored_zoo.storage.search(text)
+    storage, stored_zoo.storage = stored_zoo.storage, None
+    try:
+        assert found == stored_zoo.search_entities(text)
+    finally:
+        stored_zoo.storage = storage
+
+
+# Несохранённые изменения есть только в памяти - база фильтр не выполняет
+def test_search_falls_back_while_dirty(stored_zoo):
+    stored_zoo.add_animal(Bird("Гоша", 3))
+    assert stored_zoo.storage.search("гош") is None
+    assert len(stored_zoo.search_entities("гош")[0]) == 1
+
+
+# База прежней версии получает триграммный индекс при первом подключении
+def test_old_database_gets_trigram_index(stored_zoo, db_path):
+    stored_zoo.storage.close()
+    connection = sqlite3.connect(db_path)
+    for trigger in SqliteStorage.SEARCH_TRIGGERS:
+        connection.execute(f"DROP TRIGGER {trigger}")
+    connection.execute("DROP TABLE entities_search")
+    connection.commit()
+    connection.close()
+    loaded = Zoo.load_zoo(db_path)
+    try:
+        assert loaded.storage.search("боби") == ([loaded.find_animal("Бобик").entity_id], [])
+    finally:
+        loaded.storage.close()
@@ -0,0 +1,21 @@
+"""
+Запуск без побочных эффектов: импорт модулей программы не загружает
+графическую библиотеку и не настраивает лог.
+"""
+
+# Импорт необходимых модулей
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+# Модули импортируются в отдельном процессе, чтобы проверить именно их зависимости
+@pytest.mark.parametrize("module", ["main", "zoo_models", "zoo_cli"])
+def test_import_does_not_load_tkinter(module):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = (f"import logging, sys; import {module}; "
+            "print('tkinter' in sys.modules, bool(logging.getLogger().handlers))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert output.stdout.split() == ["False", "False"]
@@ -0,0 +1,223 @@
+"""
+Звуки животных. Библиотека pygame импортируется, а микшер инициализируется
+при первом обращении к звуку (init_audio), а не при импорте модуля.
+"""
+
+# Импорт необходимых модулей
+import logging  # Модуль для логирования событий
+import threading  # Фоновая загрузка звуков и планировщик голосов
+import time  # Модуль для пауз планировщика звуков
+from collections import OrderedDict, deque  # Кэш звуков с вытеснением и очередь голосов
+
+# Библиотека pygame (None - ещё не загружена или не установлена)
+pygame = None
+# Доступность звука: None - ещё не проверялась, True/False - результат init_audio()
+pygame_available = None
+# Защита от одновременной инициализации из окна и фоновых потоков
+_audio_lock = threading.Lock()
+
+
+# Функция для инициализации звука при первом использовании
+def init_audio():
+    """
+    Импортирует pygame и инициализирует микшер при первом вызове. Повторные
+    вызовы сразу возвращают сохранённый результат: True, если звук доступен.
+    """
+    global pygame, pygame_available
+    if pygame_available is not None:
+        return pygame_available
+    with _audio_lock:
+        if pygame_available is None:
+            # Попытка импорта библиотеки pygame для работы со звуками
+            try:
+                import pygame as pygame_module  # Импорт библиотеки pygame
+
+                pygame_module.mixer.init()  # Инициализация звукового модуля pygame
+                pygame = pygame_module
+                pygame_available = True  # Установка флага доступности pygame
+            except ImportError:  # Обработка ошибки, если pygame не установлен
+                pygame_available = False  # Установка флага недоступности pygame
+                print("Pygame не установлен, звуки отключены")  # Вывод сообщения об ошибке в консоль
+            except Exception as e:  # Нет звукового устройства
+                pygame_available = False
+                logging.warning(f"Не удалось инициализировать звук: {e}")
+    return pygame_available
+
+
+# Класс SoundBank - кэш декодированных звуков животных
+class SoundBank:
+    """
+    Кэш звуков: файл каждого вида декодируется один раз в буфер pygame.mixer.Sound
+    и затем воспроизводится из памяти. Когда общий размер буферов превышает
+    budget_bytes, вытесняются звуки, которые дольше всех не воспроизводились.
+    preload() заранее загружает звуки в фоновом потоке.
+    """
+
+    # Бюджет памяти для буферов звуков по умолчанию, в байтах
+    DEFAULT_BUDGET_BYTES = 32 * 1024 * 1024
+
+    # Конструктор класса SoundBank
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes  # Бюджет памяти в байтах
+        self._sounds = OrderedDict()  # Файл -> (Sound, размер в байтах), от давно использованных к недавним
+        self._size = 0  # Общий размер буферов в байтах
+        self._lock = threading.Lock()  # Защита кэша от одновременной загрузки из фонового потока
+
+    # Вспомогательный метод: размер декодированного буфера в байтах
+    @staticmethod
+    def _buffer_size(sound):
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency) * channels * (abs(sample_format) // 8)
+
+    # Метод для получения звука (файл декодируется только при первом обращении)
+    def get(self, filename):
+        with self._lock:
+            entry = self._sounds.get(filename)
+            if entry is not None:
+                self._sounds.move_to_end(filename)  # Звук снова стал недавним
+                return entry[0]
+        # Декодирование вне блокировки, чтобы не задерживать воспроизведение других звуков
+        sound = pygame.mixer.Sound(filename)
+        size = self._buffer_size(sound)
+        with self._lock:
+            entry = self._sounds.get(filename)
+            if entry is not None:
+                return entry[0]  # Звук уже загрузил другой поток
+            self._sounds[filename] = (sound, size)
+            self._size += size
+            self._evict()
+        return sound
+
+    # Вспомогательный метод: вытеснение давно не использованных звуков сверх бюджета
+    def _evict(self):
+        # Последний загруженный звук остаётся, даже если он один больше бюджета
+        while self._size > self.budget_bytes and len(self._sounds) > 1:
+            filename, (sound, size) = self._sounds.popitem(last=False)
+            self._size -= size
+            logging.info(f"Звук {filename} вытеснен из кэша")
+
+    # Метод для воспроизведения звука из кэша
+    def play(self, filename):
+        self.get(filename).play()
+
+    # Метод для фоновой загрузки звуков (не блокирует окно)
+    def preload(self, filenames):
+        # Инициализация звука и загрузка звуков по очереди в фоновом потоке
+        def load_all():
+            if not init_audio():
+                return
+            for filename in filenames:
+                try:
+                    self.get(filename)
+                except Exception as e:  # Отсутствующий файл не мешает загрузке остальных
+                    logging.warning(f"Не удалось загрузить звук {filename}: {e}")
+
+        thread = threading.Thread(target=load_all, name="zoo-sound-preload", daemon=True)
+        thread.start()
+        return thread
+
+    # Общий размер загруженных буферов в байтах
+    @property
+    def size_bytes(self):
+        return self._size
+
+    # Количество загруженных звуков
+    def __len__(self):
+        return len(self._sounds)
+
+
+# Класс SoundScheduler - воспроизведение многих звуков на пуле каналов микшера
+class SoundScheduler:
+    """
+    Планировщик воспроизведения на фиксированном пуле каналов микшера. Звуки
+    группируются по файлу (то есть по виду): вид звучит один раз, сколько бы
+    животных его ни издавало. Одновременно звучит не больше max_voices голосов,
+    остальные ждут в очереди и запускаются фоновым потоком по мере освобождения
+    каналов, поэтому schedule() возвращается сразу.
+    """
+
+    # Размер пула каналов по умолчанию
+    DEFAULT_CHANNELS = 8
+    # Пауза между проверками освободившихся каналов, в секундах
+    POLL_SECONDS = 0.02
+
+    # Конструктор класса SoundScheduler
+    def __init__(self, bank, channels=DEFAULT_CHANNELS, max_voices=None):
+        self.bank = bank  # Кэш звуков
+        self.channel_count = channels  # Размер пула каналов
+        self.max_voices = min(max_voices or channels, channels)  # Предел одновременно звучащих голосов
+        self._channels = None  # Каналы микшера (создаются при первом воспроизведении)
+        self._queue = deque()  # Файлы звуков, ожидающие свободного канала
+        self._lock = threading.Lock()  # Защита очереди
+        self._worker = None  # Фоновый поток, запускающий голоса
+
+    # Вспомогательный метод: пул каналов микшера
+    def _pool(self):
+        if self._channels is None:
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), self.channel_count))
+            self._channels = [pygame.mixer.Channel(index) for index in range(self.channel_count)]
+        return self._channels
+
+    # Метод для постановки звуков в очередь (повторы отбрасываются, возвращает число новых голосов)
+    def schedule(self, filenames):
+        with self._lock:
+            queued = set(self._queue)
+            added = 0
+            for filename in filenames:
+                if filename not in queued:
+                    self._queue.append(filename)
+                    queued.add(filename)
+                    added += 1
+            # Запуск фонового потока, если он ещё не работает
+            if self._queue and self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="zoo-sound-scheduler", daemon=True)
+                self._worker.start()
+        return added
+
+    # Вспомогательный метод: тело фонового потока - запуск голосов на свободных каналах
+    def _run(self):
+        try:
+            channels = self._pool()
+            while True:
+                with self._lock:
+                    if not self._queue:
+                        self._worker = None  # Очередь пуста - поток завершается
+                        return
+                    free = [channel for channel in channels if not channel.get_busy()]
+                    busy = len(channels) - len(free)
+                    starts = []
+                    while self._queue and free and busy < self.max_voices:
+                        starts.append((self._queue.popleft(), free.pop()))
+                        busy += 1
+                # Декодирование (при промахе кэша) и запуск вне блокировки
+                for filename, channel in starts:
+                    try:
+                        channel.play(self.bank.get(filename))
+                    except Exception as e:  # Ошибка одного звука не останавливает остальные
+                        logging.warning(f"Не удалось воспроизвести звук {filename}: {e}")
+                time.sleep(self.POLL_SECONDS)
+        except Exception as e:  # Ошибка микшера - поток завершается, очередь остаётся
+            logging.warning(f"Планировщик звуков остановлен: {e}")
+        finally:
+            with self._lock:
+                # Следующий schedule() запустит новый поток (если этот ещё числится рабочим)
+                if self._worker is threading.current_thread():
+                    self._worker = None
+
+    # Метод для остановки воспроизведения и очистки очереди
+    def stop(self):
+        with self._lock:
+            self._queue.clear()
+        for channel in self._channels or ():
+            channel.stop()
+
+    # Количество звуков, ожидающих канала
+    @property
+    def pending(self):
+        return len(self._queue)
+
+
+# Общий кэш звуков приложения
+sound_bank = SoundBank()
+# Общий планировщик воспроизведения звуков
+sound_scheduler = SoundScheduler(sound_bank)
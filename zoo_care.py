@@ -0,0 +1,170 @@
+"""
+Планировщик ухода за животными: кормление смотрителями (ZooKeeper) и лечение
+ветеринарами (Veterinarian). Задания лежат в одной куче по сроку и приоритету,
+сотрудники каждой должности - в куче по времени освобождения, поэтому задание
+достаётся тому, кто раньше всех освободится (при равенстве - тому, у кого
+меньше заданий). Время считается в минутах от полуночи.
+"""
+
+# Импорт необходимых модулей
+import heapq  # Кучи заданий и сотрудников
+import logging  # Модуль для логирования событий
+import time  # Модуль для измерения скорости планирования
+
+from zoo_models import ZooKeeper, Veterinarian
+
+# Виды заданий
+FEED = "feed"
+HEAL = "heal"
+
+
+# Класс CareScheduler - распределение заданий ухода между сотрудниками
+class CareScheduler:
+    """
+    add_task() и plan_day() кладут задания в кучу (срок, приоритет), run()
+    раздаёт их сотрудникам нужной должности. Задание, которое до конца смены
+    не может начать ни один сотрудник, учитывается в unassigned. При act=True
+    назначенный сотрудник выполняет задание (feed_animal или heal_animal с записью
+    в лог), иначе уход только моделируется.
+    """
+
+    # Должность, выполняющая задание каждого вида
+    ROLES = {FEED: ZooKeeper, HEAL: Veterinarian}
+    # Длительность задания в минутах
+    DURATIONS = {FEED: 2, HEAL: 10}
+    # Приоритет задания (меньше - срочнее): при одинаковом сроке лечение идёт первым
+    PRIORITIES = {HEAL: 0, FEED: 1}
+    # Время кормлений по умолчанию (8:00, 13:00, 18:00)
+    FEEDINGS = (8 * 60, 13 * 60, 18 * 60)
+    # Осмотр каждого животного раз в столько дней
+    CHECKUP_DAYS = 7
+    # Смена по умолчанию (8:00 - 20:00)
+    DAY_START = 8 * 60
+    DAY_END = 20 * 60
+
+    # Конструктор класса CareScheduler
+    def __init__(self, zoo, day_start=DAY_START, day_end=DAY_END):
+        self.zoo = zoo  # Зоопарк, сотрудники которого выполняют задания
+        self.day_start = day_start  # Начало смены
+        self.day_end = day_end  # Конец смены (задания позже не начинаются)
+        self._tasks = []  # Куча заданий (срок, приоритет, порядковый номер, вид, ID животного)
+        self._seq = 0  # Порядковый номер задания (порядок при равных сроке и приоритете)
+        self.assigned = 0  # Назначено заданий
+        self.unassigned = 0  # Заданий, которые никто не успел начать
+        self.skipped = 0  # Заданий для животных, удалённых после планирования
+        self.wait_minutes = 0.0  # Суммарная задержка начала заданий относительно срока
+        self.per_staff = {}  # ID сотрудника -> количество заданий
+        self.busy_minutes = {}  # ID сотрудника -> занятость в минутах
+        self.seconds = 0.0  # Время распределения в секундах
+        self._free_at = {}  # ID сотрудника -> время освобождения (сохраняется между вызовами run() за день)
+
+    # Метод для добавления задания
+    def add_task(self, kind, animal_id, due, priority=None):
+        if kind not in self.ROLES:
+            raise ValueError(f"Неизвестный вид задания: {kind}")
+        priority = self.PRIORITIES[kind] if priority is None else priority
+        heapq.heappush(self._tasks, (due, priority, self._seq, kind, animal_id))
+        self._seq += 1
+
+    # Метод для планирования дня: кормления всех животных и осмотры части из них
+    def plan_day(self, day=0, feedings=FEEDINGS, checkup_days=CHECKUP_DAYS):
+        """
+        Добавляет задания на день day: каждое животное кормится в каждое время
+        из feedings, а осматривается раз в checkup_days дней (животные
+        распределены по дням по ID). Возвращает количество добавленных заданий.
+        """
+        seq = self._seq
+        tasks = self._tasks
+        feed_priority, heal_priority = self.PRIORITIES[FEED], self.PRIORITIES[HEAL]
+        animal_ids = self.zoo.animals.ids()
+        # Задания собираются списком и превращаются в кучу одним heapify
+        for due in feedings:
+            for animal_id in animal_ids:
+                tasks.append((due, feed_priority, seq, FEED, animal_id))
+                seq += 1
+        for animal_id in animal_ids:
+            if animal_id % checkup_days == day % checkup_days:
+                tasks.append((self.day_start, heal_priority, seq, HEAL, animal_id))
+                seq += 1
+        heapq.heapify(tasks)
+        added = seq - self._seq
+        self._seq = seq
+        return added
+
+    # Количество заданий, ожидающих распределения
+    @property
+    def pending(self):
+        return len(self._tasks)
+
+    # Вспомогательный метод: куча нынешних сотрудников должности (время освобождения, заданий, ID)
+    def _worker_heap(self, role):
+        heap = []
+        for staff_id in self.zoo.staff.search("", role.__name__):
+            heap.append((self._free_at.get(staff_id, self.day_start), self.per_staff.setdefault(staff_id, 0), staff_id))
+        heapq.heapify(heap)
+        return heap
+
+    # Метод для распределения заданий со сроком до until (None - всех)
+    def run(self, until=None, act=False):
+        started = time.perf_counter()
+        tasks = self._tasks
+        # Кучи строятся заново при каждом вызове: нанятые после прошлого вызова сотрудники
+        # получают задания, уволенные - нет, а занятость сохраняется в _free_at
+        workers = {kind: self._worker_heap(role) for kind, role in self.ROLES.items()}
+        durations = self.DURATIONS
+        day_end = self.day_end
+        per_staff = self.per_staff
+        busy_minutes = self.busy_minutes
+        animals = self.zoo.animals
+        staff = self.zoo.staff
+        while tasks and (until is None or tasks[0][0] < until):
+            due, _, _, kind, animal_id = heapq.heappop(tasks)
+            heap = workers[kind]
+            # Начать задание некому: нет сотрудников должности или все заняты до конца смены
+            if not heap or max(due, heap[0][0]) >= day_end:
+                self.unassigned += 1
+                continue
+            # Животное удалено после планирования
+            if not animals.has_id(animal_id):
+                self.skipped += 1
+                continue
+            free_at, count, staff_id = heap[0]
+            start = max(due, free_at)
+            duration = durations[kind]
+            # Сотрудник освобождается после задания и возвращается в кучу
+            heapq.heapreplace(heap, (start + duration, count + 1, staff_id))
+            per_staff[staff_id] = count + 1
+            busy_minutes[staff_id] = busy_minutes.get(staff_id, 0) + duration
+            self.wait_minutes += start - due
+            self.assigned += 1
+            if act:
+                staff_member = staff.get(staff_id)
+                if kind == FEED:
+                    staff_member.feed_animal(animals.get(animal_id))
+                else:
+                    staff_member.heal_animal(animals.get(animal_id))
+        for heap in workers.values():
+            for free_at, _, staff_id in heap:
+                self._free_at[staff_id] = free_at
+        self.seconds += time.perf_counter() - started
+        logging.info(f"Распределение ухода: {self.summary()}")
+        return self
+
+    # Скорость распределения в заданиях в секунду
+    @property
+    def tasks_per_second(self):
+        handled = self.assigned + self.unassigned + self.skipped
+        return handled / self.seconds if self.seconds else 0.0
+
+    # Метод для получения нагрузки сотрудников (ID, должность, имя, заданий, минут)
+    def load_table(self):
+        for entity_id, class_name, name, _ in self.zoo.staff.records():
+            yield entity_id, class_name, name, self.per_staff.get(entity_id, 0), self.busy_minutes.get(entity_id, 0)
+
+    # Метод для получения итогов одной строкой
+    def summary(self):
+        counts = list(self.per_staff.values())
+        average_wait = self.wait_minutes / self.assigned if self.assigned else 0.0
+        spread = f", на сотрудника {min(counts)}-{max(counts)}" if counts else ""
+        return (f"назначено {self.assigned}, не успели {self.unassigned}, пропущено {self.skipped}, "
+                f"средняя задержка {average_wait:.1f} мин{spread}, {self.tasks_per_second:.0f} заданий/с")
@@ -0,0 +1,357 @@
+"""
+Командная строка зоопарка для пакетной работы без графического интерфейса
+(tkinter не импортируется, диалогов нет, ошибки выводятся в stderr).
+
+    python zoo_cli.py ZOO add Bird Кеша 2
+    python zoo_cli.py ZOO list --kind animals --format csv
+    python zoo_cli.py ZOO filter кеш --class Bird --limit 10
+    python zoo_cli.py ZOO list --class Reptile --min-age 24 --format csv
+    python zoo_cli.py ZOO edit 17 --name Гоша --age 3
+    python zoo_cli.py ZOO delete 17 18
+    python zoo_cli.py ZOO import animals.csv
+    python zoo_cli.py ZOO export animals.jsonl --filter кеш
+    python zoo_cli.py ZOO convert zoo.snap --to snapshot
+    python zoo_cli.py ZOO care --staff
+    python zoo_cli.py ZOO simulate --days 90 --seed 1 --set keepers=20
+
+ZOO - файл зоопарка (pickle, снимок или база SQLite .db). Изменения дописываются
+в журнал рядом с файлом, как при сохранении из окна, а в базе SQLite
+записываются отдельными строками; add и import создают новый
+зоопарк, если файла ещё нет. Списки выводятся построчно по мере чтения.
+"""
+
+# Импорт необходимых модулей
+import argparse  # Модуль для разбора аргументов командной строки
+import csv  # Модуль для вывода в CSV
+import itertools  # Модуль для ограничения количества выводимых записей
+import json  # Модуль для вывода в JSONL
+import os  # Модуль для работы с файлами
+import pickle  # Модуль для распознавания ошибок чтения файлов зоопарка
+import sqlite3  # Модуль для распознавания ошибок базы SQLite
+import sys  # Модуль для потоков вывода и кода завершения
+
+from zoo_logging import configure_logging
+from zoo_models import Zoo, Staff, ZooImporter, ZooExporter, ZooSnapshot, SqliteStorage, storage_for
+from zoo_care import CareScheduler
+from zoo_simulation import SimulationEngine
+
+# Форматы вывода списков
+OUTPUT_FORMATS = ("text", "csv", "jsonl")
+# Форматы файлов, в которые преобразуется зоопарк
+CONVERT_FORMATS = ("snapshot", "pickle", "csv", "jsonl", "columnar", "sqlite")
+
+
+# Функция для открытия файла зоопарка (create=True - новый зоопарк, если файла нет)
+def open_zoo(filename, journaled=False, create=False, name="Новый зоопарк | New Zoo"):
+    if os.path.exists(filename):
+        return Zoo.load_zoo(filename, journaled=journaled)
+    if not create:
+        raise FileNotFoundError(f"Файл зоопарка {filename} не найден")
+    zoo = Zoo(name)
+    backend = storage_for(filename)
+    if backend is not None:
+        # Первое сохранение запишет зоопарк в новую базу целиком
+        zoo.attach_storage(backend(filename))
+    else:
+        # Первое сохранение запишет полный снимок
+        zoo.enable_journal(filename)
+    return zoo
+
+
+# Функция для сохранения изменений (в журнал рядом с файлом зоопарка)
+def save_zoo(zoo, filename):
+    if not zoo.save_zoo(filename):
+        raise OSError(f"Не удалось сохранить зоопарк в {filename}")
+
+
+# Функция для выбора ID по подстроке имени, классу и виду сущностей (None - все)
+def select_ids(zoo, kind="all", text="", class_name=None, age_min=None, age_max=None):
+    animal_ids, staff_ids = [], []
+    if class_name is not None:
+        entity_class = ZooImporter(zoo).entity_class(class_name)
+        class_name = entity_class.__name__
+        # Класс определяет реестр: в другом реестре таких сущностей нет
+        kind = "staff" if issubclass(entity_class, Staff) else "animals"
+    # Без условий выбираются все записи (None), иначе фильтр выполняет индекс или база SQLite
+    # (с диапазоном возраста - только животные в порядке возраста)
+    if text or class_name or age_min is not None or age_max is not None:
+        found = zoo.search_entities(text, class_name, age_min=age_min, age_max=age_max)
+    else:
+        found = (None, None)
+    if kind in ("all", "animals"):
+        animal_ids = found[0]
+    if kind in ("all", "staff"):
+        staff_ids = found[1]
+    return animal_ids, staff_ids
+
+
+# Функция для потокового вывода записей (ID, класс, имя, возраст) в выбранном формате
+def write_records(records, output_format, out):
+    if output_format == "csv":
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(ZooExporter.FIELDS)
+        writer.writerows((entity_id, class_name, name, "" if age is None else age)
+                         for entity_id, class_name, name, age in records)
+    elif output_format == "jsonl":
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+        out.writelines(encode({"id": entity_id, "type": class_name, "name": name, "age": age}) + "\n"
+                       for entity_id, class_name, name, age in records)
+    else:
+        out.writelines(f"{entity_id}\t{class_name}\t{name}\t{'' if age is None else age}\n"
+                       for entity_id, class_name, name, age in records)
+
+
+# Функция для перебора записей выбранных ID (сначала животные, затем сотрудники)
+def selected_records(zoo, animal_ids, staff_ids, limit=None):
+    records = itertools.chain(zoo.animals.records(animal_ids) if animal_ids != [] else (),
+                              zoo.staff.records(staff_ids) if staff_ids != [] else ())
+    return records if limit is None else itertools.islice(records, limit)
+
+
+# Команда add: добавление животного или сотрудника
+def command_add(args):
+    zoo = open_zoo(args.zoo, journaled=True, create=True)
+    entity = ZooImporter(zoo).entity({"type": args.type, "name": args.name, "age": args.age})
+    if isinstance(entity, Staff):
+        zoo.add_staff(entity)
+    else:
+        zoo.add_animal(entity)
+    save_zoo(zoo, args.zoo)
+    print(entity.entity_id)
+    return 0
+
+
+# Команды list и filter: потоковый вывод сущностей
+def command_list(args):
+    zoo = open_zoo(args.zoo)
+    animal_ids, staff_ids = select_ids(zoo, args.kind, getattr(args, "text", ""), args.class_name,
+                                       args.min_age, args.max_age)
+    write_records(selected_records(zoo, animal_ids, staff_ids, args.limit), args.format, sys.stdout)
+    return 0
+
+
+# Команда edit: изменение имени и/или возраста
+def command_edit(args):
+    if args.name is None and args.age is None:
+        raise ValueError("Укажите --name и/или --age")
+    if args.name is not None and not args.name.strip():
+        raise ValueError("Имя не может быть пустым")
+    if args.age is not None and not args.age > 0:
+        raise ValueError("Возраст должен быть положительным числом")
+    zoo = open_zoo(args.zoo, journaled=True)
+    entity = zoo.update_entity(args.id, name=args.name, age=args.age)
+    if entity is None:
+        raise KeyError(f"Сущность с ID {args.id} не найдена")
+    save_zoo(zoo, args.zoo)
+    write_records(selected_records(zoo, [args.id], [args.id]), "text", sys.stdout)
+    return 0
+
+
+# Команда delete: удаление сущностей по ID
+def command_delete(args):
+    zoo = open_zoo(args.zoo, journaled=True)
+    missing = [entity_id for entity_id in args.ids if zoo.remove_entity(entity_id) is None]
+    save_zoo(zoo, args.zoo)
+    for entity_id in missing:
+        print(f"Сущность с ID {entity_id} не найдена", file=sys.stderr)
+    return 1 if missing else 0
+
+
+# Команда import: потоковый импорт из CSV или JSONL
+def command_import(args):
+    zoo = open_zoo(args.zoo, journaled=True, create=True)
+    importer = ZooImporter(zoo)
+    try:
+        importer.import_file(args.source, args.format)
+    finally:
+        # Уже добавленные пачки сохраняются даже при ошибке чтения файла
+        save_zoo(zoo, args.zoo)
+    for error in importer.errors:
+        print(error, file=sys.stderr)
+    print(importer.summary())
+    return 1 if importer.skipped else 0
+
+
+# Команда export: потоковый экспорт (всех или найденных) сущностей
+def command_export(args):
+    zoo = open_zoo(args.zoo)
+    animal_ids, staff_ids = select_ids(zoo, args.kind, args.filter, args.class_name, args.min_age, args.max_age)
+    exporter = ZooExporter(zoo).export_file(args.destination, args.format, animal_ids, staff_ids)
+    print(f"Записей: {exporter.rows} за {exporter.seconds:.2f} с")
+    return 0
+
+
+# Команда convert: запись зоопарка в другом формате
+def command_convert(args):
+    target = args.to
+    if target is None:
+        # Файлы экспорта распознаются по расширению, остальные записываются снимком
+        exported = args.destination.lower().endswith((".csv", ".jsonl", ".ndjson", ".zcol"))
+        if SqliteStorage.handles(args.destination):
+            target = "sqlite"
+        else:
+            target = ZooExporter.format_of(args.destination) if exported else "snapshot"
+    zoo = open_zoo(args.zoo, journaled=True)
+    same_file = os.path.abspath(args.destination) == os.path.abspath(args.zoo)
+    if target == "snapshot" and same_file and zoo.journal is not None:
+        # Журнал сворачивается в снимок на месте исходного файла
+        zoo.journal.compact()
+    elif target == "snapshot":
+        ZooSnapshot.write(zoo, args.destination)
+    elif target == "pickle":
+        # Без журнала и базы save_zoo записывает полный pickle (записи журнала старше снимка пропускаются)
+        if zoo.journal is not None:
+            zoo.journal.close()
+        if zoo.storage is not None:
+            zoo.storage.close()
+        save_zoo(zoo, args.destination)
+    elif target == "sqlite" and same_file and zoo.storage is not None:
+        # Исходная база уже содержит зоопарк
+        zoo.storage.save()
+    elif target == "sqlite":
+        # База записывается целиком (расширение файла может быть любым)
+        storage = SqliteStorage(args.destination)
+        try:
+            storage.write(zoo)
+        finally:
+            storage.close()
+    else:
+        ZooExporter(zoo).export_file(args.destination, target)
+    print(f"{args.zoo} -> {args.destination} ({target})")
+    return 0
+
+
+# Команда care: моделирование дня кормлений и осмотров
+def command_care(args):
+    zoo = open_zoo(args.zoo)
+    scheduler = CareScheduler(zoo)
+    planned = scheduler.plan_day(args.day)
+    scheduler.run(act=args.act)
+    print(f"Заданий {planned}: {scheduler.summary()}")
+    if args.staff:
+        sys.stdout.writelines(f"{staff_id}\t{class_name}\t{name}\t{tasks}\t{minutes}\n"
+                              for staff_id, class_name, name, tasks, minutes in scheduler.load_table())
+    return 0
+
+
+# Вспомогательная функция: параметр сценария вида имя=значение (значение - число или JSON)
+def scenario_setting(text):
+    name, separator, value = text.partition("=")
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f"ожидалось имя=значение: {text!r}")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+# Команда simulate: моделирование на много дней в пуле процессов (зоопарк не изменяется)
+def command_simulate(args):
+    zoo = open_zoo(args.zoo)
+    with SimulationEngine(zoo, workers=args.workers) as engine:
+        result = engine.run(args.days, args.seed, dict(args.settings))
+    print(result.summary())
+    if args.events:
+        sys.stdout.writelines(f"{day}\t{entity_id}\t{event}\n" for day, entity_id, event in result.events)
+    return 0
+
+
+# Функция для создания разборщика аргументов
+def build_parser():
+    parser = argparse.ArgumentParser(description="Пакетная работа с файлами зоопарка без окна")
+    parser.add_argument("zoo", help="Файл зоопарка (pickle или снимок)")
+    parser.add_argument("--log-file", default="zoo_log.txt", help="Файл лога")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # Параметры отбора и вывода, общие для list, filter и export
+    def add_selection(command, output=True):
+        command.add_argument("--kind", choices=("all", "animals", "staff"), default="all", help="Вид сущностей")
+        command.add_argument("--class", dest="class_name", help="Класс (Bird, Mammal, ..., птица, ветеринар)")
+        command.add_argument("--min-age", type=float, help="Наименьший возраст животных в месяцах (включительно)")
+        command.add_argument("--max-age", type=float, help="Наибольший возраст животных в месяцах (включительно)")
+        if output:
+            command.add_argument("--format", choices=OUTPUT_FORMATS, default="text", help="Формат вывода")
+            command.add_argument("--limit", type=int, help="Наибольшее количество записей")
+
+    command = commands.add_parser("add", help="Добавить животное или сотрудника")
+    command.add_argument("type", help="Класс (Bird, Mammal, Reptile, ZooKeeper, Veterinarian или по-русски)")
+    command.add_argument("name", help="Имя")
+    command.add_argument("age", nargs="?", help="Возраст (только для животных)")
+    command.set_defaults(handler=command_add)
+
+    command = commands.add_parser("list", help="Вывести сущности")
+    add_selection(command)
+    command.set_defaults(handler=command_list)
+
+    command = commands.add_parser("filter", help="Вывести сущности, имя которых содержит текст")
+    command.add_argument("text", help="Подстрока имени (без учёта регистра)")
+    add_selection(command)
+    command.set_defaults(handler=command_list)
+
+    command = commands.add_parser("edit", help="Изменить имя и/или возраст")
+    command.add_argument("id", type=int, help="ID сущности")
+    command.add_argument("--name", help="Новое имя")
+    command.add_argument("--age", type=float, help="Новый возраст (только для животных)")
+    command.set_defaults(handler=command_edit)
+
+    command = commands.add_parser("delete", help="Удалить сущности по ID")
+    command.add_argument("ids", type=int, nargs="+", help="ID сущностей")
+    command.set_defaults(handler=command_delete)
+
+    command = commands.add_parser("import", help="Импортировать сущности из CSV или JSONL")
+    command.add_argument("source", help="Файл CSV или JSONL")
+    command.add_argument("--format", choices=("csv", "jsonl"), help="Формат (по умолчанию - по расширению)")
+    command.set_defaults(handler=command_import)
+
+    command = commands.add_parser("export", help="Экспортировать сущности в CSV, JSONL или столбцовый файл")
+    command.add_argument("destination", help="Файл экспорта")
+    command.add_argument("--format", choices=("csv", "jsonl", "columnar"),
+                         help="Формат (по умолчанию - по расширению)")
+    command.add_argument("--filter", default="", help="Подстрока имени")
+    add_selection(command, output=False)
+    command.set_defaults(handler=command_export)
+
+    command = commands.add_parser("convert", help="Записать зоопарк в другом формате")
+    command.add_argument("destination", help="Файл результата")
+    command.add_argument("--to", choices=CONVERT_FORMATS,
+                         help="Формат (по умолчанию - по расширению, иначе снимок)")
+    command.set_defaults(handler=command_convert)
+
+    command = commands.add_parser("care", help="Смоделировать день кормлений и осмотров")
+    command.add_argument("--day", type=int, default=0, help="Номер дня (определяет, кого осматривают)")
+    command.add_argument("--act", action="store_true", help="Выполнять задания (каждое пишется в лог)")
+    command.add_argument("--staff", action="store_true", help="Вывести нагрузку каждого сотрудника")
+    command.set_defaults(handler=command_care)
+
+    command = commands.add_parser("simulate", help="Смоделировать старение, кормление и лечение на много дней")
+    command.add_argument("--days", type=int, default=30, help="Количество дней")
+    command.add_argument("--seed", type=int, default=0, help="Зерно генератора (результат не зависит от --workers)")
+    command.add_argument("--workers", type=int, help="Количество процессов (по умолчанию - по числу ядер)")
+    command.add_argument("--set", dest="settings", type=scenario_setting, action="append", default=[],
+                         help="Параметр сценария, например keepers=20 или sick_chance=0.002")
+    command.add_argument("--events", action="store_true", help="Вывести события (день, ID, событие)")
+    command.set_defaults(handler=command_simulate)
+    return parser
+
+
+# Главная функция (возвращает код завершения)
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Лог пишется в файл; консоль остаётся для результатов команды
+    configure_logging(args.log_file, async_mode=True, echo=False, fast_records=True)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # Вывод оборван (например, | head) - это не ошибка
+        sys.stdout = open(os.devnull, "w")
+        return 0
+    except KeyError as e:
+        print(f"Ошибка: {e.args[0]}", file=sys.stderr)
+        return 1
+    except (OSError, ValueError, pickle.UnpicklingError, sqlite3.Error) as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
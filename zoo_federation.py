@@ -0,0 +1,279 @@
+"""
+Федерация зоопарков: много файлов зоопарков открываются одновременно в пуле
+рабочих процессов, и каждый зоопарк остаётся в памяти своего процесса.
+Запросы (количество по классам, диапазоны возрастов, поиск по имени)
+рассылаются всем процессам, а частичные ответы по файлам объединяются
+здесь, поэтому зоопарки никогда не сливаются в один объект.
+
+    python zoo_federation.py last_zoo.pkl zoo_data.pkl Зоопарк1.pkl зоо2.pkl --search ка --compare
+"""
+
+# Импорт необходимых модулей
+import argparse  # Модуль для разбора аргументов командной строки
+import logging  # Модуль для логирования событий
+import math  # Бесконечности для пустых диапазонов возрастов
+import multiprocessing  # Рабочие процессы федерации
+import os  # Размеры файлов и количество процессоров
+import sys  # Модуль для кода завершения
+import time  # Модуль для измерения времени загрузки
+
+from zoo_logging import configure_logging
+from zoo_models import Zoo
+
+
+# Вспомогательная функция: количество животных и сотрудников по классам одного зоопарка
+def _count_by_class(zoo):
+    counts = zoo.animals.count_by_class()
+    counts.update(zoo.staff.count_by_class())
+    return counts
+
+
+# Вспомогательная функция: диапазоны возрастов по классам (класс -> (количество, мин, макс, сумма))
+def _age_ranges(zoo):
+    animals = zoo.animals
+    # Упорядоченные индексы возраста строятся при первом запросе и остаются в памяти процесса
+    return {class_name: animals.age_stats(class_name)
+            for class_name, count in animals.count_by_class().items() if count}
+
+
+# Вспомогательная функция: записи (ID, класс, имя, возраст), имя которых содержит text
+def _search(zoo, text, class_name=None, limit=None):
+    animal_ids = zoo.animals.search(text, class_name)
+    staff_ids = zoo.staff.search(text, class_name)
+    if limit is not None:
+        animal_ids = animal_ids[:limit]
+        staff_ids = staff_ids[:max(0, limit - len(animal_ids))]
+    return list(zoo.animals.records(animal_ids)) + list(zoo.staff.records(staff_ids))
+
+
+# Запросы, которые умеют выполнять рабочие процессы
+QUERIES = {"count_by_class": _count_by_class, "age_ranges": _age_ranges, "search": _search}
+
+
+# Вспомогательная функция: загрузка файла (имя файла -> (зоопарк или None, сведения))
+def _load(filename):
+    started = time.perf_counter()
+    try:
+        zoo = Zoo.load_zoo(filename)
+    except Exception as e:  # Повреждённый файл не мешает остальным
+        return None, {"error": str(e)}
+    return zoo, {"name": zoo.name, "animals": len(zoo.animals), "staff": len(zoo.staff),
+                 "seconds": time.perf_counter() - started}
+
+
+# Функция рабочего процесса: зоопарки процесса и ответы на запросы из канала
+def serve(connection, filenames):
+    """
+    Загружает filenames, отправляет сведения о загрузке (файл -> сведения)
+    и затем отвечает на запросы (имя запроса, аргументы) словарём файл -> ответ,
+    пока не получит None.
+    """
+    logging.disable(logging.INFO)  # Рабочие процессы не пишут в лог родителя
+    zoos = {}
+    info = {}
+    for filename in filenames:
+        zoo, info[filename] = _load(filename)
+        if zoo is not None:
+            zoos[filename] = zoo
+    connection.send(info)
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        name, args = request
+        query = QUERIES[name]
+        try:
+            connection.send({filename: query(zoo, *args) for filename, zoo in zoos.items()})
+        except Exception as e:  # Ошибка запроса передаётся родителю
+            connection.send(e)
+    connection.close()
+
+
+# Класс ZooFederation - запросы к нескольким зоопаркам, загруженным в разных процессах
+class ZooFederation:
+    """
+    Используется как контекстный менеджер:
+
+        with ZooFederation(["last_zoo.pkl", "zoo_data.pkl"]) as federation:
+            federation.count_by_class()
+
+    Файлы распределяются между workers процессами (самые большие - первыми,
+    каждому процессу - наименее загруженный), загружаются параллельно и остаются
+    в памяти процессов до close(). Ответы перечисляют файлы в порядке filenames.
+    """
+
+    # Конструктор класса ZooFederation
+    def __init__(self, filenames, workers=None):
+        self.filenames = list(dict.fromkeys(filenames))  # Файлы без повторов
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(self.filenames)))  # Количество процессов
+        self.files = {}  # Файл -> сведения о загрузке (название, животных, сотрудников, секунд)
+        self.errors = {}  # Файл -> сообщение об ошибке загрузки
+        self.load_seconds = 0.0  # Время параллельной загрузки
+        self.sequential_seconds = None  # Время последовательной загрузки (measure_sequential)
+        self._processes = []  # Пары (процесс, канал)
+
+    # Вход в контекстный менеджер (файлы загружаются)
+    def __enter__(self):
+        return self.load()
+
+    # Выход из контекстного менеджера (рабочие процессы завершаются)
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Вспомогательный метод: распределение файлов между процессами по размеру
+    def _assign(self):
+        shares = [[] for _ in range(self.workers)]
+        loads = [0] * self.workers
+        sizes = {filename: os.path.getsize(filename) if os.path.exists(filename) else 0
+                 for filename in self.filenames}
+        for filename in sorted(self.filenames, key=sizes.get, reverse=True):
+            index = loads.index(min(loads))
+            shares[index].append(filename)
+            loads[index] += sizes[filename]
+        return [share for share in shares if share]
+
+    # Метод для параллельной загрузки файлов
+    def load(self):
+        if self._processes:
+            return self
+        started = time.perf_counter()
+        for share in self._assign():
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=serve, args=(child, share), name="zoo-federation", daemon=True)
+            process.start()
+            child.close()
+            self._processes.append((process, parent))
+        loaded = {}
+        for _, connection in self._processes:
+            loaded.update(connection.recv())
+        self.load_seconds = time.perf_counter() - started
+        for filename in self.filenames:
+            info = loaded[filename]
+            if "error" in info:
+                self.errors[filename] = info["error"]
+            else:
+                self.files[filename] = info
+        logging.info(f"Федерация: загружено файлов {len(self.files)} из {len(self.filenames)} "
+                     f"за {self.load_seconds:.2f} с в {len(self._processes)} процессах")
+        return self
+
+    # Метод для завершения рабочих процессов
+    def close(self):
+        for process, connection in self._processes:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+            process.join()
+        self._processes = []
+
+    # Количество работающих процессов
+    @property
+    def process_count(self):
+        return len(self._processes)
+
+    # Вспомогательный метод: запрос ко всем процессам (файл -> ответ в порядке filenames)
+    def _query(self, name, *args):
+        self.load()
+        for _, connection in self._processes:
+            connection.send((name, args))
+        # Ответы читаются из всех каналов до проверки ошибок, иначе непрочитанный
+        # ответ остался бы в канале и был бы принят за ответ на следующий запрос
+        replies = [connection.recv() for _, connection in self._processes]
+        answers = {}
+        for answer in replies:
+            if isinstance(answer, Exception):
+                raise answer
+            answers.update(answer)
+        return {filename: answers[filename] for filename in self.filenames if filename in answers}
+
+    # Метод для подсчёта сущностей по классам (per_file=True - отдельно для каждого файла)
+    def count_by_class(self, per_file=False):
+        answers = self._query("count_by_class")
+        if per_file:
+            return answers
+        total = {}
+        for counts in answers.values():
+            for class_name, count in counts.items():
+                total[class_name] = total.get(class_name, 0) + count
+        return total
+
+    # Метод для получения диапазонов возрастов (класс -> (количество, мин, макс, среднее))
+    def age_ranges(self):
+        merged = {}
+        for ranges in self._query("age_ranges").values():
+            for class_name, (count, low, high, total) in ranges.items():
+                entry = merged.setdefault(class_name, [0, math.inf, -math.inf, 0.0])
+                entry[0] += count
+                entry[1] = min(entry[1], low)
+                entry[2] = max(entry[2], high)
+                entry[3] += total
+        return {class_name: (count, low, high, total / count)
+                for class_name, (count, low, high, total) in merged.items()}
+
+    # Метод для поиска по подстроке имени во всех зоопарках (список (файл, ID, класс, имя, возраст))
+    def search(self, text, class_name=None, limit=None):
+        results = []
+        for filename, records in self._query("search", text, class_name, limit).items():
+            results.extend((filename,) + record for record in records)
+        return results if limit is None else results[:limit]
+
+    # Метод для замера последовательной загрузки тех же файлов в этом процессе
+    def measure_sequential(self):
+        started = time.perf_counter()
+        for filename in self.filenames:
+            _load(filename)
+        self.sequential_seconds = time.perf_counter() - started
+        return self.sequential_seconds
+
+    # Ускорение параллельной загрузки относительно последовательной
+    @property
+    def speedup(self):
+        if not self.sequential_seconds or not self.load_seconds:
+            return None
+        return self.sequential_seconds / self.load_seconds
+
+
+# Главная функция
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Запросы к нескольким файлам зоопарков сразу")
+    parser.add_argument("files", nargs="+", help="Файлы зоопарков")
+    parser.add_argument("--workers", type=int, help="Количество процессов (по умолчанию - по числу ядер)")
+    parser.add_argument("--search", help="Подстрока имени для поиска во всех зоопарках")
+    parser.add_argument("--class", dest="class_name", help="Класс для поиска")
+    parser.add_argument("--limit", type=int, default=20, help="Наибольшее количество найденных записей")
+    parser.add_argument("--compare", action="store_true", help="Сравнить с последовательной загрузкой")
+    parser.add_argument("--log-file", default="zoo_log.txt", help="Файл лога")
+    args = parser.parse_args(argv)
+
+    configure_logging(args.log_file, echo=False)
+    with ZooFederation(args.files, args.workers) as federation:
+        for filename, info in federation.files.items():
+            print(f"{filename}: {info['name']}, животных {info['animals']}, сотрудников {info['staff']}, "
+                  f"{info['seconds']:.3f} с")
+        for filename, error in federation.errors.items():
+            print(f"{filename}: ошибка загрузки: {error}", file=sys.stderr)
+        print(f"Загрузка: {federation.load_seconds:.3f} с, процессов {federation.process_count}")
+        if args.compare and federation.process_count < 2:
+            # Один процесс загружает файлы так же, как последовательная загрузка
+            print("Сравнение пропущено: файлы загружены одним процессом")
+        elif args.compare:
+            federation.measure_sequential()
+            print(f"Последовательно: {federation.sequential_seconds:.3f} с, ускорение {federation.speedup:.2f}x")
+        print("Количество по классам:")
+        for class_name, count in sorted(federation.count_by_class().items()):
+            print(f"  {class_name}\t{count}")
+        print("Возраст по классам (количество, мин, макс, среднее):")
+        for class_name, (count, low, high, mean) in sorted(federation.age_ranges().items()):
+            print(f"  {class_name}\t{count}\t{low:g}\t{high:g}\t{mean:.1f}")
+        if args.search is not None:
+            print(f"Поиск {args.search!r}:")
+            for filename, entity_id, class_name, name, age in federation.search(args.search, args.class_name,
+                                                                                args.limit):
+                print(f"  {filename}\t{entity_id}\t{class_name}\t{name}\t{'' if age is None else age}")
+    return 1 if federation.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+"""
+Настройка лога зоопарка. Импорт модуля ничего не настраивает: лог
+включается вызовом configure_logging() из точки входа программы.
+
+Файл лога может ротироваться по размеру или по времени, а старые части
+сжимаются в gzip. Индекс лога (база SQLite рядом с файлом) хранит записи
+по времени, уровню и именам сущностей, поэтому просмотр истории одного
+животного не читает файлы лога.
+"""
+
+# Импорт необходимых модулей
+import logging  # Модуль для логирования событий
+import logging.handlers  # Обработчик очереди для фонового логирования
+import atexit  # Остановка фонового логирования при завершении программы
+import gzip  # Сжатие старых частей лога
+import os  # Модуль для удаления несжатых частей лога
+import queue  # Очередь записей фонового лога
+import shutil  # Копирование части лога в архив
+import sqlite3  # Индекс лога
+import sys  # Поток консоли для дублирования действий
+import threading  # Фоновый поток записи лога
+import time  # Отсечение старых записей индекса
+
+# Журнал действий животных и сотрудников (эти записи дублируются в консоль)
+activity_log = logging.getLogger("zoo.activity")
+
+# Размер файла лога, после которого он ротируется (по умолчанию в программе)
+LOG_MAX_BYTES = 1024 * 1024
+# Количество хранимых сжатых частей лога
+LOG_BACKUPS = 5
+# Сколько дней записи хранятся в индексе лога
+LOG_INDEX_DAYS = 90
+# Наибольшее время (в секундах), которое запись синхронного лога ждёт записи в индекс
+LOG_INDEX_FLUSH_SECONDS = 1.0
+
+# Настройки модуля logging, действующие до configure_logging(fast_records=True)
+_RECORD_DEFAULTS = (logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing)
+
+
+# Вспомогательная функция: имя сжатой части лога
+def _gzip_namer(name):
+    return name + ".gz"
+
+
+# Вспомогательная функция: сжатие части лога при ротации
+def _gzip_rotator(source, dest):
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+# Класс LogIndex - индекс записей лога в базе SQLite
+class LogIndex:
+    """
+    Записи хранятся с временем и уровнем, а имена сущностей - отдельной
+    таблицей с индексом. Имена сущностей - строковые аргументы записи,
+    поэтому сообщения о животных и сотрудниках пишутся в виде
+    logging.info("Животное %s ...", name), а не f-строкой.
+    Отдельные записи (append()) накапливаются и пишутся одной транзакцией,
+    когда их набирается batch_size или самая старая ждёт дольше
+    LOG_INDEX_FLUSH_SECONDS; query() и close() дописывают накопленное.
+    """
+
+    # Схема индекса
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY,
+            created REAL NOT NULL,
+            level INTEGER NOT NULL,
+            logger TEXT NOT NULL,
+            message TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_created ON entries (created);
+        CREATE INDEX IF NOT EXISTS entries_level_created ON entries (level, created);
+        CREATE TABLE IF NOT EXISTS entry_names (name_key TEXT NOT NULL, entry INTEGER NOT NULL);
+        CREATE INDEX IF NOT EXISTS entry_names_key ON entry_names (name_key, entry);
+    """
+
+    # Конструктор класса LogIndex
+    def __init__(self, filename, batch_size=512):
+        self.filename = filename  # Файл базы индекса
+        self.batch_size = batch_size  # Количество отложенных записей, после которого они пишутся
+        self._pending = []  # Отложенные записи, ещё не записанные в базу
+        self._pending_since = 0.0  # Время появления самой старой отложенной записи
+        # Запись идёт из фонового потока лога, запросы - из окна
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(self.SCHEMA)
+        self._lock = threading.Lock()  # Защита соединения
+
+    # Статический метод для получения имён сущностей записи (строковые аргументы в нижнем регистре)
+    @staticmethod
+    def entity_names(record):
+        if not isinstance(record.args, tuple):
+            return set()
+        return {arg.strip().lower() for arg in record.args if isinstance(arg, str) and arg.strip()}
+
+    # Метод для добавления записей одной транзакцией (вместе с отложенными)
+    def add(self, records):
+        with self._lock:
+            self._insert(records)
+
+    # Метод для добавления одной записи: она пишется позже вместе с другими
+    def append(self, record):
+        with self._lock:
+            now = time.monotonic()
+            if not self._pending:
+                self._pending_since = now
+            self._pending.append(record)
+            # Пачка пишется, когда набралась или самая старая запись ждёт слишком долго
+            if len(self._pending) >= self.batch_size or now - self._pending_since >= LOG_INDEX_FLUSH_SECONDS:
+                self._insert(())
+
+    # Метод для записи отложенных записей в базу
+    def flush(self):
+        with self._lock:
+            self._insert(())
+
+    # Вспомогательный метод: запись отложенных и новых записей одной транзакцией (под блокировкой)
+    def _insert(self, records):
+        if self._pending:
+            records = self._pending + list(records)
+            self._pending = []
+        if not records:
+            return
+        with self._connection as connection:
+            for record in records:
+                cursor = connection.execute(
+                    "INSERT INTO entries (created, level, logger, message) VALUES (?, ?, ?, ?)",
+                    (record.created, record.levelno, record.name, record.getMessage()))
+                names = self.entity_names(record)
+                if names:
+                    entry = cursor.lastrowid
+                    connection.executemany("INSERT INTO entry_names (name_key, entry) VALUES (?, ?)",
+                                           [(name, entry) for name in names])
+
+    # Метод для поиска записей (новые - первыми): имя сущности, наименьший уровень, период
+    def query(self, name=None, level=None, since=None, until=None, limit=None):
+        """
+        Возвращает список (ID, время, уровень, имя лога, сообщение). name
+        сравнивается с именами сущностей без учёта регистра, level - наименьший
+        уровень (logging.WARNING - предупреждения и ошибки), since и until -
+        границы времени в секундах (time.time()).
+        """
+        sql = "SELECT entries.id, created, level, logger, message FROM entries"
+        conditions, params = [], []
+        if name:
+            sql += " JOIN entry_names ON entry_names.entry = entries.id"
+            conditions.append("entry_names.name_key = ?")
+            params.append(name.strip().lower())
+        if level is not None:
+            conditions.append("level >= ?")
+            params.append(level)
+        if since is not None:
+            conditions.append("created >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("created < ?")
+            params.append(until)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created DESC, entries.id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            self._insert(())  # Отложенные записи тоже попадают в результат
+            return self._connection.execute(sql, params).fetchall()
+
+    # Метод для удаления записей старше before (секунды time.time())
+    def prune(self, before):
+        with self._lock:
+            self._insert(())  # Отложенные записи тоже проверяются по времени
+            with self._connection as connection:
+                connection.execute("DELETE FROM entry_names WHERE entry IN (SELECT id FROM entries WHERE created < ?)",
+                                   (before,))
+                removed = connection.execute("DELETE FROM entries WHERE created < ?", (before,)).rowcount
+        return removed
+
+    # Метод для закрытия индекса (отложенные записи дописываются)
+    def close(self):
+        with self._lock:
+            self._insert(())
+            self._connection.close()
+
+
+# Класс LogIndexHandler - обработчик лога, записывающий записи в индекс
+class LogIndexHandler(logging.Handler):
+    # Конструктор класса LogIndexHandler
+    def __init__(self, index):
+        super().__init__()
+        self.index = index  # Индекс лога
+
+    # Запись одной записи (синхронный лог): индекс пишет её пачкой вместе с другими
+    def emit(self, record):
+        try:
+            self.index.append(record)
+        except Exception:  # Ошибка индекса не должна мешать программе
+            self.handleError(record)
+
+    # Запись пачки записей одной транзакцией (фоновый лог)
+    def emit_batch(self, records):
+        try:
+            self.index.add(records)
+        except Exception:  # Ошибка индекса не должна мешать программе
+            self.handleError(records[0])
+
+    # Запись отложенных записей в индекс
+    def flush(self):
+        try:
+            self.index.flush()
+        except Exception:  # Ошибка индекса не должна мешать программе
+            pass
+
+    # Закрытие обработчика вместе с индексом
+    def close(self):
+        self.index.close()
+        super().close()
+
+
+# Класс DeferredQueueHandler - передача записей лога в очередь без форматирования
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    # Запись передаётся как есть: сообщение форматируется в фоновом потоке
+    def prepare(self, record):
+        return record
+
+
+# Класс BatchLogListener - фоновая запись лога пачками
+class BatchLogListener:
+    """
+    Фоновый поток, забирающий записи лога из очереди. Всё, что накопилось
+    в очереди (до batch_size записей), форматируется здесь же и пишется
+    в каждый обработчик одной операцией записи со сбросом на диск.
+    """
+
+    # Признак остановки потока
+    _STOP = object()
+
+    # Конструктор класса BatchLogListener
+    def __init__(self, log_queue, handlers, batch_size=512):
+        self.queue = log_queue  # Очередь записей
+        self.handlers = list(handlers)  # Обработчики с открытыми потоками (файл, консоль)
+        self.batch_size = batch_size  # Наибольшее количество записей в пачке
+        self._thread = None  # Фоновый поток
+
+    # Метод для запуска фонового потока
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="zoo-log-writer", daemon=True)
+        self._thread.start()
+
+    # Метод для остановки потока (все записи из очереди будут записаны)
+    def stop(self):
+        if self._thread is not None:
+            self.queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+    # Вспомогательный метод: тело фонового потока
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]  # Ожидание первой записи
+            # Добор всего, что уже накопилось в очереди
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(record is self._STOP for record in batch)
+            self._write([record for record in batch if record is not self._STOP])
+            if stopping:
+                return
+
+    # Вспомогательный метод: запись пачки в каждый обработчик одной операцией
+    def _write(self, batch):
+        for handler in self.handlers:
+            records = [record for record in batch if record.levelno >= handler.level and handler.filter(record)]
+            if not records:
+                continue
+            # Индекс лога принимает пачку целиком
+            if hasattr(handler, "emit_batch"):
+                handler.emit_batch(records)
+                continue
+            lines = []
+            for record in records:
+                try:
+                    lines.append(handler.format(record) + handler.terminator)
+                except Exception:  # Ошибка форматирования одной записи не теряет остальные
+                    handler.handleError(record)
+            if lines:
+                with handler.lock:
+                    # Пачка пишется мимо emit(), поэтому ротация проверяется здесь (один раз на пачку)
+                    if isinstance(handler, logging.handlers.BaseRotatingHandler):
+                        try:
+                            if handler.shouldRollover(records[0]):
+                                handler.doRollover()
+                        except Exception:  # Ошибка ротации не теряет записи
+                            handler.handleError(records[0])
+                    handler.stream.write("".join(lines))
+                    handler.flush()
+
+
+# Фоновый поток записи лога (None - лог пишется синхронно)
+_log_listener = None
+# Индекс лога (None - индекс не ведётся)
+_log_index = None
+# Признак регистрации остановки фонового лога при завершении программы
+_atexit_registered = False
+
+
+# Функция для настройки системы логирования
+def configure_logging(filename="zoo_log.txt", async_mode=False, echo=True, batch_size=512,
+                      max_bytes=None, when=None, backups=LOG_BACKUPS, index=False, index_days=LOG_INDEX_DAYS,
+                      fast_records=False):
+    """
+    Настраивает лог в файл filename. При echo=True действия животных и сотрудников
+    (activity_log) дублируются в консоль. При async_mode=True вызывающий поток
+    только кладёт запись в очередь, а форматирование и запись выполняет фоновый
+    BatchLogListener пачками.
+    max_bytes (размер) или when (период TimedRotatingFileHandler, например
+    "midnight") включают ротацию: хранится backups частей, сжатых gzip.
+    При index=True записи за последние index_days дней хранятся в индексе
+    filename + ".index" (см. log_index()); синхронный лог пишет их в индекс
+    пачками по batch_size записей.
+    fast_records=True отключает сбор места вызова, потока и процесса при
+    создании записей лога. Это настройка модуля logging для всего процесса
+    (в том числе для логов сторонних библиотек), поэтому она включается
+    только точкой входа программы; форматы этого модуля эти поля не выводят.
+    При fast_records=False восстанавливаются прежние настройки logging.
+    """
+    global _log_listener, _atexit_registered, _log_index
+    shutdown_logging()  # Остановка прежнего фонового потока
+    if _log_index is not None:
+        _log_index.close()  # Прежний индекс лога
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+        handler.close()
+    root_logger.setLevel(logging.INFO)  # Уровень логирования (запись информационных сообщений)
+    # Сбор места вызова, потока и процесса (отключается только по явному запросу)
+    if fast_records:
+        logging._srcfile = None
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+    else:
+        (logging._srcfile, logging.logThreads,
+         logging.logProcesses, logging.logMultiprocessing) = _RECORD_DEFAULTS
+    # Файл лога (с ротацией - старые части сжимаются)
+    if when is not None:
+        file_handler = logging.handlers.TimedRotatingFileHandler(filename, when=when, backupCount=backups)
+    elif max_bytes:
+        file_handler = logging.handlers.RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backups)
+    else:
+        file_handler = logging.FileHandler(filename)
+    if isinstance(file_handler, logging.handlers.BaseRotatingHandler):
+        file_handler.namer = _gzip_namer
+        file_handler.rotator = _gzip_rotator
+    file_handler.setFormatter(logging.Formatter("%(asctime)s — %(levelname)s — %(message)s"))
+    handlers = [file_handler]
+    # Индекс лога (старые записи удаляются при настройке)
+    _log_index = None
+    if index:
+        try:
+            _log_index = LogIndex(filename + ".index", batch_size)
+            _log_index.prune(time.time() - index_days * 86400)
+            handlers.append(LogIndexHandler(_log_index))
+        except sqlite3.Error as e:  # Без индекса лог продолжает работать
+            _log_index = None
+            logging.warning(f"Индекс лога недоступен: {e}")
+    # Вывод действий в консоль
+    if echo:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter("%(message)s"))
+        console_handler.addFilter(logging.Filter(activity_log.name))
+        handlers.append(console_handler)
+    if async_mode:
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(DeferredQueueHandler(log_queue))
+        _log_listener = BatchLogListener(log_queue, handlers, batch_size)
+        _log_listener.start()
+        # Накопленные записи фонового лога дописываются при завершении программы
+        if not _atexit_registered:
+            atexit.register(shutdown_logging)
+            _atexit_registered = True
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
+
+
+# Функция для остановки фонового логирования (накопленные записи дописываются)
+def shutdown_logging():
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+# Функция для получения индекса лога (None - индекс не ведётся)
+def log_index():
+    return _log_index
@@ -0,0 +1,3170 @@
+"""
+Модель зоопарка: животные, сотрудники, реестры, журнал изменений, снимки,
+импорт и экспорт. Импорт модуля не имеет побочных эффектов: звук
+инициализируется при первом воспроизведении, а лог настраивает точка входа.
+"""
+
+# Импорт необходимых модулей
+import logging  # Модуль для логирования событий
+import math  # Бесконечность для границ диапазонов в упорядоченных индексах
+import os  # Модуль для работы с операционной системой
+import json  # Модуль для записей журнала изменений
+import csv  # Модуль для импорта сущностей из CSV
+import codecs  # Модуль для потокового декодирования импортируемых файлов
+import itertools  # Модуль для потоковой обработки строк импорта
+import mmap  # Модуль для отображения файлов снимков в память
+import struct  # Модуль для заголовка двоичного снимка
+import pickle  # Модуль для сериализации объектов
+import copy  # Модуль для копирования сотрудников в снимок зоопарка
+import contextlib  # Группы изменений истории
+from abc import ABC, abstractmethod  # Обязательные методы хранилищ
+import time  # Модуль для измерения скорости импорта
+import threading  # Защита соединения с базой SQLite
+import sqlite3  # Хранилище зоопарка в базе SQLite
+import sys  # Модуль для интернирования строк и измерения размеров объектов
+import weakref  # Модуль для слабых ссылок на объекты-представления
+from bisect import bisect_left, bisect_right, insort  # Двоичный поиск в упорядоченных индексах
+from array import array  # Компактные типизированные массивы для столбцов таблиц
+from collections import deque  # Кольцевой буфер истории изменений
+from operator import itemgetter  # Ключи пар упорядоченных индексов
+
+from zoo_logging import activity_log  # Журнал действий животных и сотрудников
+from zoo_audio import init_audio, sound_bank, sound_scheduler  # Звуки (инициализируются при первом использовании)
+
+
+# Класс Animal - базовый класс для всех животных в зоопарке
+class Animal:
+    """
+    Животное зоопарка. Животное, добавленное в зоопарк, - лёгкое представление
+    строки таблицы AnimalTable: имя, возраст и ID хранятся в столбцах таблицы,
+    а у объекта нет собственного __dict__. Отдельное (ещё не добавленное) животное
+    хранит свои значения в небольшом списке до добавления в зоопарк.
+    """
+
+    # Слоты вместо __dict__: таблица, номер строки, значения отдельного животного
+    __slots__ = ("_table", "_row", "_values", "__weakref__")
+
+    # Конструктор класса Animal
+    def __init__(self, name, age):
+        self._table = None  # Таблица, в которой хранится животное (None - отдельное животное)
+        self._row = None  # Номер строки в таблице
+        self._values = [name, age, None]  # Имя, возраст и ID отдельного животного
+
+    # Имя животного
+    @property
+    def name(self):
+        if self._table is None:
+            return self._values[0]
+        return self._table.names[self._row]
+
+    # Изменение имени животного
+    @name.setter
+    def name(self, value):
+        if self._table is None:
+            self._values[0] = value
+        elif self._table.on_edit is not None:
+            # Животное зоопарка: изменение проходит через зоопарк (журнал, история, автосохранение)
+            self._table.on_edit(self.entity_id, name=value)
+        else:
+            self._table.set_name(self._row, value)
+
+    # Возраст животного (в месяцах)
+    @property
+    def age(self):
+        if self._table is None:
+            return self._values[1]
+        return self._table.ages[self._row]
+
+    # Изменение возраста животного
+    @age.setter
+    def age(self, value):
+        if self._table is None:
+            self._values[1] = value
+        elif self._table.on_edit is not None:
+            # Животное зоопарка: изменение проходит через зоопарк (журнал, история, автосохранение)
+            self._table.on_edit(self.entity_id, age=value)
+        else:
+            self._table.set_age(self._row, value)
+
+    # Стабильный идентификатор, назначаемый зоопарком при добавлении (None - ещё не добавлено)
+    @property
+    def entity_id(self):
+        if self._table is None:
+            return self._values[2]
+        return self._table.ids[self._row]
+
+    # Изменение идентификатора (используется зоопарком)
+    @entity_id.setter
+    def entity_id(self, value):
+        if self._table is None:
+            self._values[2] = value
+        else:
+            self._table.set_id(self._row, value)
+
+    # Сериализация: тот же словарь name/age, что и у прежних объектов с __dict__
+    def __getstate__(self):
+        return {"name": self.name, "age": self.age, "entity_id": self.entity_id}
+
+    # Десериализация (в том числе старых файлов без entity_id)
+    def __setstate__(self, state):
+        self._table = None
+        self._row = None
+        self._values = [state["name"], state["age"], state.get("entity_id")]
+
+    # Метод для издания звука (должен быть переопределен в дочерних классах)
+    def make_sound(self):
+        pass  # Заглушка, реализация будет в наследниках
+
+    # Метод, описывающий процесс питания животного
+    def eat(self):
+        activity_log.info("%s ест.", self.name)  # Запись действия в лог и в консоль
+
+    # Метод для строкового представления объекта
+    def __str__(self):
+        # Возвращает строку с информацией о животном
+        return f"{self.__class__.__name__} - {self.name}, возраст {self.age} лет"
+
+
+# Класс Bird (Птица) - наследуется от класса Animal
+class Bird(Animal):
+    # Без __dict__: все данные хранятся в таблице животных
+    __slots__ = ()
+    # Звуковой файл вида
+    SOUND_FILE = "bird_sound.mp3"
+
+    # Реализация метода издания звука для птицы
+    def make_sound(self):
+        activity_log.info("%s чирикает.", self.name)  # Запись действия в лог и в консоль
+        # Проверка доступности звука (pygame инициализируется при первом звуке)
+        if init_audio():
+            try:
+                # Воспроизведение звука из кэша (файл декодируется один раз)
+                sound_bank.play(self.SOUND_FILE)
+            except Exception as e:  # Обработка возможных ошибок
+                # Вывод сообщения об ошибке в консоль
+                print(f"Ошибка воспроизведения звука птицы: {e}")
+
+
+# Класс Mammal (Млекопитающее) - наследуется от класса Animal
+class Mammal(Animal):
+    # Без __dict__: все данные хранятся в таблице животных
+    __slots__ = ()
+    # Звуковой файл вида
+    SOUND_FILE = "mammal_sound.mp3"
+
+    # Реализация метода издания звука для млекопитающего
+    def make_sound(self):
+        activity_log.info("%s рычит.", self.name)  # Запись действия в лог и в консоль
+        # Проверка доступности звука (pygame инициализируется при первом звуке)
+        if init_audio():
+            try:
+                # Воспроизведение звука из кэша (файл декодируется один раз)
+                sound_bank.play(self.SOUND_FILE)
+            except Exception as e:  # Обработка возможных ошибок
+                # Вывод сообщения об ошибке в консоль
+                print(f"Ошибка воспроизведения звука млекопитающего: {e}")
+
+
+# Класс Reptile (Рептилия) - наследуется от класса Animal
+class Reptile(Animal):
+    # Без __dict__: все данные хранятся в таблице животных
+    __slots__ = ()
+    # Звуковой файл вида
+    SOUND_FILE = "reptile_sound.mp3"
+
+    # Реализация метода издания звука для рептилии
+    def make_sound(self):
+        activity_log.info("%s шипит.", self.name)  # Запись действия в лог и в консоль
+        # Проверка доступности звука (pygame инициализируется при первом звуке)
+        if init_audio():
+            try:
+                # Воспроизведение звука из кэша (файл декодируется один раз)
+                sound_bank.play(self.SOUND_FILE)
+            except Exception as e:  # Обработка возможных ошибок
+                # Вывод сообщения об ошибке в консоль
+                print(f"Ошибка воспроизведения звука рептилии: {e}")
+
+
+# Класс LazyNames - столбец имён, декодируемых из снимка по требованию
+class LazyNames:
+    """
+    Список имён поверх кучи UTF-8 из файла снимка. Имя декодируется (и интернируется)
+    только при первом обращении к строке; новые и изменённые имена хранятся
+    в обычном списке. Поддерживает операции списка, нужные AnimalTable.
+    """
+
+    # Признак ещё не декодированного имени
+    _UNDECODED = object()
+
+    # Конструктор класса LazyNames
+    def __init__(self, heap, offsets):
+        self._heap = heap  # Байты имён подряд (memoryview на файл снимка)
+        self._offsets = offsets  # Смещения начала имён в куче (на одно больше, чем имён)
+        self._values = [self._UNDECODED] * (len(offsets) - 1)  # Декодированные имена
+
+    # Получение имени строки (с декодированием при первом обращении)
+    def __getitem__(self, row):
+        value = self._values[row]
+        if value is self._UNDECODED:
+            start, end = self._offsets[row], self._offsets[row + 1]
+            value = sys.intern(str(self._heap[start:end], "utf-8"))
+            self._values[row] = value
+        return value
+
+    # Запись имени строки
+    def __setitem__(self, row, value):
+        self._values[row] = value
+
+    # Добавление имени новой строки
+    def append(self, value):
+        self._values.append(value)
+
+    # Количество строк
+    def __len__(self):
+        return len(self._values)
+
+    # Перебор имён (с декодированием всех строк)
+    def __iter__(self):
+        return (self[row] for row in range(len(self._values)))
+
+    # Метод для получения копии (куча и смещения общие, декодированные имена копируются)
+    def copy(self):
+        copied = LazyNames.__new__(LazyNames)
+        copied._heap = self._heap
+        copied._offsets = self._offsets
+        copied._values = list(self._values)
+        return copied
+
+    # Метод для получения уже декодированных имён (без декодирования остальных)
+    def loaded(self):
+        undecoded = self._UNDECODED
+        return [value for value in self._values if value is not undecoded]
+
+
+# Класс AnimalTable - столбцовое хранилище животных
+class AnimalTable:
+    """
+    Хранит животных в столбцах: ID (array 'q'), код типа (array 'b'), возраст
+    в месяцах (array 'd') и список интернированных имён. Объекты Animal -
+    представления строк, создаваемые по запросу и живущие, пока на них есть ссылки.
+    Удалённые строки помечаются кодом FREE и повторно используются при добавлении.
+    Таблица, открытая из двоичного снимка, читает столбцы прямо из отображённого
+    в память файла и копирует их в массивы только при первом изменении.
+    Так же работает и разделение столбцов со снимком для фонового сохранения (share).
+    """
+
+    # Код типа свободной (удалённой) строки
+    FREE = -1
+    # Классы животных по коду типа и коды по классам (общие для всех таблиц процесса)
+    _classes = []
+    _codes = {}
+
+    # Метод класса для получения кода типа (новые классы регистрируются при первом обращении)
+    @classmethod
+    def type_code(cls, animal_class):
+        code = cls._codes.get(animal_class)
+        if code is None:
+            code = len(cls._classes)  # Следующий свободный код
+            cls._classes.append(animal_class)
+            cls._codes[animal_class] = code
+        return code
+
+    # Метод класса для получения класса животного по коду типа
+    @classmethod
+    def type_class(cls, code):
+        return cls._classes[code]
+
+    # Конструктор класса AnimalTable
+    def __init__(self):
+        self.ids = array('q')  # Столбец ID
+        self.type_codes = array('b')  # Столбец кодов типа
+        self.ages = array('d')  # Столбец возрастов в месяцах
+        self.names = []  # Столбец интернированных имён
+        self._free = []  # Номера свободных строк для повторного использования
+        self._views = weakref.WeakValueDictionary()  # Номер строки -> живое представление
+        self._count = 0  # Количество занятых строк
+        self.on_name_change = None  # Обработчик (номер строки, старое имя, новое имя)
+        self.on_age_change = None  # Обработчик (номер строки, старый возраст, новый возраст)
+        self.on_edit = None  # Изменение через представление (ID, name=..., age=...) - метод зоопарка update_entity
+        self.source_path = None  # Файл снимка, отображённый в память (None - таблица в памяти)
+        self._mapping = None  # Объект mmap файла снимка
+        self._buffers = []  # memoryview на файл снимка, освобождаемые при отключении файла
+        self._shared = False  # Столбцы разделены с копией (share) и копируются перед изменением
+        self._mapping_shared = False  # Отображение файла используется и копиями таблицы
+
+    # Метод класса для создания таблицы поверх столбцов двоичного снимка
+    @classmethod
+    def from_buffers(cls, ids, type_codes, ages, names, mapping=None, buffers=(), source_path=None):
+        table = cls()
+        table.ids = ids  # memoryview 'q' (только чтение)
+        table.type_codes = type_codes  # memoryview 'b' или массив перекодированных типов
+        table.ages = ages  # memoryview 'd' (только чтение)
+        table.names = names  # LazyNames
+        table._count = len(ids)
+        table._mapping = mapping
+        table._buffers = list(buffers)
+        table.source_path = source_path
+        return table
+
+    # Метод для получения копии таблицы только для чтения без копирования столбцов
+    def share(self):
+        """
+        Возвращает таблицу, разделяющую столбцы с этой (копирование при записи):
+        эта таблица скопирует столбцы перед первым изменением, поэтому копия
+        остаётся согласованной и может читаться из другого потока.
+        """
+        self._shared = True
+        self._mapping_shared = self._mapping_shared or self._mapping is not None
+        frozen = AnimalTable.from_buffers(self.ids, self.type_codes, self.ages, self.names)
+        frozen._count = self._count  # Свободные строки не считаются
+        frozen._shared = True
+        return frozen
+
+    # Вспомогательный метод: копирование столбцов из файла или копии в собственные массивы перед изменением
+    def _ensure_writable(self):
+        if (not self._shared and isinstance(self.ids, array) and isinstance(self.type_codes, array)
+                and isinstance(self.ages, array)):
+            return
+        for attr, typecode in (("ids", 'q'), ("type_codes", 'b'), ("ages", 'd')):
+            column = getattr(self, attr)
+            if self._shared or not isinstance(column, array):
+                copied = array(typecode)
+                copied.frombytes(memoryview(column).cast('B'))  # Копирование байтов столбца одним блоком
+                setattr(self, attr, copied)
+        if self._shared:
+            self.names = self.names.copy()  # Список имён или LazyNames
+            self._shared = False
+
+    # Метод для отключения таблицы от файла снимка (все данные копируются в память)
+    def detach(self):
+        if self._mapping is None:
+            return
+        self._ensure_writable()
+        if isinstance(self.names, LazyNames):
+            self.names = list(self.names)  # Декодирование всех имён
+        # Освобождение memoryview и закрытие отображения файла
+        # (отображение, разделённое с копиями, закроется, когда их не останется)
+        if not self._mapping_shared:
+            for buffer in self._buffers:
+                buffer.release()
+            self._mapping.close()
+        self._buffers = []
+        self._mapping = None
+        self._mapping_shared = False
+        self.source_path = None
+
+    # Метод для добавления строки (возвращает номер строки)
+    def append(self, entity_id, animal_class, name, age):
+        self._ensure_writable()
+        code = self.type_code(animal_class)
+        name = sys.intern(name)  # Одинаковые имена хранятся одной строкой
+        if self._free:
+            # Повторное использование свободной строки
+            row = self._free.pop()
+            self.ids[row] = entity_id
+            self.type_codes[row] = code
+            self.ages[row] = age
+            self.names[row] = name
+        else:
+            # Добавление строки в конец всех столбцов
+            row = len(self.names)
+            self.ids.append(entity_id)
+            self.type_codes.append(code)
+            self.ages.append(age)
+            self.names.append(name)
+        self._count += 1
+        return row
+
+    # Метод для добавления животного в таблицу (отдельное животное становится представлением строки)
+    def adopt(self, animal, entity_id):
+        row = self.append(entity_id, animal.__class__, animal.name, animal.age)
+        # Отдельное животное привязывается к строке; животное из другой таблицы
+        # остаётся в ней, а сюда копируются его значения
+        if animal._table is None:
+            animal._table = self
+            animal._row = row
+            animal._values = None
+            self._views[row] = animal
+        return row
+
+    # Метод для освобождения строки (живое представление становится отдельным животным)
+    def free(self, row):
+        self._ensure_writable()
+        view = self._views.pop(row, None)
+        if view is not None:
+            # Представление сохраняет значения удалённой строки
+            view._values = [self.names[row], self.ages[row], self.ids[row]]
+            view._table = None
+            view._row = None
+        self.type_codes[row] = self.FREE
+        self.names[row] = None
+        self._free.append(row)
+        self._count -= 1
+
+    # Метод для получения представления строки (Bird, Mammal или Reptile)
+    def view(self, row):
+        view = self._views.get(row)
+        if view is None:
+            # Создание представления без вызова __init__
+            animal_class = self._classes[self.type_codes[row]]
+            view = animal_class.__new__(animal_class)
+            view._table = self
+            view._row = row
+            view._values = None
+            self._views[row] = view
+        return view
+
+    # Метод для получения класса животного в строке
+    def class_of(self, row):
+        return self._classes[self.type_codes[row]]
+
+    # Метод для изменения имени в строке (с уведомлением владельца индексов)
+    def set_name(self, row, name, notify=True):
+        self._ensure_writable()
+        old_name = self.names[row]
+        self.names[row] = sys.intern(name)
+        if notify and self.on_name_change is not None:
+            self.on_name_change(row, old_name, self.names[row])
+
+    # Метод для изменения возраста в строке
+    def set_age(self, row, age):
+        self._ensure_writable()
+        old_age = self.ages[row]
+        self.ages[row] = age
+        if self.on_age_change is not None:
+            self.on_age_change(row, old_age, age)
+
+    # Метод для изменения ID в строке
+    def set_id(self, row, entity_id):
+        self._ensure_writable()
+        self.ids[row] = entity_id
+
+    # Метод для измерения памяти, занятой столбцами, в байтах
+    def memory_usage(self):
+        # Размер массивов и списка имён вместе с буфером
+        total = sys.getsizeof(self.ids) + sys.getsizeof(self.type_codes) + sys.getsizeof(self.ages)
+        # Каждая интернированная строка имени учитывается один раз
+        # (у таблицы из снимка - только уже декодированные имена)
+        names = self.names.loaded() if isinstance(self.names, LazyNames) else self.names
+        total += sys.getsizeof(names) + sys.getsizeof(self._free)
+        seen = set()
+        for name in names:
+            if name is not None and id(name) not in seen:
+                seen.add(id(name))
+                total += sys.getsizeof(name)
+        return total
+
+    # Метод для получения измеренного количества байт на одно животное
+    def bytes_per_animal(self):
+        return self.memory_usage() / self._count if self._count else 0.0
+
+    # Количество животных в таблице
+    def __len__(self):
+        return self._count
+
+
+# Регистрация кодов типа известных классов животных в постоянном порядке
+for _animal_class in (Animal, Bird, Mammal, Reptile):
+    AnimalTable.type_code(_animal_class)
+
+
+# Класс NameSearchIndex - поисковый индекс подстрок по именам сущностей
+class NameSearchIndex:
+    """
+    Триграммный индекс по именам в нижнем регистре. Для запроса из трёх и более
+    символов кандидаты находятся пересечением списков ID его триграмм, после чего
+    проверяются точным сравнением подстроки. Короткие запросы проверяются по
+    заранее приведённым к нижнему регистру именам без повторного вызова lower().
+    """
+
+    # Длина n-граммы индекса
+    GRAM = 3
+
+    # Конструктор класса NameSearchIndex
+    def __init__(self):
+        self._lower = {}  # ID -> имя в нижнем регистре (порядок добавления)
+        self._grams = {}  # Триграмма -> множество ID имён, содержащих её
+
+    # Вспомогательный метод: множество n-грамм строки
+    @classmethod
+    def _grams_of(cls, text):
+        return {text[i:i + cls.GRAM] for i in range(len(text) - cls.GRAM + 1)}
+
+    # Метод для добавления имени в индекс
+    def add(self, entity_id, name):
+        lower = name.lower()  # Имя в нижнем регистре
+        # Для имени, уже записанного строчными буквами, хранится сама строка имени
+        if lower == name:
+            lower = name
+        self._lower[entity_id] = lower
+        # Добавление ID в списки всех триграмм имени
+        grams = self._grams
+        for gram in self._grams_of(lower):
+            postings = grams.get(gram)
+            if postings is None:
+                grams[gram] = {entity_id}
+            else:
+                postings.add(entity_id)
+
+    # Метод для удаления имени из индекса
+    def remove(self, entity_id):
+        lower = self._lower.pop(entity_id, None)  # Имя, под которым ID был проиндексирован
+        if lower is None:
+            return
+        # Удаление ID из списков всех триграмм имени
+        grams = self._grams
+        for gram in self._grams_of(lower):
+            postings = grams.get(gram)
+            if postings is not None:
+                postings.discard(entity_id)
+                # Пустые списки удаляются, чтобы индекс не разрастался
+                if not postings:
+                    del grams[gram]
+
+    # Метод для поиска ID, имена которых содержат подстроку
+    def search(self, text, candidates=None):
+        """
+        Возвращает ID с подстрокой text в имени (без учёта регистра).
+        candidates - необязательное множество/словарь ID, которым ограничивается поиск
+        (например, корзина класса). Порядок результата не определён.
+        """
+        text = text.lower()
+        lower = self._lower  # Локальная ссылка для ускорения цикла
+        # Короткий запрос: проверка заранее приведённых имён
+        if len(text) < self.GRAM:
+            pool = lower if candidates is None else candidates
+            return [entity_id for entity_id in pool if text in lower[entity_id]]
+        # Сбор списков ID всех триграмм запроса (от самого короткого к длинному)
+        postings = []
+        for gram in self._grams_of(text):
+            ids = self._grams.get(gram)
+            if not ids:
+                return []  # Триграммы нет ни в одном имени - совпадений нет
+            postings.append(ids)
+        postings.sort(key=len)
+        # Пересечение начинается с самого короткого списка
+        result = postings[0].intersection(*postings[1:])
+        if candidates is not None:
+            result = [entity_id for entity_id in result if entity_id in candidates]
+        # Точная проверка: совпадение всех триграмм не гарантирует подстроку
+        if len(text) > self.GRAM:
+            return [entity_id for entity_id in result if text in lower[entity_id]]
+        return list(result)
+
+    # Метод для уточнения уже найденных ID более длинным запросом
+    def refine(self, ids, text):
+        text = text.lower()
+        lower = self._lower  # Локальная ссылка для ускорения цикла
+        return [entity_id for entity_id in ids if entity_id in lower and text in lower[entity_id]]
+
+
+# Класс SortedIndex - упорядоченный индекс пар (ключ, ID)
+class SortedIndex:
+    """
+    Пары (ключ, ID) в порядке ключа (при равных ключах - в порядке ID).
+    Добавления копятся и вливаются при следующем чтении: несколько пар
+    вставляются двоичным поиском (insort), а пачка - одной сортировкой,
+    которая сливает уже упорядоченный список с добавленным отрезком за
+    линейное время. Удаление находит пару двоичным поиском.
+    Отрезок ключей (between) находится двумя двоичными поисками и перебирается
+    лениво.
+    """
+
+    # Наибольшее количество добавлений, вставляемых по одному
+    INSORT_LIMIT = 16
+
+    # Конструктор класса SortedIndex
+    def __init__(self, pairs=()):
+        self._pairs = sorted(pairs)  # Упорядоченный список пар (ключ, ID)
+        self._pending = []  # Добавленные пары, ещё не влитые в список
+
+    # Метод для добавления пары
+    def add(self, key, entity_id):
+        self._pending.append((key, entity_id))
+
+    # Метод для удаления пары
+    def remove(self, key, entity_id):
+        pair = (key, entity_id)
+        pairs = self._pairs
+        index = bisect_left(pairs, pair)
+        if index < len(pairs) and pairs[index] == pair:
+            del pairs[index]
+        elif pair in self._pending:
+            self._pending.remove(pair)
+
+    # Вспомогательный метод: вливание накопленных добавлений
+    def _merge(self):
+        pending, self._pending = self._pending, []
+        if len(pending) <= self.INSORT_LIMIT:
+            for pair in pending:
+                insort(self._pairs, pair)
+        else:
+            self._pairs.extend(pending)
+            self._pairs.sort()
+
+    # Метод для получения ID в порядке ключа (reverse=True - в обратном)
+    def ids(self, reverse=False):
+        if self._pending:
+            self._merge()
+        pairs = reversed(self._pairs) if reverse else self._pairs
+        return [entity_id for _, entity_id in pairs]
+
+    # Вспомогательный метод: границы отрезка пар с ключами от low до high (None - без границы)
+    def _bounds(self, low, high, low_inclusive, high_inclusive):
+        if self._pending:
+            self._merge()
+        pairs = self._pairs
+        # (ключ,) меньше любой пары с этим ключом, (ключ, inf) - больше
+        if low is None:
+            start = 0
+        elif low_inclusive:
+            start = bisect_left(pairs, (low,))
+        else:
+            start = bisect_right(pairs, (low, math.inf))
+        if high is None:
+            end = len(pairs)
+        elif high_inclusive:
+            end = bisect_right(pairs, (high, math.inf))
+        else:
+            end = bisect_left(pairs, (high,))
+        return start, max(start, end)
+
+    # Метод для ленивого перебора ID с ключами от low до high в порядке ключа
+    def between(self, low=None, high=None, low_inclusive=True, high_inclusive=True, reverse=False):
+        """
+        Границы находятся за O(log n), ID выдаются по одному при переборе.
+        Изменения индекса во время перебора могут сдвинуть отрезок.
+        """
+        start, end = self._bounds(low, high, low_inclusive, high_inclusive)
+        pairs = self._pairs
+        positions = range(end - 1, start - 1, -1) if reverse else range(start, end)
+        return (pairs[position][1] for position in positions)
+
+    # Метод для подсчёта пар с ключами от low до high (без перебора)
+    def count_between(self, low=None, high=None, low_inclusive=True, high_inclusive=True):
+        start, end = self._bounds(low, high, low_inclusive, high_inclusive)
+        return end - start
+
+    # Метод для получения наименьшего и наибольшего ключей ((None, None) - индекс пуст)
+    def key_bounds(self):
+        if self._pending:
+            self._merge()
+        if not self._pairs:
+            return None, None
+        return self._pairs[0][0], self._pairs[-1][0]
+
+    # Метод для получения суммы числовых ключей (без создания промежуточного списка)
+    def key_sum(self):
+        if self._pending:
+            self._merge()
+        return math.fsum(map(itemgetter(0), self._pairs))
+
+    # Количество пар
+    def __len__(self):
+        return len(self._pairs) + len(self._pending)
+
+
+# Класс EntityRegistry - реестр сущностей зоопарка (животных или сотрудников)
+class EntityRegistry:
+    """
+    Хранит сущности по стабильному ID и поддерживает хеш-индексы по ID, по имени
+    и по классу, а также поисковый индекс подстрок имён. Поиск, переименование
+    и удаление выполняются за постоянное время. Порядок перебора совпадает
+    с порядком добавления.
+    Индекс по ID хранит "дескриптор" сущности: в базовом реестре это сам объект,
+    в реестре животных - номер строки таблицы AnimalTable.
+    Реестр может строить индексы лениво: отсутствующий индекс строится методом
+    _build<имя индекса> при первом обращении, а до этого изменения его не затрагивают.
+    Так же строятся упорядоченные индексы по имени, возрасту и классу
+    (_by_<поле>_order, SortedIndex) - при первой сортировке по полю.
+    """
+
+    # Поля упорядоченных индексов и имена их атрибутов
+    ORDER_FIELDS = {"name": "_by_name_order", "age": "_by_age_order", "type": "_by_type_order"}
+
+    # Конструктор класса EntityRegistry
+    def __init__(self):
+        self._by_id = {}  # ID -> дескриптор сущности (словарь сохраняет порядок добавления)
+        self._by_name = {}  # Имя -> ID или {ID: None}, если имя встречается несколько раз
+        self._by_class = {}  # Имя класса -> {ID: None} (упорядоченное множество ID этого класса)
+        self._search = NameSearchIndex()  # Поисковый индекс подстрок имён
+        self.version = 0  # Номер версии, увеличивается при каждом изменении реестра
+
+    # Метод класса для создания реестра с ленивыми индексами по готовому словарю ID -> сущность
+    @classmethod
+    def from_entities(cls, by_id):
+        registry = cls.__new__(cls)  # Индексы построятся при первом обращении
+        registry._by_id = by_id
+        registry.version = 0
+        return registry
+
+    # Построение ленивого индекса при первом обращении (вызывается только для отсутствующих атрибутов)
+    def __getattr__(self, attr):
+        if attr.startswith("_by_") or attr == "_search":
+            builder = getattr(type(self), "_build" + attr, None)
+            if builder is not None:
+                builder(self)
+                return self.__dict__[attr]
+        raise AttributeError(attr)
+
+    # Вспомогательный метод: проверка, построен ли индекс
+    def _has_index(self, attr):
+        return attr in self.__dict__
+
+    # Вспомогательный метод: добавление ID в корзину индекса по классу
+    @staticmethod
+    def _index_add(index, key, entity_id):
+        # Создание корзины при первом обращении и добавление ID
+        index.setdefault(key, {})[entity_id] = None
+
+    # Вспомогательный метод: удаление ID из корзины индекса по классу
+    @staticmethod
+    def _index_discard(index, key, entity_id):
+        bucket = index.get(key)  # Поиск корзины по ключу
+        if bucket is not None:
+            bucket.pop(entity_id, None)  # Удаление ID из корзины
+            # Пустые корзины удаляются, чтобы индекс не разрастался
+            if not bucket:
+                del index[key]
+
+    # Вспомогательный метод: добавление ID в индекс по имени
+    def _name_add(self, name, entity_id):
+        bucket = self._by_name.get(name)
+        # Уникальное имя хранит сам ID, корзина создаётся только для повторов
+        if bucket is None:
+            self._by_name[name] = entity_id
+        elif type(bucket) is dict:
+            bucket[entity_id] = None
+        else:
+            self._by_name[name] = {bucket: None, entity_id: None}
+
+    # Вспомогательный метод: удаление ID из индекса по имени
+    def _name_discard(self, name, entity_id):
+        bucket = self._by_name.get(name)
+        if type(bucket) is dict:
+            bucket.pop(entity_id, None)
+            # Корзина из одного ID снова заменяется самим ID
+            if len(bucket) == 1:
+                self._by_name[name] = next(iter(bucket))
+            elif not bucket:
+                del self._by_name[name]
+        elif bucket == entity_id:
+            del self._by_name[name]
+
+    # Вспомогательный метод: ID с указанным именем в порядке добавления
+    def _name_ids(self, name):
+        bucket = self._by_name.get(name)
+        if bucket is None:
+            return ()
+        return bucket if type(bucket) is dict else (bucket,)
+
+    # Вспомогательный метод: ключ упорядоченного индекса поля по дескриптору
+    def _order_key(self, field, handle):
+        if field == "name":
+            return self._describe(handle)[0].casefold()
+        if field == "type":
+            return self._describe(handle)[1]
+        age = self._values(handle)[2]
+        return -1.0 if age is None else age  # У сотрудников возраста нет
+
+    # Построение индекса по имени
+    def _build_by_name(self):
+        self._by_name = {}
+        for entity_id, handle in self._by_id.items():
+            self._name_add(self._describe(handle)[0], entity_id)
+
+    # Построение индекса по имени класса
+    def _build_by_class(self):
+        by_class = {}
+        for entity_id, handle in self._by_id.items():
+            self._index_add(by_class, self._describe(handle)[1], entity_id)
+        self._by_class = by_class
+
+    # Построение поискового индекса подстрок
+    def _build_search(self):
+        search = NameSearchIndex()
+        for entity_id, handle in self._by_id.items():
+            search.add(entity_id, self._describe(handle)[0])
+        self._search = search
+
+    # Вспомогательный метод: построение упорядоченного индекса поля
+    def _build_order(self, field):
+        order_key = self._order_key
+        return SortedIndex((order_key(field, handle), entity_id) for entity_id, handle in self._by_id.items())
+
+    # Построение упорядоченного индекса по имени
+    def _build_by_name_order(self):
+        self._by_name_order = self._build_order("name")
+
+    # Построение упорядоченного индекса по возрасту
+    def _build_by_age_order(self):
+        self._by_age_order = self._build_order("age")
+
+    # Построение упорядоченного индекса по классу
+    def _build_by_type_order(self):
+        self._by_type_order = self._build_order("type")
+
+    # Вспомогательный метод: добавление сущности в построенные упорядоченные индексы
+    def _orders_add(self, entity_id, handle):
+        for field, attr in self.ORDER_FIELDS.items():
+            if self._has_index(attr):
+                self.__dict__[attr].add(self._order_key(field, handle), entity_id)
+
+    # Вспомогательный метод: удаление сущности из построенных упорядоченных индексов
+    def _orders_discard(self, entity_id, handle):
+        for field, attr in self.ORDER_FIELDS.items():
+            if self._has_index(attr):
+                self.__dict__[attr].remove(self._order_key(field, handle), entity_id)
+
+    # Вспомогательный метод: внесение сущности во все индексы
+    def _insert(self, entity_id, handle, name, class_name):
+        self._by_id[entity_id] = handle  # Индекс по ID
+        # Ещё не построенные ленивые индексы будут построены уже с этой сущностью
+        if self._has_index("_by_name"):
+            self._name_add(name, entity_id)  # Индекс по имени
+        if self._has_index("_by_class"):
+            self._index_add(self._by_class, class_name, entity_id)  # Индекс по классу
+        if self._has_index("_search"):
+            self._search.add(entity_id, name)  # Поисковый индекс
+        self._orders_add(entity_id, handle)  # Упорядоченные индексы
+        self.version += 1
+
+    # Вспомогательный метод: перенос ID из корзины старого имени в корзину нового
+    def _reindex_name(self, entity_id, old_name, new_name):
+        if self._has_index("_by_name"):
+            self._name_discard(old_name, entity_id)
+            self._name_add(new_name, entity_id)
+        # Переиндексация имени в поисковом индексе
+        if self._has_index("_search"):
+            self._search.remove(entity_id)
+            self._search.add(entity_id, new_name)
+        # Перестановка в упорядоченном индексе по имени
+        if self._has_index("_by_name_order"):
+            self._by_name_order.remove(old_name.casefold(), entity_id)
+            self._by_name_order.add(new_name.casefold(), entity_id)
+        self.version += 1
+
+    # Вспомогательный метод: сущность по дескриптору
+    def _entity(self, handle):
+        return handle
+
+    # Вспомогательный метод: имя и имя класса сущности по дескриптору
+    def _describe(self, handle):
+        return handle.name, handle.__class__.__name__
+
+    # Вспомогательный метод: (имя класса, имя, возраст или None) по дескриптору
+    def _values(self, handle):
+        return handle.__class__.__name__, handle.name, getattr(handle, "age", None)
+
+    # Вспомогательный метод: запись нового имени по дескриптору
+    def _set_name(self, handle, new_name):
+        handle.name = new_name
+
+    # Вспомогательный метод: освобождение дескриптора удалённой сущности
+    def _release(self, handle):
+        return handle
+
+    # Метод для добавления сущности (entity_id - назначенный зоопарком ID)
+    def add(self, entity, entity_id=None):
+        if entity_id is not None:
+            entity.entity_id = entity_id
+        self._insert(entity.entity_id, entity, entity.name, entity.__class__.__name__)
+
+    # Метод для удаления сущности по ID (возвращает удалённую сущность или None)
+    def remove(self, entity_id):
+        handle = self._by_id.pop(entity_id, None)  # Удаление из индекса по ID
+        if handle is None:
+            return None
+        name, class_name = self._describe(handle)
+        # Удаление из индексов по имени и по классу (если они уже построены)
+        if self._has_index("_by_name"):
+            self._name_discard(name, entity_id)
+        if self._has_index("_by_class"):
+            self._index_discard(self._by_class, class_name, entity_id)
+        if self._has_index("_search"):
+            self._search.remove(entity_id)  # Удаление из поискового индекса
+        self._orders_discard(entity_id, handle)  # Удаление из упорядоченных индексов
+        self.version += 1
+        return self._release(handle)
+
+    # Метод для переименования сущности с обновлением индекса по имени
+    def rename(self, entity_id, new_name):
+        handle = self._by_id[entity_id]  # Поиск сущности по ID
+        old_name = self._describe(handle)[0]
+        self._set_name(handle, new_name)
+        self._reindex_name(entity_id, old_name, new_name)
+        return self._entity(handle)
+
+    # Метод для проверки, занят ли ID в реестре
+    def has_id(self, entity_id):
+        return entity_id in self._by_id
+
+    # Метод для получения сущности по ID
+    def get(self, entity_id, default=None):
+        handle = self._by_id.get(entity_id)
+        return default if handle is None else self._entity(handle)
+
+    # Метод для поиска первой сущности с указанным именем
+    def find_by_name(self, name):
+        ids = self._name_ids(name)  # ID с этим именем
+        if not ids:
+            return None
+        # Первая по порядку добавления сущность с этим именем
+        return self._entity(self._by_id[next(iter(ids))])
+
+    # Метод для получения всех сущностей с указанным именем
+    def find_all_by_name(self, name):
+        return [self._entity(self._by_id[entity_id]) for entity_id in self._name_ids(name)]
+
+    # Метод для перебора сущностей указанного класса
+    def of_class(self, class_name):
+        by_id = self._by_id  # Локальная ссылка для ускорения цикла
+        entity = self._entity
+        return (entity(by_id[entity_id]) for entity_id in self._by_class.get(class_name, ()))
+
+    # Метод для перебора записей (ID, имя класса, имя, возраст или None) без создания объектов
+    def records(self, ids=None):
+        by_id = self._by_id  # Локальная ссылка для ускорения цикла
+        for entity_id in (by_id if ids is None else ids):
+            handle = by_id.get(entity_id)
+            if handle is not None:  # ID, которого уже нет в реестре, пропускается
+                yield (entity_id,) + self._values(handle)
+
+    # Метод для подсчёта сущностей каждого класса (имя класса -> количество)
+    def count_by_class(self):
+        return {class_name: len(ids) for class_name, ids in self._by_class.items()}
+
+    # Метод для получения списка ID в порядке добавления
+    def ids(self):
+        return list(self._by_id)
+
+    # Метод для поиска ID по подстроке имени и (необязательно) по имени класса
+    def search(self, text, class_name=None):
+        """
+        Возвращает список ID сущностей, имя которых содержит text (без учёта регистра),
+        по возрастанию ID. class_name ограничивает поиск корзиной одного класса.
+        """
+        # Ограничение поиска корзиной класса
+        candidates = None if class_name is None else self._by_class.get(class_name, {})
+        # Пустой запрос: весь реестр или вся корзина класса (восстановленная отменой
+        # сущность стоит в конце словаря, поэтому порядок задаётся сортировкой)
+        if not text:
+            return sorted(self._by_id if candidates is None else candidates)
+        return self._in_order(self._search.search(text, candidates))
+
+    # Метод для получения ID в порядке поля name, age или type (ids - только эти ID)
+    def sorted_ids(self, field, reverse=False, ids=None):
+        """
+        Порядок берётся из упорядоченного индекса поля (строится при первом
+        вызове и затем поддерживается при добавлении, изменении и удалении).
+        Небольшой набор ids сортируется по ключам напрямую, большой - отбором
+        из индекса за один проход.
+        """
+        attr = self.ORDER_FIELDS.get(field)
+        if attr is None:
+            raise ValueError(f"Сортировка по полю {field} не поддерживается")
+        if ids is not None and len(ids) * 4 < len(self._by_id):
+            by_id = self._by_id
+            order_key = self._order_key
+            ids = [entity_id for entity_id in ids if entity_id in by_id]
+            return sorted(ids, key=lambda entity_id: (order_key(field, by_id[entity_id]), entity_id),
+                          reverse=reverse)
+        ordered = getattr(self, attr).ids(reverse)
+        if ids is None:
+            return ordered
+        wanted = set(ids)
+        return [entity_id for entity_id in ordered if entity_id in wanted]
+
+    # Метод для уточнения предыдущего результата поиска более длинным запросом
+    def refine(self, ids, text):
+        # Проверяются только ранее найденные ID, порядок сохраняется
+        return self._search.refine(ids, text)
+
+    # Вспомогательный метод: упорядочивание ID по возрастанию
+    def _in_order(self, ids):
+        # Порядок словаря не используется: после отмены удаления сущность стоит в его конце.
+        # Сортировка найденных ID - O(k log k) для k найденных сущностей
+        return sorted(ids)
+
+    # Перебор сущностей в порядке добавления
+    def __iter__(self):
+        entity = self._entity
+        return (entity(handle) for handle in self._by_id.values())
+
+    # Количество сущностей в реестре
+    def __len__(self):
+        return len(self._by_id)
+
+    # Проверка наличия сущности (по её ID)
+    def __contains__(self, entity):
+        entity_id = getattr(entity, "entity_id", None)  # ID проверяемой сущности
+        handle = self._by_id.get(entity_id) if entity_id is not None else None
+        return handle is not None and self._entity(handle) is entity
+
+
+# Класс AnimalRegistry - реестр животных поверх столбцовой таблицы
+class AnimalRegistry(EntityRegistry):
+    """
+    Реестр животных, в котором индекс по ID хранит номера строк таблицы
+    AnimalTable, а объекты Animal создаются только при обращении к ним.
+    Реестр поверх таблицы из снимка (from_table) строит индексы лениво.
+    Для запросов по возрасту у каждого класса есть свой упорядоченный индекс
+    возраста (_by_class_age, строится при первом запросе с классом).
+    """
+
+    # Конструктор класса AnimalRegistry
+    def __init__(self):
+        super().__init__()
+        self.table = AnimalTable()  # Столбцовое хранилище животных
+        # Переименование и изменение возраста через представление (animal.name = ...) обновляют индексы
+        self.table.on_name_change = self._on_table_rename
+        self.table.on_age_change = self._on_table_age_change
+
+    # Метод класса для создания реестра с ленивыми индексами поверх готовой таблицы
+    @classmethod
+    def from_table(cls, table, by_id=None):
+        registry = cls.__new__(cls)  # Индексы не создаются - они построятся при первом обращении
+        registry.version = 0
+        registry.table = table
+        if by_id is not None:
+            registry._by_id = by_id  # Готовый индекс по ID задаёт порядок животных
+        table.on_name_change = registry._on_table_rename
+        table.on_age_change = registry._on_table_age_change
+        return registry
+
+    # Построение индекса по ID: занятые строки таблицы в порядке строк
+    def _build_by_id(self):
+        free = AnimalTable.FREE
+        self._by_id = {entity_id: row
+                       for row, (entity_id, code) in enumerate(zip(self.table.ids, self.table.type_codes))
+                       if code != free}
+
+    # Построение индекса по имени класса
+    def _build_by_class(self):
+        type_codes = self.table.type_codes  # Локальная ссылка для ускорения цикла
+        by_code = {}
+        for entity_id, row in self._by_id.items():
+            by_code.setdefault(type_codes[row], {})[entity_id] = None
+        self._by_class = {AnimalTable.type_class(code).__name__: bucket for code, bucket in by_code.items()}
+
+    # Построение индекса по имени (декодирует все имена)
+    def _build_by_name(self):
+        self._by_name = {}
+        names = self.table.names  # Локальная ссылка для ускорения цикла
+        for entity_id, row in self._by_id.items():
+            self._name_add(names[row], entity_id)
+
+    # Построение поискового индекса подстрок (декодирует все имена)
+    def _build_search(self):
+        search = NameSearchIndex()
+        names = self.table.names  # Локальная ссылка для ускорения цикла
+        for entity_id, row in self._by_id.items():
+            search.add(entity_id, names[row])
+        self._search = search
+
+    # Построение упорядоченных индексов возраста по классам (имя класса -> SortedIndex)
+    def _build_by_class_age(self):
+        ages = self.table.ages  # Локальные ссылки для ускорения цикла
+        type_codes = self.table.type_codes
+        by_code = {}
+        for entity_id, row in self._by_id.items():
+            by_code.setdefault(type_codes[row], []).append((ages[row], entity_id))
+        self._by_class_age = {AnimalTable.type_class(code).__name__: SortedIndex(pairs)
+                              for code, pairs in by_code.items()}
+
+    # Вспомогательный метод: добавление животного в построенные упорядоченные индексы
+    def _orders_add(self, entity_id, row):
+        super()._orders_add(entity_id, row)
+        if self._has_index("_by_class_age"):
+            class_name, _, age = self._values(row)
+            index = self._by_class_age.get(class_name)
+            if index is None:
+                index = self._by_class_age[class_name] = SortedIndex()
+            index.add(age, entity_id)
+
+    # Вспомогательный метод: удаление животного из построенных упорядоченных индексов
+    def _orders_discard(self, entity_id, row):
+        super()._orders_discard(entity_id, row)
+        if self._has_index("_by_class_age"):
+            class_name, _, age = self._values(row)
+            index = self._by_class_age.get(class_name)
+            if index is not None:
+                index.remove(age, entity_id)
+
+    # Вспомогательный метод: упорядоченный индекс возраста класса (None - всех животных)
+    def _age_index(self, class_name):
+        if class_name is None:
+            return self._by_age_order
+        return self._by_class_age.get(class_name)
+
+    # Метод для перебора ID животных с возрастом от age_min до age_max (None - без границы)
+    def age_range(self, age_min=None, age_max=None, class_name=None,
+                  min_inclusive=True, max_inclusive=True, reverse=False):
+        """
+        Возвращает ленивый итератор ID в порядке возраста (при равном возрасте -
+        в порядке ID). Границы ищутся двоичным поиском в упорядоченном индексе
+        возраста класса (или всех животных), поэтому запрос не просматривает
+        животных вне диапазона.
+        """
+        index = self._age_index(class_name)
+        if index is None:
+            return iter(())  # Животных этого класса нет
+        return index.between(age_min, age_max, min_inclusive, max_inclusive, reverse)
+
+    # Метод для подсчёта животных с возрастом от age_min до age_max (без перебора)
+    def count_age_range(self, age_min=None, age_max=None, class_name=None, min_inclusive=True, max_inclusive=True):
+        index = self._age_index(class_name)
+        if index is None:
+            return 0
+        return index.count_between(age_min, age_max, min_inclusive, max_inclusive)
+
+    # Метод для получения (количество, мин, макс, сумма) возрастов класса (None - всех животных)
+    def age_stats(self, class_name=None):
+        """
+        Количество и границы берутся из упорядоченного индекса возраста без
+        перебора животных, сумма - одним проходом по ключам индекса.
+        Для класса без животных возвращает (0, None, None, 0.0).
+        """
+        index = self._age_index(class_name)
+        if not index:
+            return 0, None, None, 0.0
+        low, high = index.key_bounds()
+        return len(index), low, high, index.key_sum()
+
+    # Метод для получения номеров строк в порядке добавления
+    def rows(self):
+        return list(self._by_id.values())
+
+    # Метод для изменения возраста животного по ID с обновлением индексов возраста
+    def set_age(self, entity_id, age):
+        self.table.set_age(self._by_id[entity_id], age)
+
+    # Обработчик переименования строки таблицы через представление
+    def _on_table_rename(self, row, old_name, new_name):
+        self._reindex_name(self.table.ids[row], old_name, new_name)
+
+    # Обработчик изменения возраста строки таблицы через представление
+    def _on_table_age_change(self, row, old_age, new_age):
+        entity_id = self.table.ids[row]
+        if self._has_index("_by_age_order"):
+            self._by_age_order.remove(old_age, entity_id)
+            self._by_age_order.add(new_age, entity_id)
+        if self._has_index("_by_class_age"):
+            index = self._by_class_age.get(self.table.class_of(row).__name__)
+            if index is not None:
+                index.remove(old_age, entity_id)
+                index.add(new_age, entity_id)
+        self.version += 1
+
+    # Вспомогательный метод: представление строки
+    def _entity(self, row):
+        return self.table.view(row)
+
+    # Вспомогательный метод: имя и имя класса по номеру строки
+    def _describe(self, row):
+        return self.table.names[row], self.table.class_of(row).__name__
+
+    # Вспомогательный метод: значения строки прямо из столбцов (без создания представления)
+    def _values(self, row):
+        table = self.table
+        return table.class_of(row).__name__, table.names[row], table.ages[row]
+
+    # Вспомогательный метод: запись имени прямо в столбец (индексы обновляет rename)
+    def _set_name(self, row, new_name):
+        self.table.set_name(row, new_name, notify=False)  # Индексы обновляет сам реестр
+
+    # Вспомогательный метод: освобождение строки удалённого животного
+    def _release(self, row):
+        animal = self.table.view(row)  # Представление переживёт освобождение строки
+        self.table.free(row)
+        return animal
+
+    # Метод для добавления животного (значения копируются в таблицу)
+    def add(self, animal, entity_id=None):
+        if entity_id is None:
+            entity_id = animal.entity_id
+        row = self.table.adopt(animal, entity_id)
+        self._insert(entity_id, row, self.table.names[row], animal.__class__.__name__)
+
+    # Количество животных (без построения индексов)
+    def __len__(self):
+        return len(self.table)
+
+    # Проверка наличия животного (представления строки этой таблицы)
+    def __contains__(self, animal):
+        row = self._by_id.get(getattr(animal, "entity_id", None))
+        return row is not None and getattr(animal, "_table", None) is self.table and animal._row == row
+
+
+# Класс Zoo для управления зоопарком
+class Zoo:
+    # Конструктор класса Zoo
+    def __init__(self, name):
+        self.name = name  # Название зоопарка
+        self._set_animals(AnimalRegistry())  # Реестр животных (столбцовая таблица) в зоопарке
+        self.staff = EntityRegistry()  # Реестр сотрудников зоопарка
+        self._next_id = 1  # Следующий свободный ID (общий для животных и сотрудников)
+        self.change_seq = 0  # Номер последнего изменения (растёт при каждой мутации)
+        self._listeners = []  # Обработчики изменений (получают запись об изменении)
+        self.journal = None  # Подключённый журнал изменений (ZooJournal) или None
+        self.storage = None  # Подключённое хранилище (ZooStorage) или None
+
+    # Сериализация: в файл пишутся только имя, списки сущностей и номер изменения,
+    # индексы строятся заново, а обработчики и журнал не сохраняются
+    def __getstate__(self):
+        return {"name": self.name, "animals": list(self.animals), "staff": list(self.staff),
+                "change_seq": self.change_seq}
+
+    # Десериализация (поддерживает и старые файлы, где animals и staff были списками)
+    def __setstate__(self, state):
+        self.__init__(state["name"])  # Создание пустых реестров
+        # Повторное добавление сущностей с сохранением их ID
+        for animal in state.get("animals", []):
+            self._register(self.animals, animal)
+        for staff_member in state.get("staff", []):
+            self._register(self.staff, staff_member)
+        self.change_seq = state.get("change_seq", 0)  # В старых файлах номера изменения нет
+
+    # Метод для подписки на изменения зоопарка
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    # Метод для отписки от изменений зоопарка
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    # Вспомогательный метод: подключение реестра животных (изменения через представления идут в update_entity)
+    def _set_animals(self, registry):
+        self.animals = registry
+        registry.table.on_edit = self.update_entity
+
+    # Вспомогательный метод: присвоение номера изменению и рассылка записи обработчикам
+    def _notify(self, record):
+        self.change_seq += 1
+        record["seq"] = self.change_seq
+        for listener in self._listeners:
+            listener(record)
+
+    # Вспомогательный метод: назначение ID и добавление сущности в реестр
+    def _register(self, registry, entity):
+        entity_id = entity.entity_id  # ID, который мог остаться от прошлой сессии
+        # Новый ID назначается, если его нет или он уже занят в этом зоопарке
+        if entity_id is None or self.animals.has_id(entity_id) or self.staff.has_id(entity_id):
+            entity_id = self._next_id
+        # Счётчик всегда остаётся больше любого выданного ID
+        self._next_id = max(self._next_id, entity_id + 1)
+        registry.add(entity, entity_id)  # Добавление в реестр с индексами
+        return entity_id
+
+    # Метод для добавления животного в зоопарк (возвращает ID животного)
+    def add_animal(self, animal):
+        entity_id = self._register(self.animals, animal)  # Добавление животного в реестр
+        # Запись информации о добавлении животного в лог
+        logging.info("Животное %s добавлено в зоопарк.", animal.name)
+        # Уведомление обработчиков (журнала) о добавлении
+        self._notify({"op": "add_animal", "id": entity_id, "type": animal.__class__.__name__,
+                      "name": animal.name, "age": animal.age})
+        return entity_id
+
+    # Вспомогательный метод: проверка животного перед пакетной вставкой
+    @staticmethod
+    def _check_animal(animal, index):
+        if not isinstance(animal, Animal):
+            raise ValueError(f"Запись {index}: ожидалось животное, получено {type(animal).__name__}")
+        if not isinstance(animal.name, str) or not animal.name.strip():
+            raise ValueError(f"Запись {index}: пустое имя животного")
+        if isinstance(animal.age, bool) or not isinstance(animal.age, (int, float)) or not animal.age > 0:
+            raise ValueError(f"Запись {index}: возраст должен быть положительным числом")
+
+    # Вспомогательный метод: проверка сотрудника перед пакетной вставкой
+    @staticmethod
+    def _check_staff(staff_member, index):
+        if not isinstance(staff_member, Staff):
+            raise ValueError(f"Запись {index}: ожидался сотрудник, получено {type(staff_member).__name__}")
+        if not isinstance(staff_member.name, str) or not staff_member.name.strip():
+            raise ValueError(f"Запись {index}: пустое имя сотрудника")
+
+    # Метод для пакетного добавления животных (возвращает список ID)
+    def add_animals(self, animals):
+        """
+        Добавляет животных одной пачкой. Все животные проверяются до вставки
+        (при ошибке ValueError не добавляется ни одно), в лог пишется одна
+        запись, а обработчики (журнал) получают одну запись add_animals.
+        """
+        animals = list(animals)
+        for index, animal in enumerate(animals):
+            self._check_animal(animal, index)
+        items = []  # [ID, класс, имя, возраст] для записи об изменении
+        for animal in animals:
+            entity_id = self._register(self.animals, animal)
+            items.append([entity_id, animal.__class__.__name__, animal.name, animal.age])
+        if items:
+            logging.info("Добавлено животных пачкой: %d", len(items))
+            self._notify({"op": "add_animals", "items": items})
+        return [item[0] for item in items]
+
+    # Метод для пакетного добавления сотрудников (возвращает список ID)
+    def add_staff_bulk(self, staff_members):
+        """
+        Добавляет сотрудников одной пачкой с проверкой до вставки, одной записью
+        в лог и одной записью add_staff_bulk для обработчиков.
+        """
+        staff_members = list(staff_members)
+        for index, staff_member in enumerate(staff_members):
+            self._check_staff(staff_member, index)
+        items = []  # [ID, класс, имя] для записи об изменении
+        for staff_member in staff_members:
+            entity_id = self._register(self.staff, staff_member)
+            items.append([entity_id, staff_member.__class__.__name__, staff_member.name])
+        if items:
+            logging.info("Нанято сотрудников пачкой: %d", len(items))
+            self._notify({"op": "add_staff_bulk", "items": items})
+        return [item[0] for item in items]
+
+    # Метод для импорта животных и сотрудников из файла CSV или JSONL
+    def import_file(self, filename, file_format=None, progress=None):
+        return ZooImporter(self).import_file(filename, file_format, progress)
+
+    # Метод для экспорта животных и сотрудников (всех или только указанных ID) в CSV, JSONL или столбцовый файл
+    def export_file(self, filename, file_format=None, animal_ids=None, staff_ids=None, progress=None):
+        return ZooExporter(self).export_file(filename, file_format, animal_ids, staff_ids, progress)
+
+    # Метод для добавления сотрудника в зоопарк (возвращает ID сотрудника)
+    def add_staff(self, staff_member):
+        entity_id = self._register(self.staff, staff_member)  # Добавление сотрудника в реестр
+        # Запись информации о добавлении сотрудника в лог
+        logging.info("Сотрудник %s нанят.", staff_member.name)
+        # Уведомление обработчиков (журнала) о найме
+        self._notify({"op": "add_staff", "id": entity_id, "type": staff_member.__class__.__name__,
+                      "name": staff_member.name})
+        return entity_id
+
+    # Метод для получения животного или сотрудника по ID
+    def get_entity(self, entity_id):
+        entity = self.animals.get(entity_id)  # Поиск среди животных
+        return entity if entity is not None else self.staff.get(entity_id)
+
+    # Метод для поиска животного по имени
+    def find_animal(self, name):
+        return self.animals.find_by_name(name)
+
+    # Метод для поиска сотрудника по имени
+    def find_staff(self, name):
+        return self.staff.find_by_name(name)
+
+    # Метод для перебора ID животных с возрастом (в месяцах) от age_min до age_max
+    def animals_by_age(self, age_min=None, age_max=None, class_name=None, min_inclusive=True, max_inclusive=True):
+        """
+        Ленивый итератор ID в порядке возраста, например рептилии старше 24 месяцев:
+
+            zoo.animals_by_age(24, class_name="Reptile", min_inclusive=False)
+        """
+        return self.animals.age_range(age_min, age_max, class_name, min_inclusive, max_inclusive)
+
+    # Метод для поиска ID (животные, сотрудники) по подстроке имени, классу и возрасту
+    def search_entities(self, text, class_name=None, within=None, age_min=None, age_max=None):
+        """
+        within - прошлый результат (ID животных, ID сотрудников) для уточнения
+        более длинным запросом. age_min и age_max (включительно) оставляют только
+        животных из диапазона возраста в порядке возраста. Пока нужные индексы
+        в памяти не построены, а хранилище содержит все изменения, фильтр
+        выполняет хранилище.
+        """
+        by_age = age_min is not None or age_max is not None
+        indexes = ["_search"]
+        if by_age:
+            indexes.append("_by_age_order" if class_name is None else "_by_class_age")
+        if self.storage is not None and not all(self.animals._has_index(attr) for attr in indexes):
+            found = self.storage.search(text, class_name, age_min, age_max)
+            if found is not None:
+                return found
+        if by_age:
+            # Отрезок индекса возраста, затем проверка имени только у найденных животных
+            animal_ids = list(self.animals.age_range(age_min, age_max, class_name))
+            if text:
+                animal_ids = self.animals.refine(animal_ids, text)
+            return animal_ids, []  # У сотрудников возраста нет
+        if within is not None:
+            return self.animals.refine(within[0], text), self.staff.refine(within[1], text)
+        return self.animals.search(text, class_name), self.staff.search(text, class_name)
+
+    # Метод для изменения имени и/или возраста сущности по ID
+    def update_entity(self, entity_id, name=None, age=None):
+        # Определение реестра, в котором находится сущность
+        registry = self.animals if self.animals.has_id(entity_id) else self.staff
+        entity = registry.get(entity_id)  # Поиск сущности по ID
+        if entity is None:
+            return None
+        old_name = entity.name  # Старое имя для записи в лог
+        old_age = entity.age if registry is self.animals else None  # Старый возраст для отмены
+        # Переименование с обновлением индекса по имени
+        if name is not None and name != old_name:
+            registry.rename(entity_id, name)
+        # Изменение возраста (только для животных) прямо в таблице, минуя представление
+        if age is not None and registry is self.animals:
+            registry.set_age(entity_id, age)
+        # Запись в лог об обновлении
+        if registry is self.animals:
+            logging.info("Животное %s обновлено: %s, возраст %s", old_name, entity.name, entity.age)
+        else:
+            logging.info("Сотрудник %s обновлен: %s", old_name, entity.name)
+        # Уведомление обработчиков (журнала) только об изменённых полях и их прежних значениях
+        record = {"op": "update", "id": entity_id, "before": {}}
+        if name is not None:
+            record["name"] = name
+            record["before"]["name"] = old_name
+        if age is not None and registry is self.animals:
+            record["age"] = entity.age
+            record["before"]["age"] = old_age
+        self._notify(record)
+        return entity
+
+    # Метод для удаления сущности по ID (возвращает удалённую сущность или None)
+    def remove_entity(self, entity_id):
+        # Попытка удалить животное
+        animal = self.animals.remove(entity_id)
+        if animal is not None:
+            # Запись в лог об удалении
+            logging.info("Животное %s удалено. | Animal %s deleted.", animal.name, animal.name)
+            # Уведомление обработчиков (с данными животного для отмены удаления)
+            self._notify({"op": "remove", "id": entity_id, "type": animal.__class__.__name__,
+                          "name": animal.name, "age": animal.age})
+            return animal
+        # Попытка удалить сотрудника
+        staff_member = self.staff.remove(entity_id)
+        if staff_member is not None:
+            # Запись в лог об удалении
+            logging.info("Сотрудник %s удален. | Staff %s deleted.", staff_member.name, staff_member.name)
+            # Уведомление обработчиков (с данными сотрудника для отмены удаления)
+            self._notify({"op": "remove", "id": entity_id, "type": staff_member.__class__.__name__,
+                          "name": staff_member.name})
+        return staff_member
+
+    # Метод для замены содержимого зоопарка содержимым другого зоопарка
+    def replace_with(self, other):
+        self.name = other.name  # Название зоопарка
+        self._set_animals(other.animals)  # Реестр животных
+        self.staff = other.staff  # Реестр сотрудников
+        self._next_id = other._next_id  # Счётчик ID
+        # Содержимое заменено целиком: обработчики (журнал) получают одну запись о замене
+        self._notify({"op": "replace"})
+
+    # Метод для применения записи журнала (без записи в лог и без уведомления обработчиков)
+    def apply_record(self, record):
+        self._apply_op(record)
+        self.change_seq = record["seq"]  # Зоопарк соответствует этой записи журнала
+
+    # Метод для применения записи об изменении как нового изменения (обработчики получают копию записи)
+    def apply_change(self, record):
+        self._apply_op(record)
+        record = dict(record)
+        record.pop("seq", None)  # Номер назначается заново
+        self._notify(record)
+
+    # Вспомогательный метод: применение записи об изменении к реестрам
+    def _apply_op(self, record):
+        op = record["op"]
+        if op == "add_animal":
+            animal = ENTITY_CLASSES[record["type"]](record["name"], record["age"])
+            animal.entity_id = record["id"]  # ID из журнала сохраняется
+            self._register(self.animals, animal)
+        elif op == "add_staff":
+            staff_member = ENTITY_CLASSES[record["type"]](record["name"])
+            staff_member.entity_id = record["id"]  # ID из журнала сохраняется
+            self._register(self.staff, staff_member)
+        elif op == "add_animals":
+            for entity_id, type_name, name, age in record["items"]:
+                animal = ENTITY_CLASSES[type_name](name, age)
+                animal.entity_id = entity_id  # ID из журнала сохраняется
+                self._register(self.animals, animal)
+        elif op == "add_staff_bulk":
+            for entity_id, type_name, name in record["items"]:
+                staff_member = ENTITY_CLASSES[type_name](name)
+                staff_member.entity_id = entity_id  # ID из журнала сохраняется
+                self._register(self.staff, staff_member)
+        elif op == "update":
+            entity_id = record["id"]
+            registry = self.animals if self.animals.has_id(entity_id) else self.staff
+            if "name" in record and registry.has_id(entity_id):
+                registry.rename(entity_id, record["name"])
+            if "age" in record and registry is self.animals:
+                self.animals.set_age(entity_id, record["age"])
+        elif op == "remove":
+            if self.animals.remove(record["id"]) is None:
+                self.staff.remove(record["id"])
+        elif op == "remove_bulk":
+            for entity_id in record["ids"]:
+                if self.animals.remove(entity_id) is None:
+                    self.staff.remove(entity_id)
+        else:
+            raise ValueError(f"Неизвестная операция журнала: {op}")
+
+    # Метод для воспроизведения звуков всех животных в зоопарке
+    def make_all_sounds(self):
+        """
+        Воспроизводит звуки всех животных зоопарка через планировщик звуков:
+        животные группируются по виду, и каждый вид звучит один раз на своём канале.
+        make_sound() отдельных животных не вызывается: звуковой файл берётся
+        из атрибута SOUND_FILE класса вида, а в лог пишется одна запись на вид.
+        Не блокирует вызывающий поток: звуки запускаются в фоне.
+        """
+        # Проверка наличия животных в зоопарке
+        if not self.animals:
+            # Запись предупреждения в лог
+            logging.warning("Попытка воспроизвести звуки, но в зоопарке нет животных")
+            return False  # Возврат статуса неудачи
+
+        # Запись в лог о начале воспроизведения звуков
+        logging.info("Начато воспроизведение звуков всех животных")
+
+        # Группировка животных по виду без перебора самих животных
+        sound_files = []
+        for class_name, count in self.animals.count_by_class().items():
+            logging.info("Звуки вида %s: животных %d", class_name, count)
+            # Звуковой файл задаётся классом вида
+            sound_file = getattr(ENTITY_CLASSES.get(class_name), "SOUND_FILE", None)
+            if sound_file is not None:
+                sound_files.append(sound_file)
+        # Постановка звуков видов в очередь планировщика
+        if init_audio():
+            sound_scheduler.schedule(sound_files)
+
+        return True  # Возврат статуса успеха
+
+    # Метод для получения согласованной копии зоопарка (для сохранения в другом потоке)
+    def snapshot(self):
+        """
+        Возвращает копию зоопарка на текущий момент. Столбцы животных не копируются,
+        а разделяются с копией до первого изменения (копирование при записи),
+        поэтому снимок дешёв, а зоопарк можно изменять, пока копия сохраняется.
+        """
+        frozen = Zoo(self.name)
+        by_id = dict(self.animals._by_id) if self.animals._has_index("_by_id") else None
+        frozen._set_animals(AnimalRegistry.from_table(self.animals.table.share(), by_id))
+        # Сотрудников немного - они копируются целиком, а индексы копии строятся только при обращении
+        frozen.staff = EntityRegistry.from_entities({staff_id: copy.copy(staff_member)
+                                                     for staff_id, staff_member in self.staff._by_id.items()})
+        frozen._next_id = self._next_id
+        frozen.change_seq = self.change_seq
+        return frozen
+
+    # Метод для освобождения файла снимка, отображённого в память (перед его перезаписью)
+    def release_file(self, filename):
+        if self.animals.table.source_path == os.path.abspath(filename):
+            self.animals.table.detach()
+
+    # Метод для подключения хранилища (needs_full=False - хранилище уже содержит этот зоопарк)
+    def attach_storage(self, storage, needs_full=True):
+        storage.attach(self, needs_full)
+        return storage
+
+    # Метод для отключения и закрытия подключённого хранилища (его несохранённые изменения отбрасываются)
+    def close_storage(self):
+        if self.storage is not None:
+            self.storage.close()
+
+    # Метод для подключения журнала изменений к файлу снимка
+    def enable_journal(self, filename, compact_min_bytes=None):
+        """
+        Включает журналируемое хранение: изменения дописываются в filename + ".journal",
+        а сохранение в filename стоит столько, сколько изменений накопилось.
+        Первое сохранение записывает полный снимок, так как файл снимка мог
+        относиться к другому зоопарку.
+        """
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = ZooJournal(self, filename, needs_snapshot=True, compact_min_bytes=compact_min_bytes)
+        return self.journal
+
+    # Метод для сохранения состояния зоопарка в файл (progress(записано байт, None) - обработчик прогресса)
+    def save_zoo(self, filename="zoo_data.pkl", progress=None):
+        # Сохранение в файл снимка подключённого журнала дописывает только изменения
+        if self.journal is not None and os.path.abspath(filename) == self.journal.snapshot_path:
+            return self.journal.save()
+        # Подключённое хранилище тоже записывает только изменения
+        if self.storage is not None and os.path.abspath(filename) == self.storage.filename:
+            return self.storage.save()
+        # Файл другого хранилища (например, базы SQLite) записывается целиком
+        backend = storage_for(filename)
+        if backend is not None:
+            storage = backend(filename)
+            try:
+                return storage.write(self)
+            except Exception as e:  # Обработка ошибок записи в хранилище
+                logging.error(f"Ошибка сохранения зоопарка: {e}")
+                return False
+            finally:
+                storage.close()
+        # Файл, отображённый в память под таблицей животных, нельзя перезаписывать
+        self.release_file(filename)
+        try:
+            # Открытие файла для бинарной записи
+            with open(filename, 'wb') as file:
+                # Сериализация объекта зоопарка и запись в файл
+                pickle.dump(self, file if progress is None else ProgressFile(file, progress))
+            # Запись информации о сохранении в лог
+            logging.info(f"Состояние зоопарка сохранено в {filename}.")
+            return True  # Возврат успешного статуса
+        except (IOError, pickle.PicklingError) as e:  # Обработка ошибок ввода/вывода и сериализации
+            # Запись ошибки в лог
+            logging.error(f"Ошибка сохранения зоопарка: {e}")
+            return False  # Возврат статуса ошибки
+
+    # Статический метод для загрузки состояния зоопарка из файла
+    @staticmethod
+    def load_zoo(filename="zoo_data.pkl", journaled=False, progress=None):
+        """
+        Загружает снимок зоопарка (pickle или двоичный ZooSnapshot) и дописанный
+        к нему журнал изменений, если он есть.
+        При journaled=True к загруженному зоопарку подключается журнал этого файла.
+        progress(прочитано байт, размер файла) вызывается по мере чтения.
+        """
+        try:
+            # Файл хранилища (например, базы SQLite): зоопарк подключается к хранилищу
+            backend = storage_for(filename)
+            if backend is not None:
+                zoo_obj = backend(filename).load()
+                logging.info(f"Состояние зоопарка загружено из {filename}.")
+                if progress is not None:
+                    size = os.path.getsize(filename)
+                    progress(size, size)  # Загрузка завершена
+                return zoo_obj
+            if ZooSnapshot.is_snapshot(filename):
+                # Двоичный снимок отображается в память и декодируется по требованию
+                zoo_obj = ZooSnapshot.load(filename)
+            else:
+                # Открытие файла для бинарного чтения
+                with open(filename, 'rb') as file:
+                    if progress is not None:
+                        file = ProgressFile(file, progress, os.path.getsize(filename))
+                    # Десериализация объекта зоопарка из файла
+                    zoo_obj = ZooUnpickler(file).load()
+            # Применение изменений, записанных в журнал после снимка
+            replayed, clean = ZooJournal.replay(zoo_obj, filename + ZooJournal.SUFFIX)
+            # Подключение журнала (повреждённый хвост журнала заменяется новым снимком)
+            if journaled:
+                zoo_obj.journal = ZooJournal(zoo_obj, filename, needs_snapshot=not clean)
+            # Запись информации о загрузке в лог
+            logging.info(f"Состояние зоопарка загружено из {filename}.")
+            if replayed:
+                logging.info(f"Из журнала применено изменений: {replayed}")
+            if progress is not None:
+                size = os.path.getsize(filename)
+                progress(size, size)  # Загрузка завершена
+            return zoo_obj  # Возврат загруженного объекта
+        except FileNotFoundError:  # Обработка ошибки отсутствия файла
+            # Запись ошибки в лог
+            logging.error(f"Файл {filename} не найден.")
+            raise  # Повторное возбуждение исключения
+        except (IOError, pickle.UnpicklingError, sqlite3.Error) as e:  # Обработка других ошибок
+            # Запись ошибки в лог
+            logging.error(f"Ошибка загрузки зоопарка: {e}")
+            raise  # Повторное возбуждение исключения
+
+
+# Базовый класс Staff для сотрудников зоопарка
+class Staff:
+    # Стабильный идентификатор, назначаемый зоопарком при найме (None - ещё не нанят)
+    entity_id = None
+
+    # Конструктор класса Staff
+    def __init__(self, name):
+        self.name = name  # Имя сотрудника
+
+
+# Класс ZooKeeper (Смотритель) - наследуется от класса Staff
+class ZooKeeper(Staff):
+    # Метод для кормления животного
+    def feed_animal(self, animal):
+        # Запись действия в лог и в консоль
+        activity_log.info("%s кормит %s.", self.name, animal.name)
+
+
+# Класс Veterinarian (Ветеринар) - наследуется от класса Staff
+class Veterinarian(Staff):
+    # Метод для лечения животного
+    def heal_animal(self, animal):
+        # Запись действия в лог и в консоль
+        activity_log.info("%s лечит %s.", self.name, animal.name)
+
+
+# Классы сущностей по имени (для восстановления записей журнала)
+ENTITY_CLASSES = {cls.__name__: cls for cls in (Bird, Mammal, Reptile, ZooKeeper, Veterinarian)}
+
+
+# Класс ZooJournal - журнал изменений зоопарка поверх файла снимка
+class ZooJournal:
+    """
+    Журналируемое хранение зоопарка: полный снимок (ZooSnapshot) плюс журнал изменений,
+    в который каждое сохранение дописывает только накопленные записи (JSON, по одной
+    на строку). Когда журнал становится больше снимка, он сворачивается в новый
+    снимок, поэтому стоимость сохранения пропорциональна числу изменений.
+    Записи с номером не больше change_seq снимка при загрузке пропускаются, так что
+    сбой между записью снимка и очисткой журнала не приводит к повторам.
+    """
+
+    # Суффикс файла журнала рядом с файлом снимка
+    SUFFIX = ".journal"
+    # Минимальный размер журнала, после которого допускается сворачивание, в байтах
+    COMPACT_MIN_BYTES = 64 * 1024
+
+    # Конструктор класса ZooJournal
+    def __init__(self, zoo, filename, needs_snapshot=False, compact_min_bytes=None):
+        self.zoo = zoo  # Журналируемый зоопарк
+        self.snapshot_path = os.path.abspath(filename)  # Файл снимка
+        self.journal_path = self.snapshot_path + self.SUFFIX  # Файл журнала
+        self.compact_min_bytes = compact_min_bytes or self.COMPACT_MIN_BYTES
+        self._pending = []  # Записи, ещё не записанные в журнал
+        self._needs_snapshot = needs_snapshot  # Следующее сохранение должно записать снимок
+        # Текущие размеры файлов для решения о сворачивании
+        self._journal_size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+        self._snapshot_size = os.path.getsize(self.snapshot_path) if os.path.exists(self.snapshot_path) else 0
+        zoo.add_listener(self._record)  # Подписка на изменения зоопарка
+
+    # Обработчик изменения зоопарка
+    def _record(self, record):
+        if record["op"] == "replace":
+            # Содержимое заменено целиком - журнал бесполезен, нужен новый снимок
+            self._pending.clear()
+            self._needs_snapshot = True
+        elif not self._needs_snapshot:
+            self._pending.append(record)
+
+    # Количество изменений, ещё не записанных на диск
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    # Метод для сохранения: дописывание изменений или сворачивание в снимок
+    def save(self):
+        try:
+            if self._needs_snapshot:
+                self.compact()
+                return True
+            if not self._pending:
+                return True  # Изменений нет - запись не нужна
+            # Подготовка строк журнала для всех накопленных записей
+            data = self._encode(self._pending)
+            # Журнал больше снимка - дешевле свернуть его в новый снимок
+            if self._too_big(len(data)):
+                self.compact()
+                return True
+            self.append(data)
+            logging.info(f"В журнал {self.journal_path} записано изменений: {len(self._pending)}")
+            self._pending.clear()
+            return True
+        except (IOError, OSError, pickle.PicklingError) as e:  # Обработка ошибок ввода/вывода и сериализации
+            # Запись ошибки в лог
+            logging.error(f"Ошибка сохранения журнала зоопарка: {e}")
+            return False
+
+    # Вспомогательный метод: строки журнала для записей
+    @staticmethod
+    def _encode(records):
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+
+    # Вспомогательный метод: станет ли журнал после дописывания size байт больше снимка
+    def _too_big(self, size):
+        return self._journal_size + size > max(self.compact_min_bytes, self._snapshot_size)
+
+    # Метод для дописывания готовых строк в конец журнала с принудительным сбросом на диск
+    def append(self, data):
+        with open(self.journal_path, 'ab') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        self._journal_size += len(data)
+
+    # Метод для начала сохранения в рабочем потоке (вызывается в потоке, изменяющем зоопарк)
+    def begin_save(self):
+        """
+        Забирает накопленные изменения и возвращает пару (work, finish):
+        work() выполняет запись в рабочем потоке, finish(сохранено) вызывается
+        снова в потоке зоопарка и возвращает True, если нужно ещё одно
+        сохранение (свернуть журнал в снимок). Снимок пишется из копии зоопарка
+        (Zoo.snapshot), а изменения во время записи копятся для следующего сохранения.
+        """
+        if self._needs_snapshot:
+            # Отображённый в память файл нельзя заменить только в Windows: в POSIX копия и зоопарк
+            # читают прежний файл через отображение и после os.replace, и имена не декодируются здесь
+            if os.name == "nt":
+                self.zoo.release_file(self.snapshot_path)
+            snapshot = self.zoo.snapshot()
+            # Изменения после копии снова копятся для журнала
+            self._needs_snapshot = False
+            self._pending = []
+
+            # Снимок пишется во временный файл и атомарно заменяет старый, затем журнал очищается
+            def work():
+                ZooSnapshot.write(snapshot, self.snapshot_path)
+                with open(self.journal_path, 'wb'):
+                    pass
+                self._journal_size = 0
+                self._snapshot_size = os.path.getsize(self.snapshot_path)
+                logging.info("Журнал свёрнут в снимок %s.", self.snapshot_path)
+                return True
+
+            # Ошибка записи - следующее сохранение снова пишет снимок
+            def finish(saved):
+                if not saved:
+                    self._pending.clear()
+                    self._needs_snapshot = True
+                return False
+
+            return work, finish
+        pending, self._pending = self._pending, []
+
+        # Дописывание только накопленных записей
+        def work():
+            if pending:
+                self.append(self._encode(pending))
+                logging.info("В журнал %s записано изменений: %d", self.journal_path, len(pending))
+            return True
+
+        def finish(saved):
+            if self._needs_snapshot:
+                return False  # Во время записи зоопарк заменён целиком
+            if not saved:
+                # Ошибка записи - изменения войдут в следующее сохранение
+                self._pending = pending + self._pending
+                return False
+            if self._too_big(0):
+                # Журнал стал больше снимка - следующее сохранение свернёт его в снимок
+                self._pending.clear()
+                self._needs_snapshot = True
+                return True
+            return False
+
+        return work, finish
+
+    # Метод для сворачивания журнала в новый полный снимок
+    def compact(self):
+        # Снимок пишется во временный файл и атомарно заменяет старый
+        ZooSnapshot.write(self.zoo, self.snapshot_path)
+        # Очистка журнала: все его записи уже вошли в снимок
+        with open(self.journal_path, 'wb'):
+            pass
+        self._pending.clear()
+        self._needs_snapshot = False
+        self._journal_size = 0
+        self._snapshot_size = os.path.getsize(self.snapshot_path)
+        logging.info(f"Журнал свёрнут в снимок {self.snapshot_path}.")
+
+    # Метод для учёта снимка, записанного в файл снимка в обход журнала (например, в фоновом потоке)
+    def snapshot_written(self, change_seq):
+        if self._needs_snapshot:
+            # Изменения после снимка не попали в журнал - нужен ещё один снимок
+            if self.zoo.change_seq != change_seq:
+                return
+            # Старые записи журнала не относятся к новому снимку
+            with open(self.journal_path, 'wb'):
+                pass
+            self._journal_size = 0
+            self._needs_snapshot = False
+        else:
+            # Записи, вошедшие в снимок, больше не нужно дописывать
+            self._pending = [record for record in self._pending if record["seq"] > change_seq]
+        self._snapshot_size = os.path.getsize(self.snapshot_path)
+
+    # Метод для отключения журнала от зоопарка
+    def close(self):
+        self.zoo.remove_listener(self._record)
+        if self.zoo.journal is self:
+            self.zoo.journal = None
+
+    # Статический метод для применения журнала к загруженному снимку
+    @staticmethod
+    def replay(zoo, journal_path):
+        """
+        Применяет к зоопарку записи журнала, более новые, чем снимок.
+        Возвращает (количество применённых записей, журнал прочитан без повреждений).
+        """
+        if not os.path.exists(journal_path):
+            return 0, True
+        applied = 0
+        with open(journal_path, 'rb') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Недописанная строка (сбой во время записи) - дальше журнал не читается
+                    logging.warning(f"Повреждённая запись в журнале {journal_path}, остаток пропущен.")
+                    return applied, False
+                # Записи, уже вошедшие в снимок, пропускаются
+                if record["seq"] > zoo.change_seq:
+                    zoo.apply_record(record)
+                    applied += 1
+        return applied, True
+
+
+# Класс ZooSnapshot - двоичный снимок зоопарка, читаемый через отображение файла в память
+class ZooSnapshot:
+    """
+    Формат снимка: заголовок, таблица смещений секций и секции с записями
+    фиксированной ширины (ID, коды типов, возрасты, смещения имён) плюс куча
+    имён в UTF-8. При загрузке файл отображается в память (mmap), столбцы
+    животных читаются из него без копирования, а имя становится строкой Python
+    только при первом обращении. Индексы реестра животных строятся лениво.
+    """
+
+    # Признак формата в начале файла
+    MAGIC = b"ZOOSNAP1"
+    # Заголовок: признак, порядок байтов секций (0 - little, 1 - big), число секций,
+    # номер изменения, следующий ID, число животных, число сотрудников
+    HEADER = struct.Struct("<8sBxxxIQQQQ")
+    # Запись таблицы смещений: метка секции, смещение от начала файла, длина в байтах
+    SECTION = struct.Struct("<4sQQ")
+    # Выравнивание начала секций в байтах
+    ALIGN = 8
+
+    # Статический метод для проверки, является ли файл двоичным снимком
+    @staticmethod
+    def is_snapshot(filename):
+        with open(filename, 'rb') as file:
+            return file.read(len(ZooSnapshot.MAGIC)) == ZooSnapshot.MAGIC
+
+    # Вспомогательный метод: столбец имён в виде массива смещений и кучи UTF-8
+    @staticmethod
+    def _pack_names(names):
+        encoded = [name.encode("utf-8") for name in names]
+        offsets = array('Q', [0])
+        position = 0
+        for data in encoded:
+            position += len(data)
+            offsets.append(position)
+        return offsets, b"".join(encoded)
+
+    # Метод класса для записи снимка зоопарка (временный файл атомарно заменяет старый)
+    @classmethod
+    def write(cls, zoo, filename, progress=None):
+        table = zoo.animals.table
+        rows = zoo.animals.rows()  # Только занятые строки, в порядке добавления
+        animal_offsets, animal_heap = cls._pack_names([table.names[row] for row in rows])
+        staff = list(zoo.staff)
+        staff_classes = list(dict.fromkeys(member.__class__.__name__ for member in staff))
+        staff_codes = {name: code for code, name in enumerate(staff_classes)}
+        staff_offsets, staff_heap = cls._pack_names([member.name for member in staff])
+        sections = [
+            (b"ZNAM", zoo.name.encode("utf-8")),
+            (b"ACLS", "\n".join(animal_class.__name__ for animal_class in AnimalTable._classes).encode("utf-8")),
+            (b"AIDS", array('q', [table.ids[row] for row in rows])),
+            (b"ATYP", array('b', [table.type_codes[row] for row in rows])),
+            (b"AAGE", array('d', [table.ages[row] for row in rows])),
+            (b"ANOF", animal_offsets),
+            (b"AHEP", animal_heap),
+            (b"SCLS", "\n".join(staff_classes).encode("utf-8")),
+            (b"SIDS", array('q', [member.entity_id for member in staff])),
+            (b"STYP", array('b', [staff_codes[member.__class__.__name__] for member in staff])),
+            (b"SNOF", staff_offsets),
+            (b"SHEP", staff_heap),
+        ]
+        # Расчёт смещений секций с выравниванием
+        position = cls.HEADER.size + cls.SECTION.size * len(sections)
+        table_entries = []
+        for tag, data in sections:
+            position += -position % cls.ALIGN
+            length = len(data) * getattr(data, "itemsize", 1)
+            table_entries.append((tag, position, length))
+            position += length
+        temp_path = filename + ".tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(cls.HEADER.pack(cls.MAGIC, sys.byteorder == "big", len(sections), zoo.change_seq,
+                                       zoo._next_id, len(rows), len(staff)))
+            for entry in table_entries:
+                file.write(cls.SECTION.pack(*entry))
+            for (tag, data), (_, offset, _) in zip(sections, table_entries):
+                file.write(b"\0" * (offset - file.tell()))  # Выравнивание
+                file.write(data)
+                if progress is not None:
+                    progress(file.tell(), position)
+            file.flush()
+            os.fsync(file.fileno())
+        # Отображённый в память файл нельзя заменить (Windows) или изменить под таблицей
+        if table.source_path == os.path.abspath(filename):
+            table.detach()
+        os.replace(temp_path, filename)
+
+    # Метод класса для загрузки снимка (возвращает объект Zoo)
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'rb') as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)
+        buffers = [view]  # Все memoryview на файл, освобождаемые при отключении таблицы
+        magic, big_endian, count, change_seq, next_id, animal_count, staff_count = cls.HEADER.unpack_from(mapping, 0)
+        if magic != cls.MAGIC:
+            raise pickle.UnpicklingError(f"Файл {filename} не является снимком зоопарка")
+        sections = {}
+        for index in range(count):
+            tag, offset, length = cls.SECTION.unpack_from(mapping, cls.HEADER.size + cls.SECTION.size * index)
+            sections[tag] = (offset, length)
+        swap = bool(big_endian) != (sys.byteorder == "big")  # Файл записан на машине с другим порядком байтов
+
+        # Вспомогательная функция: секция в виде байтов
+        def raw(tag):
+            offset, length = sections[tag]
+            return mapping[offset:offset + length]
+
+        # Вспомогательная функция: числовой столбец без копирования (или копия при другом порядке байтов)
+        def column(tag, typecode):
+            offset, length = sections[tag]
+            if swap:
+                copied = array(typecode)
+                copied.frombytes(mapping[offset:offset + length])
+                copied.byteswap()
+                return copied
+            part = view[offset:offset + length].cast(typecode)
+            buffers.append(part)
+            return part
+
+        # Вспомогательная функция: список имён классов из секции
+        def class_names(tag):
+            data = raw(tag).decode("utf-8")
+            return data.split("\n") if data else []
+
+        # Сотрудники: их немного, они создаются сразу
+        staff_classes = [ENTITY_CLASSES[name] for name in class_names(b"SCLS")]
+        staff_ids, staff_types = column(b"SIDS", 'q'), column(b"STYP", 'b')
+        staff_offsets, staff_heap = column(b"SNOF", 'Q'), raw(b"SHEP")
+        staff = [(staff_classes[staff_types[index]](
+                      str(staff_heap[staff_offsets[index]:staff_offsets[index + 1]], "utf-8")), staff_ids[index])
+                 for index in range(staff_count)]
+        # Животные: столбцы читаются прямо из файла
+        type_codes = column(b"ATYP", 'b')
+        known = {animal_class.__name__: animal_class for animal_class in AnimalTable._classes}
+        file_classes = [known.get(name) or ENTITY_CLASSES[name] for name in class_names(b"ACLS")]
+        codes = [AnimalTable.type_code(animal_class) for animal_class in file_classes]
+        if codes != list(range(len(codes))):
+            # Коды типов в этом процессе другие - столбец перекодируется в память
+            type_codes = array('b', [codes[code] for code in type_codes])
+        offset, length = sections[b"AHEP"]
+        heap = view[offset:offset + length]
+        buffers.append(heap)
+        names = LazyNames(heap, column(b"ANOF", 'Q'))
+        table = AnimalTable.from_buffers(column(b"AIDS", 'q'), type_codes, column(b"AAGE", 'd'), names,
+                                         mapping=mapping, buffers=reversed(buffers),
+                                         source_path=os.path.abspath(filename))
+        # Зоопарк без повторного построения индексов
+        zoo = Zoo(raw(b"ZNAM").decode("utf-8"))
+        zoo._set_animals(AnimalRegistry.from_table(table))
+        for member, entity_id in staff:
+            zoo.staff.add(member, entity_id)
+        zoo._next_id = next_id
+        zoo.change_seq = change_seq
+        return zoo
+
+
+# Класс ZooHistory - отмена и повтор изменений зоопарка
+class ZooHistory:
+    """
+    История подписана на записи об изменениях зоопарка (те же, что получает
+    журнал) и для каждой хранит обратную запись: добавлению соответствует
+    удаление по ID, изменению - запись с прежними значениями, удалению -
+    добавление с тем же ID. Отмена и повтор применяют записи через
+    Zoo.apply_change, поэтому журнал и хранилище получают их как обычные
+    изменения, а время отмены пропорционально размеру изменения.
+
+    Записи между begin_group() и end_group() (или внутри group()) отменяются
+    одним шагом. Хранится не больше limit шагов; замена зоопарка целиком
+    очищает историю.
+    """
+
+    # Количество хранимых шагов по умолчанию
+    LIMIT = 200
+
+    # Конструктор класса ZooHistory
+    def __init__(self, zoo, limit=LIMIT):
+        self.zoo = zoo  # Зоопарк, изменения которого отменяются
+        self._undo = deque(maxlen=limit)  # Шаги для отмены (описание, записи, обратные записи)
+        self._redo = []  # Отменённые шаги для повтора
+        self._group = None  # Открытая группа (описание, записи, обратные записи) или None
+        self._applying = False  # Признак применения отмены или повтора (такие записи не запоминаются)
+        zoo.add_listener(self._record)  # Подписка на изменения зоопарка
+
+    # Статический метод для получения обратной записи (None - изменение нельзя отменить)
+    @staticmethod
+    def inverse(record):
+        op = record["op"]
+        if op in ("add_animal", "add_staff"):
+            return {"op": "remove", "id": record["id"]}
+        if op in ("add_animals", "add_staff_bulk"):
+            return {"op": "remove_bulk", "ids": [item[0] for item in record["items"]]}
+        if op == "update" and "before" in record:
+            return dict(record["before"], op="update", id=record["id"])
+        if op == "remove" and "type" in record:
+            if "age" in record:
+                return {"op": "add_animal", "id": record["id"], "type": record["type"], "name": record["name"],
+                        "age": record["age"]}
+            return {"op": "add_staff", "id": record["id"], "type": record["type"], "name": record["name"]}
+        return None
+
+    # Статический метод для получения описания записи
+    @staticmethod
+    def describe(record):
+        op = record["op"]
+        if op in ("add_animal", "add_staff"):
+            return f"добавление {record['name']}"
+        if op == "add_animals":
+            return f"добавление животных: {len(record['items'])}"
+        if op == "add_staff_bulk":
+            return f"добавление сотрудников: {len(record['items'])}"
+        if op == "update":
+            return f"изменение {record.get('before', {}).get('name', record.get('name', record['id']))}"
+        if op == "remove":
+            return f"удаление {record.get('name', record['id'])}"
+        return op
+
+    # Обработчик изменения зоопарка
+    def _record(self, record):
+        if self._applying:
+            return
+        inverse = self.inverse(record)
+        if inverse is None:
+            # Изменение нельзя отменить - более ранние шаги тоже
+            self.clear()
+            return
+        self._redo.clear()
+        if self._group is not None:
+            self._group[1].append(record)
+            self._group[2].append(inverse)
+        else:
+            self._undo.append((self.describe(record), [record], [inverse]))
+
+    # Метод для начала группы изменений, отменяемых одним шагом
+    def begin_group(self, label):
+        self.end_group()
+        self._group = (label, [], [])
+
+    # Метод для завершения группы изменений
+    def end_group(self):
+        group, self._group = self._group, None
+        if group is not None and group[1]:
+            self._undo.append(group)
+
+    # Контекстный менеджер для группы изменений
+    @contextlib.contextmanager
+    def group(self, label):
+        self.begin_group(label)
+        try:
+            yield self
+        finally:
+            self.end_group()
+
+    # Признак наличия шага для отмены
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    # Признак наличия шага для повтора
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    # Описание шага, который будет отменён (None - нет шагов)
+    @property
+    def undo_label(self):
+        return self._undo[-1][0] if self._undo else None
+
+    # Описание шага, который будет повторён (None - нет шагов)
+    @property
+    def redo_label(self):
+        return self._redo[-1][0] if self._redo else None
+
+    # Вспомогательный метод: применение записей без запоминания
+    def _apply(self, records):
+        self._applying = True
+        try:
+            for record in records:
+                self.zoo.apply_change(record)
+        finally:
+            self._applying = False
+
+    # Метод для отмены последнего шага (возвращает описание или None)
+    def undo(self):
+        self.end_group()
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._apply(reversed(step[2]))
+        self._redo.append(step)
+        logging.info(f"Отменено: {step[0]}")
+        return step[0]
+
+    # Метод для повтора последнего отменённого шага (возвращает описание или None)
+    def redo(self):
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        self._apply(step[1])
+        self._undo.append(step)
+        logging.info(f"Повторено: {step[0]}")
+        return step[0]
+
+    # Метод для очистки истории
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._group = None
+
+    # Метод для отключения истории от зоопарка
+    def close(self):
+        self.zoo.remove_listener(self._record)
+        self.clear()
+
+
+# Класс ZooStorage - подключаемое хранилище зоопарка
+class ZooStorage(ABC):
+    """
+    Хранилище, которое заменяет для зоопарка файл pickle. Подкласс указывает
+    расширения своих файлов (EXTENSIONS) и реализует load, write и _apply
+    (подкласс без них нельзя создать).
+    Подключённое к зоопарку хранилище получает записи о его изменениях,
+    поэтому save() записывает только накопленные изменения. search()
+    выполняет фильтр в самом хранилище (None - хранилище этого не умеет
+    или ещё не содержит несохранённых изменений зоопарка).
+    """
+
+    # Расширения файлов, которые открывает хранилище
+    EXTENSIONS = ()
+
+    # Метод класса для проверки, относится ли файл к этому хранилищу
+    @classmethod
+    def handles(cls, filename):
+        return filename.lower().endswith(cls.EXTENSIONS)
+
+    # Конструктор класса ZooStorage
+    def __init__(self, filename):
+        self.filename = os.path.abspath(filename)  # Файл хранилища
+        self.zoo = None  # Подключённый зоопарк
+        self._pending = []  # Записи об изменениях, ещё не записанные в хранилище
+        self._needs_full = False  # Следующее сохранение должно переписать хранилище целиком
+        self._saving = False  # Идёт запись, начатая begin_save()
+
+    # Метод для подключения к зоопарку (needs_full=False - хранилище уже содержит зоопарк)
+    def attach(self, zoo, needs_full=True):
+        self.detach()
+        if zoo.storage is not None:
+            zoo.storage.close()
+        self.zoo = zoo
+        zoo.storage = self
+        zoo.add_listener(self._record)
+        self._pending = []
+        self._needs_full = needs_full
+
+    # Метод для отключения от зоопарка (несохранённые изменения отбрасываются)
+    def detach(self):
+        if self.zoo is not None:
+            self.zoo.remove_listener(self._record)
+            if self.zoo.storage is self:
+                self.zoo.storage = None
+            self.zoo = None
+
+    # Обработчик изменения зоопарка
+    def _record(self, record):
+        if record["op"] == "replace":
+            # Содержимое заменено целиком - хранилище переписывается при сохранении
+            self._pending = []
+            self._needs_full = True
+        elif not self._needs_full:
+            self._pending.append(record)
+
+    # Количество изменений, ещё не записанных в хранилище
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    # Признак того, что следующее сохранение перепишет хранилище целиком
+    @property
+    def needs_full(self):
+        return self._needs_full
+
+    # Признак того, что хранилище содержит все изменения подключённого зоопарка
+    @property
+    def is_current(self):
+        return self.zoo is not None and not self._pending and not self._needs_full and not self._saving
+
+    # Метод для сохранения накопленных изменений (возвращает True при успехе)
+    def save(self):
+        if self.zoo is None:
+            return False
+        # Изменения, сделанные во время записи, попадают в следующее сохранение
+        pending, self._pending = self._pending, []
+        needs_full, self._needs_full = self._needs_full, False
+        try:
+            if needs_full:
+                self.write(self.zoo)
+            elif pending:
+                self._apply(pending)
+            if needs_full or pending:
+                logging.info(f"В хранилище {self.filename} записано изменений: "
+                             f"{'все' if needs_full else len(pending)}")
+            return True
+        except Exception as e:  # Ошибка записи - изменения остаются несохранёнными
+            self._pending = pending + self._pending
+            self._needs_full = self._needs_full or needs_full
+            logging.error(f"Ошибка сохранения в хранилище {self.filename}: {e}")
+            return False
+
+    # Метод для начала сохранения в рабочем потоке (вызывается в потоке, изменяющем зоопарк)
+    def begin_save(self):
+        """
+        Возвращает пару (work, finish), как ZooJournal.begin_save: полная запись
+        выполняется из копии зоопарка, иначе записываются только накопленные изменения.
+        """
+        pending, self._pending = self._pending, []
+        needs_full, self._needs_full = self._needs_full, False
+        snapshot = self.zoo.snapshot() if needs_full else None
+        self._saving = True  # До конца записи фильтр выполняет зоопарк
+
+        # Запись в рабочем потоке
+        def work():
+            if needs_full:
+                self.write(snapshot)
+            elif pending:
+                self._apply(pending)
+            if needs_full or pending:
+                logging.info("В хранилище %s записано изменений: %s", self.filename,
+                             "все" if needs_full else len(pending))
+            return True
+
+        # Завершение в потоке зоопарка (при ошибке изменения войдут в следующее сохранение)
+        def finish(saved):
+            self._saving = False
+            if not saved and not self._needs_full:
+                self._pending = [] if needs_full else pending + self._pending
+                self._needs_full = needs_full
+            return False
+
+        return work, finish
+
+    # Метод для отметки о том, что копия зоопарка с номером изменения change_seq записана через write()
+    def snapshot_written(self, change_seq):
+        if self._needs_full:
+            # Изменения после копии не попали в хранилище - нужна ещё одна полная запись
+            if self.zoo is None or self.zoo.change_seq != change_seq:
+                return
+            self._needs_full = False
+        # Изменения, вошедшие в копию, больше не нужно записывать
+        self._pending = [record for record in self._pending if record["seq"] > change_seq]
+
+    # Метод для загрузки зоопарка (зоопарк возвращается подключённым к хранилищу)
+    @abstractmethod
+    def load(self):
+        pass
+
+    # Метод для записи зоопарка целиком
+    @abstractmethod
+    def write(self, zoo):
+        pass
+
+    # Вспомогательный метод: запись накопленных изменений
+    @abstractmethod
+    def _apply(self, records):
+        pass
+
+    # Метод для поиска ID (животные, сотрудники) по подстроке имени и возрасту внутри хранилища
+    def search(self, text, class_name=None, age_min=None, age_max=None):
+        return None
+
+    # Метод для закрытия хранилища
+    def close(self):
+        self.detach()
+
+
+# Класс SqliteStorage - хранение зоопарка в базе SQLite
+class SqliteStorage(ZooStorage):
+    """
+    Каждая сущность - строка таблицы entities с индексами по имени в нижнем
+    регистре, по классу с возрастом и по возрасту. База работает в режиме WAL,
+    изменения записываются одной транзакцией на сохранение (пакетные вставки -
+    executemany), поэтому правка одного поля меняет одну строку, а не весь файл.
+    Фильтр по подстроке имени и классу выполняется запросом к базе: подстроку
+    от трёх символов находит полнотекстовый индекс FTS5 с триграммами
+    (entities_search, обновляется триггерами), а более короткую подстроку,
+    как и при SQLite без FTS5, - перебор таблицы (LIKE с ведущим %).
+    """
+
+    # Расширения файлов базы
+    EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+    # Таблицы базы
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS entities (
+            id INTEGER PRIMARY KEY,
+            kind INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            name TEXT NOT NULL,
+            name_key TEXT NOT NULL,
+            age REAL
+        );
+    """
+    # Индексы (имя -> столбцы)
+    INDEXES = {"entities_name_key": "name_key", "entities_type_age": "type, age", "entities_age": "age"}
+    # Триграммный индекс подстрок имени поверх таблицы entities
+    SEARCH_TABLE = ("CREATE VIRTUAL TABLE entities_search USING fts5(name_key, content='entities', "
+                    "content_rowid='id', tokenize='trigram')")
+    # Триггеры, поддерживающие триграммный индекс (имя -> тело)
+    SEARCH_TRIGGERS = {
+        "entities_search_insert": "AFTER INSERT ON entities BEGIN "
+        "INSERT INTO entities_search (rowid, name_key) VALUES (new.id, new.name_key); END",
+        "entities_search_delete": "AFTER DELETE ON entities BEGIN "
+        "INSERT INTO entities_search (entities_search, rowid, name_key) VALUES ('delete', old.id, old.name_key); END",
+        "entities_search_update": "AFTER UPDATE OF name_key ON entities BEGIN "
+        "INSERT INTO entities_search (entities_search, rowid, name_key) VALUES ('delete', old.id, old.name_key); "
+        "INSERT INTO entities_search (rowid, name_key) VALUES (new.id, new.name_key); END",
+    }
+    # Наименьшая длина подстроки, которую находит триграммный индекс
+    SEARCH_MIN_LENGTH = 3
+    # Вид сущности в столбце kind
+    ANIMAL = 0
+    STAFF = 1
+    # Вставка строки сущности
+    INSERT = "INSERT OR REPLACE INTO entities (id, kind, type, name, name_key, age) VALUES (?, ?, ?, ?, ?, ?)"
+
+    # Конструктор класса SqliteStorage
+    def __init__(self, filename):
+        super().__init__(filename)
+        self._connection = None  # Соединение с базой (открывается при первом обращении)
+        self._lock = threading.Lock()  # Соединение используется и окном, и потоком сохранения
+        self._fts = False  # Есть триграммный индекс подстрок (SQLite собран с FTS5)
+
+    # Вспомогательный метод: соединение с базой
+    def _connect(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self.filename, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")  # Чтение не ждёт записи
+            connection.execute("PRAGMA synchronous=NORMAL")  # Сброс на диск при контрольных точках WAL
+            connection.execute("PRAGMA recursive_triggers=ON")  # INSERT OR REPLACE вызывает и триггер удаления
+            connection.executescript(self.SCHEMA)
+            self._fts = self._create_search_table(connection)
+            self._create_indexes(connection)
+            self._connection = connection
+        return self._connection
+
+    # Вспомогательный метод: создание триграммного индекса (False - SQLite без FTS5 или триграмм)
+    def _create_search_table(self, connection):
+        if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'entities_search'").fetchone():
+            return True
+        try:
+            with connection:
+                connection.execute(self.SEARCH_TABLE)
+                # База прежней версии: индекс заполняется уже записанными именами
+                connection.execute("INSERT INTO entities_search (entities_search) VALUES ('rebuild')")
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Триграммный индекс недоступен, подстрока имени ищется перебором: {e}")
+            return False
+        return True
+
+    # Вспомогательный метод: создание индексов и триггеров триграммного индекса
+    def _create_indexes(self, connection):
+        for index, columns in self.INDEXES.items():
+            connection.execute(f"CREATE INDEX IF NOT EXISTS {index} ON entities ({columns})")
+        if self._fts:
+            for trigger, body in self.SEARCH_TRIGGERS.items():
+                connection.execute(f"CREATE TRIGGER IF NOT EXISTS {trigger} {body}")
+
+    # Вспомогательный метод: запись названия и номера изменения зоопарка
+    def _write_meta(self, connection, zoo):
+        connection.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                               [("name", zoo.name), ("change_seq", str(zoo.change_seq))])
+
+    # Метод для записи зоопарка целиком (одной транзакцией)
+    def write(self, zoo):
+        animal, staff = self.ANIMAL, self.STAFF
+        rows = itertools.chain(
+            ((entity_id, animal, class_name, name, name.lower(), age)
+             for entity_id, class_name, name, age in zoo.animals.records()),
+            ((entity_id, staff, class_name, name, name.lower(), None)
+             for entity_id, class_name, name, _ in zoo.staff.records()))
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                # Индексы и триггеры удаляются на время вставки и строятся заново (так в несколько раз быстрее)
+                for index in self.INDEXES:
+                    connection.execute(f"DROP INDEX IF EXISTS {index}")
+                for trigger in self.SEARCH_TRIGGERS:
+                    connection.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                connection.execute("DELETE FROM entities")
+                connection.executemany(self.INSERT, rows)
+                if self._fts:
+                    connection.execute("INSERT INTO entities_search (entities_search) VALUES ('rebuild')")
+                self._create_indexes(connection)
+                self._write_meta(connection, zoo)
+        logging.info(f"Зоопарк записан в базу {self.filename}.")
+        return True
+
+    # Вспомогательный метод: запись накопленных изменений одной транзакцией
+    def _apply(self, records):
+        animal, staff = self.ANIMAL, self.STAFF
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                for record in records:
+                    op = record["op"]
+                    if op == "add_animal":
+                        name = record["name"]
+                        connection.execute(self.INSERT, (record["id"], animal, record["type"], name, name.lower(),
+                                                         record["age"]))
+                    elif op == "add_staff":
+                        name = record["name"]
+                        connection.execute(self.INSERT, (record["id"], staff, record["type"], name, name.lower(),
+                                                         None))
+                    elif op == "add_animals":
+                        connection.executemany(self.INSERT, ((entity_id, animal, type_name, name, name.lower(), age)
+                                                             for entity_id, type_name, name, age in record["items"]))
+                    elif op == "add_staff_bulk":
+                        connection.executemany(self.INSERT, ((entity_id, staff, type_name, name, name.lower(), None)
+                                                             for entity_id, type_name, name in record["items"]))
+                    elif op == "update":
+                        if "name" in record:
+                            connection.execute("UPDATE entities SET name = ?, name_key = ? WHERE id = ?",
+                                               (record["name"], record["name"].lower(), record["id"]))
+                        if "age" in record:
+                            connection.execute("UPDATE entities SET age = ? WHERE id = ?",
+                                               (record["age"], record["id"]))
+                    elif op == "remove":
+                        connection.execute("DELETE FROM entities WHERE id = ?", (record["id"],))
+                    elif op == "remove_bulk":
+                        connection.executemany("DELETE FROM entities WHERE id = ?",
+                                               ((entity_id,) for entity_id in record["ids"]))
+                self._write_meta(connection, self.zoo)
+
+    # Метод для загрузки зоопарка из базы
+    def load(self):
+        """
+        Животные читаются в столбцы таблицы (как из двоичного снимка), поэтому
+        индексы в памяти строятся только по требованию, а до тех пор фильтры
+        выполняет база.
+        """
+        if not os.path.exists(self.filename):
+            raise FileNotFoundError(f"Файл {self.filename} не найден")
+        with self._lock:
+            connection = self._connect()
+            meta = dict(connection.execute("SELECT key, value FROM meta"))
+            animal_rows = connection.execute("SELECT id, type, name, age FROM entities WHERE kind = ? ORDER BY id",
+                                             (self.ANIMAL,)).fetchall()
+            staff_rows = connection.execute("SELECT id, type, name FROM entities WHERE kind = ? ORDER BY id",
+                                            (self.STAFF,)).fetchall()
+            last_id = connection.execute("SELECT max(id) FROM entities").fetchone()[0] or 0
+        # Коды типов таблицы по именам классов базы
+        codes = {type_name: AnimalTable.type_code(ENTITY_CLASSES[type_name])
+                 for type_name in {row[1] for row in animal_rows}}
+        table = AnimalTable.from_buffers(array('q', [row[0] for row in animal_rows]),
+                                         array('b', [codes[row[1]] for row in animal_rows]),
+                                         array('d', [row[3] for row in animal_rows]),
+                                         [sys.intern(row[2]) for row in animal_rows])
+        zoo = Zoo(meta.get("name", "Новый зоопарк | New Zoo"))
+        zoo._set_animals(AnimalRegistry.from_table(table))
+        for entity_id, type_name, name in staff_rows:
+            zoo.staff.add(ENTITY_CLASSES[type_name](name), entity_id)
+        zoo._next_id = last_id + 1
+        zoo.change_seq = int(meta.get("change_seq", 0))
+        self.attach(zoo, needs_full=False)
+        return zoo
+
+    # Метод для поиска ID (животные, сотрудники) запросом к базе
+    def search(self, text, class_name=None, age_min=None, age_max=None):
+        # Несохранённые изменения есть только в памяти - фильтр выполняет зоопарк
+        if not self.is_current:
+            return None
+        conditions, params = [], []
+        text = text.lower()
+        with self._lock:
+            self._connect()  # Наличие триграммного индекса известно после подключения
+        by_trigrams = self._fts and len(text) >= self.SEARCH_MIN_LENGTH
+        if by_trigrams:
+            # Подстрока - фраза из подряд идущих триграмм (кавычки внутри удваиваются)
+            conditions.append("id IN (SELECT rowid FROM entities_search WHERE entities_search MATCH ?)")
+            params.append('"' + text.replace('"', '""') + '"')
+        elif text:
+            # Короткая подстрока: перебор таблицы по шаблону LIKE (служебные символы экранируются)
+            escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append("name_key LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        if class_name is not None:
+            # При поиске по триграммам индекс по типу не используется (+type): найденных строк меньше, чем строк класса
+            conditions.append("+type = ?" if by_trigrams else "type = ?")
+            params.append(class_name)
+        # Диапазон возраста выбирается по индексу (type, age) или age, только среди животных
+        order = "id"
+        if age_min is not None or age_max is not None:
+            conditions.append("kind = ?")
+            params.append(self.ANIMAL)
+            if age_min is not None:
+                conditions.append("age >= ?")
+                params.append(age_min)
+            if age_max is not None:
+                conditions.append("age <= ?")
+                params.append(age_max)
+            order = "age, id"  # Тот же порядок, что у индекса возраста в памяти
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT id, kind FROM entities{where} ORDER BY {order}"
+        animal_ids, staff_ids = [], []
+        with self._lock:
+            for entity_id, kind in self._connect().execute(query, params):
+                (staff_ids if kind == self.STAFF else animal_ids).append(entity_id)
+        return animal_ids, staff_ids
+
+    # Метод для закрытия хранилища и соединения с базой
+    def close(self):
+        super().close()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+# Подключаемые хранилища (класс выбирается по расширению файла)
+STORAGE_BACKENDS = [SqliteStorage]
+
+
+# Функция для выбора класса хранилища по имени файла (None - файл pickle или снимок)
+def storage_for(filename):
+    for backend in STORAGE_BACKENDS:
+        if backend.handles(filename):
+            return backend
+    return None
+
+
+# Класс ZooAutosave - отложенное фоновое сохранение изменённого зоопарка
+class ZooAutosave:
+    """
+    Подписан на записи об изменениях зоопарка и запоминает ID изменённых
+    сущностей (dirty_ids). Сохранение пора выполнять (due), когда изменений
+    не было interval секунд, но не позже max_delay секунд после первого
+    несохранённого изменения, или сразу, когда изменено не меньше threshold
+    сущностей либо нужна полная запись (зоопарк заменён целиком или журнал
+    пора свернуть в снимок).
+
+    Запись выполняют журнал или хранилище файла filename (begin_save):
+    в журнал дописываются только записи об изменениях, а полный снимок
+    пишется во временный файл и атомарно заменяет прежний. start() и poll()
+    вызываются в потоке, изменяющем зоопарк (окно вызывает poll() из after()),
+    сама запись идёт в рабочем потоке.
+    """
+
+    # Пауза после последнего изменения в секундах
+    INTERVAL = 5.0
+    # Наибольшая задержка после первого несохранённого изменения в секундах
+    MAX_DELAY = 60.0
+    # Количество изменённых сущностей, после которого сохранение не откладывается
+    THRESHOLD = 1000
+
+    # Конструктор класса ZooAutosave
+    def __init__(self, zoo, filename, interval=INTERVAL, threshold=THRESHOLD, max_delay=MAX_DELAY):
+        self.zoo = zoo  # Сохраняемый зоопарк
+        self.filename = os.path.abspath(filename)  # Файл журнала или хранилища
+        self.interval = interval  # Пауза после последнего изменения
+        self.threshold = threshold  # Порог количества изменённых сущностей
+        self.max_delay = max_delay  # Наибольшая задержка сохранения
+        self.dirty_ids = set()  # ID сущностей, изменённых после последнего сохранения
+        self._full = False  # Следующее сохранение пишет зоопарк целиком (замена или сворачивание журнала)
+        self._first_change = None  # Время первого несохранённого изменения (time.monotonic)
+        self._last_change = None  # Время последнего изменения (time.monotonic)
+        self._thread = None  # Рабочий поток текущей записи
+        self._result = None  # (finish, сохранено) завершённой записи
+        self._saving = None  # (ID, полная запись) изменений, которые сейчас записываются
+        self._retry_at = None  # Время повтора после неудачной записи (time.monotonic)
+        self.saves = 0  # Количество успешных автосохранений
+        self.failures = 0  # Количество неудачных автосохранений
+        self.last_saved = None  # Время последнего автосохранения (time.time)
+        zoo.add_listener(self._record)  # Подписка на изменения зоопарка
+
+    # Обработчик изменения зоопарка
+    def _record(self, record):
+        op = record["op"]
+        if op == "replace":
+            self._full = True
+        elif op in ("add_animals", "add_staff_bulk"):
+            self.dirty_ids.update(item[0] for item in record["items"])
+        elif op == "remove_bulk":
+            self.dirty_ids.update(record["ids"])
+        else:
+            self.dirty_ids.add(record["id"])
+        self._last_change = time.monotonic()
+        if self._first_change is None:
+            self._first_change = self._last_change
+
+    # Признак несохранённых изменений
+    @property
+    def dirty(self):
+        return self._full or bool(self.dirty_ids)
+
+    # Выполняется ли запись
+    @property
+    def running(self):
+        return self._thread is not None
+
+    # Метод для проверки, пора ли сохранять
+    def due(self, now=None):
+        if self.running or not self.dirty:
+            return False
+        now = time.monotonic() if now is None else now
+        if self._retry_at is not None and now < self._retry_at:
+            return False  # После ошибки записи повтор откладывается
+        if self._full or len(self.dirty_ids) >= self.threshold:
+            return True
+        return now - self._last_change >= self.interval or now - self._first_change >= self.max_delay
+
+    # Вспомогательный метод: журнал или хранилище, которые пишут в файл автосохранения
+    def _writer(self):
+        zoo = self.zoo
+        if zoo.storage is not None and zoo.storage.filename == self.filename:
+            return zoo.storage
+        if zoo.journal is None and storage_for(self.filename) is None:
+            zoo.enable_journal(self.filename)  # Первое сохранение запишет полный снимок
+        if zoo.journal is not None and zoo.journal.snapshot_path == self.filename:
+            return zoo.journal
+        return None
+
+    # Метод для запуска записи накопленных изменений в рабочем потоке (False - запись не начата)
+    def start(self):
+        if self.running or not self.dirty:
+            return False
+        writer = self._writer()
+        if writer is None:
+            logging.warning("Автосохранение в %s невозможно: файл не подключён к зоопарку", self.filename)
+            return False
+        work, finish = writer.begin_save()
+        # Изменения, сделанные во время записи, войдут в следующее сохранение
+        self._saving = (self.dirty_ids, self._full)
+        self.dirty_ids = set()
+        self._full = False
+        self._first_change = self._last_change = None
+
+        # Тело рабочего потока
+        def run():
+            try:
+                saved = work()
+            except Exception as e:  # Ошибка записи передаётся в поток зоопарка
+                logging.error("Ошибка автосохранения в %s: %s", self.filename, e)
+                saved = False
+            self._result = (finish, saved)
+
+        self._thread = threading.Thread(target=run, name="zoo-autosave")
+        self._thread.start()
+        return True
+
+    # Вспомогательный метод: завершение записи в потоке зоопарка
+    def _finish(self):
+        self._thread.join()
+        self._thread = None
+        finish, saved = self._result
+        self._result = None
+        ids, full = self._saving
+        self._saving = None
+        # Журнал стал больше снимка - снимок пишется при следующем опросе
+        if finish(saved):
+            self._full = True
+        if saved:
+            self.saves += 1
+            self.last_saved = time.time()
+            self._retry_at = None
+            return
+        # Несохранённые изменения снова отмечаются, следующая попытка - через interval
+        self.failures += 1
+        self.dirty_ids |= ids
+        self._full = self._full or full
+        now = time.monotonic()
+        self._retry_at = now + self.interval
+        if self._first_change is None:
+            self._first_change = now
+        if self._last_change is None:
+            self._last_change = now
+
+    # Метод для периодического вызова: завершение записи и запуск следующей, когда пора
+    def poll(self):
+        if self._thread is not None and not self._thread.is_alive():
+            self._finish()
+        if self.due():
+            self.start()
+
+    # Метод для ожидания текущей записи (перед сохранением или загрузкой вручную)
+    def wait(self):
+        if self._thread is not None:
+            self._finish()
+
+    # Метод для отключения автосохранения (текущая запись дожидается завершения)
+    def close(self):
+        self.wait()
+        self.zoo.remove_listener(self._record)
+
+
+# Класс ZooImporter - потоковый импорт животных и сотрудников из CSV или JSONL
+class ZooImporter:
+    """
+    Читает файл построчно и добавляет сущности пачками по chunk_rows строк
+    через Zoo.add_animals и Zoo.add_staff_bulk, поэтому размер файла не ограничен
+    памятью. Каждая строка содержит поля type (Bird, Mammal, Reptile, ZooKeeper,
+    Veterinarian или русское название вида), name и age (только для животных).
+    Ошибочные строки пропускаются и учитываются в skipped и errors.
+    """
+
+    # Количество строк в одной пачке
+    CHUNK_ROWS = 5000
+    # Наибольшее количество сохраняемых сообщений об ошибочных строках
+    MAX_ERRORS = 100
+    # Русские названия видов и должностей
+    TYPE_ALIASES = {"птица": "Bird", "млекопитающее": "Mammal", "рептилия": "Reptile",
+                    "смотритель": "ZooKeeper", "ветеринар": "Veterinarian"}
+
+    # Конструктор класса ZooImporter
+    def __init__(self, zoo, chunk_rows=CHUNK_ROWS):
+        self.zoo = zoo  # Зоопарк, в который добавляются сущности
+        self.chunk_rows = chunk_rows  # Строк в пачке
+        self.rows = 0  # Прочитано строк данных
+        self.animals = 0  # Добавлено животных
+        self.staff = 0  # Добавлено сотрудников
+        self.skipped = 0  # Пропущено ошибочных строк
+        self.errors = []  # Сообщения о первых ошибочных строках
+        self.bytes_read = 0  # Прочитано байт файла
+        self.total_bytes = 0  # Размер файла в байтах
+        self.seconds = 0.0  # Время импорта в секундах
+        self._started = None  # Время начала импорта
+
+    # Метод для получения класса сущности по значению поля type (ValueError - неизвестный тип)
+    def entity_class(self, type_name):
+        type_name = str(type_name or "").strip()
+        type_name = self.TYPE_ALIASES.get(type_name.lower(), type_name)
+        entity_class = ENTITY_CLASSES.get(type_name)
+        if entity_class is None:
+            # Имя класса без учёта регистра
+            for name, candidate in ENTITY_CLASSES.items():
+                if name.lower() == type_name.lower():
+                    return candidate
+            raise ValueError(f"неизвестный тип {type_name!r}")
+        return entity_class
+
+    # Метод для создания сущности из полей type, name, age (ValueError - ошибка в полях)
+    def entity(self, fields):
+        entity_class = self.entity_class(fields.get("type"))
+        name = str(fields.get("name") or "").strip()
+        if not name:
+            raise ValueError("пустое имя")
+        if issubclass(entity_class, Staff):
+            return entity_class(name)
+        try:
+            age = float(fields.get("age"))
+        except (TypeError, ValueError):
+            raise ValueError(f"возраст {fields.get('age')!r} не является числом")
+        if not age > 0:
+            raise ValueError("возраст должен быть положительным числом")
+        return entity_class(name, age)
+
+    # Вспомогательный метод: строки файла в байтах с подсчётом прочитанного
+    def _lines(self, file):
+        for line in file:
+            self.bytes_read += len(line)
+            yield line
+
+    # Вспомогательный метод: поля строк файла (номер строки, словарь полей)
+    def _records(self, file, file_format):
+        text_lines = codecs.iterdecode(self._lines(file), "utf-8-sig")
+        if file_format == "jsonl":
+            for line_no, line in enumerate(text_lines, start=1):
+                if line.strip():
+                    try:
+                        fields = json.loads(line)
+                    except ValueError as e:
+                        yield line_no, e
+                        continue
+                    yield line_no, fields if isinstance(fields, dict) else ValueError("ожидался объект JSON")
+            return
+        # CSV: разделитель определяется по строке заголовка
+        header = next(text_lines, "")
+        try:
+            dialect = csv.Sniffer().sniff(header, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.DictReader(itertools.chain([header], text_lines), dialect=dialect)
+        reader.fieldnames = [field.strip().lower() for field in reader.fieldnames or []]
+        for fields in reader:
+            yield reader.line_num, fields
+
+    # Метод для чтения файла пачками (генератор пар (животные, сотрудники))
+    def chunks(self, filename, file_format=None):
+        """
+        Читает файл и выдаёт пачки готовых сущностей, не добавляя их в зоопарк.
+        Формат определяется по расширению (.jsonl, .ndjson - JSONL, иначе CSV).
+        """
+        if file_format is None:
+            file_format = "jsonl" if filename.lower().endswith((".jsonl", ".ndjson")) else "csv"
+        self.total_bytes = os.path.getsize(filename)
+        self._started = time.perf_counter()
+        animals, staff = [], []
+        with open(filename, 'rb') as file:
+            for line_no, fields in self._records(file, file_format):
+                self.rows += 1
+                try:
+                    if isinstance(fields, Exception):
+                        raise fields
+                    entity = self.entity(fields)
+                except ValueError as e:
+                    self.skipped += 1
+                    if len(self.errors) < self.MAX_ERRORS:
+                        self.errors.append(f"Строка {line_no}: {e}")
+                    continue
+                (staff if isinstance(entity, Staff) else animals).append(entity)
+                if len(animals) + len(staff) >= self.chunk_rows:
+                    yield animals, staff
+                    animals, staff = [], []
+        if animals or staff:
+            yield animals, staff
+
+    # Метод для добавления пачки в зоопарк
+    def insert(self, chunk):
+        animals, staff = chunk
+        self.animals += len(self.zoo.add_animals(animals))
+        self.staff += len(self.zoo.add_staff_bulk(staff))
+        self.seconds = time.perf_counter() - self._started
+
+    # Метод для импорта всего файла (progress(прочитано байт, размер файла) - обработчик прогресса)
+    def import_file(self, filename, file_format=None, progress=None):
+        for chunk in self.chunks(filename, file_format):
+            self.insert(chunk)
+            if progress is not None:
+                progress(self.bytes_read, self.total_bytes)
+        self.seconds = time.perf_counter() - self._started
+        logging.info(f"Импорт из {filename}: {self.summary()}")
+        return self
+
+    # Скорость импорта в строках в секунду
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    # Метод для получения краткого отчёта об импорте
+    def summary(self):
+        return (f"строк {self.rows}, животных {self.animals}, сотрудников {self.staff}, "
+                f"пропущено {self.skipped}, {self.rows_per_second:.0f} строк/с")
+
+
+# Класс ZooExporter - потоковый экспорт животных и сотрудников
+class ZooExporter:
+    """
+    Записывает животных и сотрудников в CSV, JSONL или столбцовый файл.
+    Записи берутся генератором EntityRegistry.records прямо из индексов
+    (для животных - из столбцов таблицы), поэтому расход памяти не зависит
+    от размера зоопарка: CSV и JSONL пишутся построчно, столбцовый файл -
+    блоками по chunk_rows записей. Поля: id, type, name, age (у сотрудников пусто).
+    """
+
+    # Поля записи
+    FIELDS = ("id", "type", "name", "age")
+    # Количество записей в блоке столбцового файла
+    CHUNK_ROWS = 65536
+    # Признак столбцового файла
+    COLUMNAR_MAGIC = b"ZOOCOL1\n"
+    # Заголовок блока: количество записей и количество столбцов
+    BLOCK = struct.Struct("<II")
+    # Заголовок столбца: метка и длина данных в байтах
+    COLUMN = struct.Struct("<4sQ")
+    # Типы столбцов: метка -> код типа массива (CLSS и NAME - байты)
+    COLUMN_TYPES = {b"ID  ": 'q', b"TYPE": 'b', b"AGE ": 'd', b"NOFF": 'Q'}
+
+    # Конструктор класса ZooExporter
+    def __init__(self, zoo, chunk_rows=CHUNK_ROWS):
+        self.zoo = zoo  # Экспортируемый зоопарк
+        self.chunk_rows = chunk_rows  # Записей в блоке столбцового файла
+        self.rows = 0  # Записано записей
+        self.total_rows = 0  # Ожидаемое количество записей
+        self.seconds = 0.0  # Время экспорта в секундах
+
+    # Статический метод для определения формата по расширению файла
+    @staticmethod
+    def format_of(filename):
+        name = filename.lower()
+        if name.endswith((".jsonl", ".ndjson")):
+            return "jsonl"
+        if name.endswith(".zcol"):
+            return "columnar"
+        return "csv"
+
+    # Метод для перебора экспортируемых записей (сначала животные, затем сотрудники)
+    def records(self, animal_ids=None, staff_ids=None):
+        yield from self.zoo.animals.records(animal_ids)
+        yield from self.zoo.staff.records(staff_ids)
+
+    # Вспомогательный метод: учёт записанных записей с уведомлением о прогрессе
+    def _counted(self, records, progress):
+        for record in records:
+            self.rows += 1
+            if progress is not None and self.rows % self.chunk_rows == 0:
+                progress(self.rows, self.total_rows)
+            yield record
+
+    # Метод для экспорта в файл (progress(записано записей, всего записей) - обработчик прогресса)
+    def export_file(self, filename, file_format=None, animal_ids=None, staff_ids=None, progress=None):
+        file_format = file_format or self.format_of(filename)
+        started = time.perf_counter()
+        self.total_rows = ((len(self.zoo.animals) if animal_ids is None else len(animal_ids))
+                           + (len(self.zoo.staff) if staff_ids is None else len(staff_ids)))
+        records = self._counted(self.records(animal_ids, staff_ids), progress)
+        if file_format == "csv":
+            self._write_csv(filename, records)
+        elif file_format == "jsonl":
+            self._write_jsonl(filename, records)
+        elif file_format == "columnar":
+            self._write_columnar(filename, records)
+        else:
+            raise ValueError(f"Неизвестный формат экспорта: {file_format}")
+        self.seconds = time.perf_counter() - started
+        if progress is not None:
+            progress(self.rows, self.total_rows)
+        logging.info(f"Экспорт в {filename} ({file_format}): записей {self.rows} за {self.seconds:.2f} с")
+        return self
+
+    # Вспомогательный метод: запись CSV (с BOM, чтобы Excel распознал UTF-8)
+    def _write_csv(self, filename, records):
+        with open(filename, 'w', encoding="utf-8-sig", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(self.FIELDS)
+            writer.writerows((entity_id, type_name, name, "" if age is None else age)
+                             for entity_id, type_name, name, age in records)
+
+    # Вспомогательный метод: запись JSONL (одна запись - одна строка)
+    def _write_jsonl(self, filename, records):
+        fields = self.FIELDS
+        encode = json.JSONEncoder(ensure_ascii=False).encode  # Один кодировщик на весь файл
+        with open(filename, 'w', encoding="utf-8") as file:
+            file.writelines(encode(dict(zip(fields, record))) + "\n" for record in records)
+
+    # Вспомогательный метод: запись столбцового файла блоками
+    def _write_columnar(self, filename, records):
+        with open(filename, 'wb') as file:
+            file.write(self.COLUMNAR_MAGIC)
+            file.write(struct.pack("<B", sys.byteorder == "big"))  # Порядок байтов числовых столбцов
+            while True:
+                block = list(itertools.islice(records, self.chunk_rows))
+                if not block:
+                    break
+                self._write_block(file, block)
+
+    # Вспомогательный метод: запись одного блока столбцов
+    def _write_block(self, file, block):
+        classes = list(dict.fromkeys(record[1] for record in block))  # Словарь классов блока
+        codes = {name: code for code, name in enumerate(classes)}
+        encoded = [record[2].encode("utf-8") for record in block]
+        offsets = array('Q', [0])
+        position = 0
+        for data in encoded:
+            position += len(data)
+            offsets.append(position)
+        columns = [
+            (b"ID  ", array('q', [record[0] for record in block])),
+            (b"TYPE", array('b', [codes[record[1]] for record in block])),
+            (b"AGE ", array('d', [float("nan") if record[3] is None else record[3] for record in block])),
+            (b"CLSS", "\n".join(classes).encode("utf-8")),
+            (b"NOFF", offsets),
+            (b"NAME", b"".join(encoded)),
+        ]
+        file.write(self.BLOCK.pack(len(block), len(columns)))
+        for tag, data in columns:
+            data = data.tobytes() if isinstance(data, array) else data
+            file.write(self.COLUMN.pack(tag, len(data)))
+            file.write(data)
+
+    # Статический метод для чтения столбцового файла по блокам
+    @staticmethod
+    def read_columnar(filename):
+        """
+        Генератор блоков столбцового файла: словари с ключами id, age (массивы),
+        type и name (списки строк). В памяти находится только текущий блок.
+        """
+        exporter = ZooExporter
+        with open(filename, 'rb') as file:
+            if file.read(len(exporter.COLUMNAR_MAGIC)) != exporter.COLUMNAR_MAGIC:
+                raise ValueError(f"Файл {filename} не является столбцовым экспортом зоопарка")
+            swap = bool(file.read(1)[0]) != (sys.byteorder == "big")
+            while True:
+                header = file.read(exporter.BLOCK.size)
+                if len(header) < exporter.BLOCK.size:
+                    return
+                rows, column_count = exporter.BLOCK.unpack(header)
+                columns = {}
+                for _ in range(column_count):
+                    tag, length = exporter.COLUMN.unpack(file.read(exporter.COLUMN.size))
+                    data = file.read(length)
+                    typecode = exporter.COLUMN_TYPES.get(tag)
+                    if typecode is not None:
+                        data = array(typecode, data)
+                        if swap:
+                            data.byteswap()
+                    columns[tag] = data
+                classes = columns[b"CLSS"].decode("utf-8").split("\n")
+                offsets, heap = columns[b"NOFF"], columns[b"NAME"]
+                yield {
+                    "id": columns[b"ID  "],
+                    "type": [classes[code] for code in columns[b"TYPE"]],
+                    "name": [heap[offsets[row]:offsets[row + 1]].decode("utf-8") for row in range(rows)],
+                    "age": columns[b"AGE "],
+                }
+
+
+# Класс ProgressFile - файл, сообщающий о количестве прочитанных или записанных байт
+class ProgressFile:
+    """
+    Обёртка над открытым файлом для pickle: вызывает progress(байт, всего)
+    не чаще, чем раз в STEP байт. Если размер заранее неизвестен, всего = None.
+    """
+
+    # Шаг уведомлений о прогрессе в байтах
+    STEP = 1024 * 1024
+
+    # Конструктор класса ProgressFile
+    def __init__(self, file, progress, total=None):
+        self._file = file  # Исходный файл
+        self._progress = progress  # Обработчик прогресса
+        self._total = total  # Ожидаемый размер в байтах
+        self._done = 0  # Обработано байт
+        self._reported = 0  # Значение при последнем уведомлении
+
+    # Вспомогательный метод: учёт обработанных байт
+    def _advance(self, count):
+        self._done += count
+        if self._done - self._reported >= self.STEP:
+            self._reported = self._done
+            self._progress(self._done, self._total)
+
+    # Чтение байт
+    def read(self, size=-1):
+        data = self._file.read(size)
+        self._advance(len(data))
+        return data
+
+    # Чтение строки
+    def readline(self, size=-1):
+        data = self._file.readline(size)
+        self._advance(len(data))
+        return data
+
+    # Чтение в готовый буфер
+    def readinto(self, buffer):
+        count = self._file.readinto(buffer)
+        self._advance(count or 0)
+        return count
+
+    # Запись байт
+    def write(self, data):
+        count = self._file.write(data)
+        self._advance(len(data))
+        return count
+
+
+# Класс ZooUnpickler - загрузка pickle-файлов, сохранённых до выделения модели в модуль
+class ZooUnpickler(pickle.Unpickler):
+    """
+    Файлы, сохранённые запуском main.py, ссылаются на классы модуля __main__
+    (или main). Такие классы ищутся в этом модуле, поэтому старые файлы
+    загружаются из любой точки входа.
+    """
+
+    # Модули, из которых классы модели переехали в zoo_models
+    LEGACY_MODULES = ("__main__", "main")
+
+    # Поиск класса по имени модуля и имени класса
+    def find_class(self, module, name):
+        if module in self.LEGACY_MODULES and name in globals():
+            return globals()[name]
+        return super().find_class(module, name)
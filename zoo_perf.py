@@ -0,0 +1,171 @@
+"""
+Замеры времени горячих путей зоопарка. Обработчики окна (добавление,
+звуки, сохранение, загрузка, фильтр и другие) помечены perf_monitor.timed()
+в местах вызова, и каждая операция записывается под одним именем. Пока
+не вызван perf_monitor.enable(), обёртки только проверяют флаг enabled;
+классы моделей не изменяются, поэтому замеры не затрагивают другие
+зоопарки процесса (тесты, командную строку).
+
+Для каждого имени хранятся количество вызовов, суммарное и наибольшее время,
+последние SAMPLES длительностей (по ним считаются перцентили) и последние
+медленные вызовы (дольше slow_ms) с описанием аргументов.
+"""
+
+# Импорт необходимых модулей
+import functools  # Сохранение имени обёрнутой функции
+import json  # Модуль для экспорта замеров в JSON
+import logging  # Модуль для логирования событий
+import threading  # Замеры приходят и из рабочих потоков сохранения
+import time  # Модуль для измерения времени
+from collections import deque  # Кольцевые буферы длительностей и медленных вызовов
+
+
+# Вспомогательная функция: краткое описание аргументов медленного вызова
+def _describe(args, kwargs, limit=80):
+    parts = [repr(arg) for arg in args] + [f"{key}={value!r}" for key, value in kwargs.items()]
+    text = ", ".join(parts)
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+# Класс CallStats - статистика вызовов одного имени
+class CallStats:
+    # Количество последних длительностей для перцентилей
+    SAMPLES = 2048
+    # Количество хранимых медленных вызовов
+    SLOW_SAMPLES = 20
+
+    # Конструктор класса CallStats
+    def __init__(self, name):
+        self.name = name  # Имя замеряемой функции
+        self.count = 0  # Количество вызовов
+        self.total_ns = 0  # Суммарное время в наносекундах
+        self.max_ns = 0  # Наибольшее время в наносекундах
+        self.recent = deque(maxlen=self.SAMPLES)  # Последние длительности в наносекундах
+        self.slow = deque(maxlen=self.SLOW_SAMPLES)  # Последние медленные вызовы (время, мс, аргументы)
+
+    # Метод для учёта одного вызова
+    def add(self, duration_ns):
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self.recent.append(duration_ns)
+
+    # Метод для получения перцентилей последних вызовов в миллисекундах (перцентиль -> мс)
+    def percentiles(self, points=(50, 90, 99)):
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {point: 0.0 for point in points}
+        last = len(ordered) - 1
+        return {point: ordered[min(last, round(last * point / 100))] / 1e6 for point in points}
+
+    # Среднее время вызова в миллисекундах
+    @property
+    def mean_ms(self):
+        return self.total_ns / self.count / 1e6 if self.count else 0.0
+
+    # Метод для получения статистики словарём (для окна и экспорта)
+    def as_dict(self):
+        percentiles = self.percentiles()
+        return {
+            "name": self.name,
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.mean_ms,
+            "p50_ms": percentiles[50],
+            "p90_ms": percentiles[90],
+            "p99_ms": percentiles[99],
+            "max_ms": self.max_ns / 1e6,
+            "slow": [{"time": started, "ms": ms, "args": args} for started, ms, args in self.slow],
+        }
+
+
+# Класс PerfMonitor - необязательные замеры времени вызовов
+class PerfMonitor:
+    """
+    timed(имя) - декоратор для обработчиков окна; wrap(имя, функция) -
+    то же без декоратора. Вызовы дольше slow_ms сохраняются с аргументами.
+    """
+
+    # Конструктор класса PerfMonitor
+    def __init__(self, slow_ms=50.0):
+        self.slow_ms = slow_ms  # Порог медленного вызова в миллисекундах
+        self.enabled = False  # Признак включённых замеров
+        self.started = None  # Время включения замеров (time.time())
+        self._stats = {}  # Имя -> CallStats
+        self._lock = threading.Lock()  # Защита статистики от одновременной записи из потоков
+
+    # Метод для учёта вызова (duration_ns - длительность, args и kwargs - для медленных вызовов)
+    def record(self, name, duration_ns, args=(), kwargs=None):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = CallStats(name)
+            stats.add(duration_ns)
+            if duration_ns >= self.slow_ms * 1e6:
+                stats.slow.append((time.time(), duration_ns / 1e6, _describe(args, kwargs or {})))
+
+    # Метод для обёртки функции замером (замер выполняется только при enabled)
+    def wrap(self, name, func):
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def timed_call(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, clock() - started, args, kwargs)
+
+        return timed_call
+
+    # Декоратор для обработчиков окна
+    def timed(self, name):
+        return functools.partial(self.wrap, name)
+
+    # Метод для включения замеров
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.started = time.time()
+        logging.info("Замеры производительности включены")
+
+    # Метод для выключения замеров (статистика сохраняется)
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        logging.info("Замеры производительности выключены")
+
+    # Метод для сброса накопленной статистики
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+        self.started = time.time() if self.enabled else None
+
+    # Метод для получения статистики (список словарей, самые затратные по суммарному времени - первыми)
+    def snapshot(self):
+        with self._lock:
+            rows = [stats.as_dict() for stats in self._stats.values()]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    # Метод для экспорта статистики в файл JSON
+    def export_json(self, filename):
+        report = {
+            "exported": time.time(),
+            "started": self.started,
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms,
+            "calls": self.snapshot(),
+        }
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        logging.info(f"Замеры производительности сохранены в {filename}")
+
+
+# Общий экземпляр замеров программы
+perf_monitor = PerfMonitor()
@@ -0,0 +1,247 @@
+"""
+Моделирование зоопарка на много дней вперёд: старение, кормление смотрителями
+и лечение ветеринарами. Состояние животных (возраст, сытость, болезнь) лежит
+в разделяемой памяти, строки таблицы делятся на блоки постоянного размера,
+и блоки шагают параллельно в пуле процессов. У каждого блока свой генератор
+случайных чисел, зависящий только от seed и номера блока, а события блоков
+сливаются по (день, строка), поэтому результат прогона не зависит от
+количества процессов. Зоопарк при моделировании не изменяется.
+"""
+
+# Импорт необходимых модулей
+import heapq  # Слияние упорядоченных событий блоков
+import logging  # Модуль для логирования событий
+import os  # Количество процессоров
+import random  # Генераторы случайных чисел блоков
+import time  # Модуль для измерения скорости моделирования
+from array import array  # Копии итогового состояния
+from concurrent.futures import ProcessPoolExecutor  # Пул процессов
+from multiprocessing import shared_memory  # Разделяемая память для состояния животных
+
+from zoo_models import AnimalTable, ZooKeeper, Veterinarian
+
+# События моделирования
+SICK = "sick"  # Животное заболело
+HEALED = "healed"  # Ветеринар вылечил животное
+HUNGRY = "hungry"  # Сытость упала ниже порога (пропущены кормления)
+
+
+# Вспомогательная функция: столбцы состояния в разделяемой памяти (возраст, сытость, болезнь, тип)
+def _columns(buffer, rows):
+    ages = buffer[0:rows * 8].cast('d')
+    satiety = buffer[rows * 8:rows * 16].cast('d')
+    sick = buffer[rows * 16:rows * 17].cast('b')
+    type_codes = buffer[rows * 17:rows * 18].cast('b')
+    return ages, satiety, sick, type_codes
+
+
+# Вспомогательная функция: копия столбца разделяемой памяти в массив того же типа
+def _copy(column):
+    copied = array(column.format)
+    copied.frombytes(column.cast('B'))
+    return copied
+
+
+# Функция для шага одного блока строк на days дней (выполняется в процессе пула)
+def step_block(shm_name, rows, block, start, end, days, seed, params):
+    """
+    Моделирует строки start..end-1 и записывает их состояние обратно
+    в разделяемую память. Возвращает (номер блока, события), где события -
+    список (день, строка, событие) в порядке дней и строк.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ages, satiety, sick, type_codes = _columns(shm.buf, rows)
+    try:
+        rng = random.Random(seed * 1000003 + block)  # Генератор зависит только от seed и блока
+        chance = rng.random
+        hunger = params["hunger"]
+        feedings = params["feedings"]
+        feed_probability = params["feed_probability"]
+        hungry_level = params["hungry_level"]
+        sick_chance = params["sick_chance"]
+        heal_chance = params["heal_chance"]
+        age_per_day = params["age_per_day"]
+        treatments = params["treatments_per_row"] * (end - start)  # Доля блока в работе ветеринаров
+        events = []
+        for day in range(days):
+            budget = treatments + chance()  # Дробная часть осмотров разыгрывается
+            for row in range(start, end):
+                code = type_codes[row]
+                if code < 0:
+                    continue  # Свободная строка
+                ages[row] += age_per_day
+                # Кормления: при нехватке смотрителей часть кормлений пропускается
+                rate = hunger[code]
+                fed = feedings if feed_probability >= 1.0 else sum(
+                    chance() < feed_probability for _ in range(feedings))
+                before = satiety[row]
+                level = min(1.0, max(0.0, before - rate + rate * fed / feedings))
+                satiety[row] = level
+                if level < hungry_level <= before:
+                    events.append((day, row, HUNGRY))
+                if sick[row]:
+                    # Лечение, пока у ветеринаров блока есть время
+                    if budget >= 1.0:
+                        budget -= 1.0
+                        if chance() < heal_chance:
+                            sick[row] = 0
+                            events.append((day, row, HEALED))
+                # Болезнь: старые и голодные животные болеют чаще
+                elif chance() < sick_chance * (1.0 + ages[row] / 120.0) * (2.0 if level < hungry_level else 1.0):
+                    sick[row] = 1
+                    events.append((day, row, SICK))
+        return block, events
+    finally:
+        for column in (ages, satiety, sick, type_codes):
+            column.release()
+        del ages, satiety, sick, type_codes
+        shm.close()
+
+
+# Класс SimulationResult - итоги прогона
+class SimulationResult:
+    # Конструктор класса SimulationResult
+    def __init__(self, days, seed, events, ages, satiety, sick, seconds, animals):
+        self.days = days  # Количество смоделированных дней
+        self.seed = seed  # Зерно генератора
+        self.events = events  # Список (день, ID животного, событие) в порядке дней и ID строк
+        self.ages = ages  # Итоговые возрасты по строкам таблицы (array 'd')
+        self.satiety = satiety  # Итоговая сытость по строкам таблицы (array 'd')
+        self.sick = sick  # Итоговые признаки болезни по строкам таблицы (array 'b')
+        self.seconds = seconds  # Время прогона в секундах
+        self.animals = animals  # Количество животных
+
+    # Количество событий каждого вида
+    def counts(self):
+        result = {SICK: 0, HEALED: 0, HUNGRY: 0}
+        for _, _, event in self.events:
+            result[event] += 1
+        return result
+
+    # Скорость моделирования в животных-днях в секунду
+    @property
+    def animal_days_per_second(self):
+        return self.animals * self.days / self.seconds if self.seconds else 0.0
+
+    # Метод для получения итогов одной строкой
+    def summary(self):
+        counts = self.counts()
+        return (f"дней {self.days}, животных {self.animals}, заболело {counts[SICK]}, вылечено {counts[HEALED]}, "
+                f"голодали {counts[HUNGRY]}, болеют в конце {sum(self.sick)}, "
+                f"{self.animal_days_per_second:.0f} животных-дней/с")
+
+
+# Класс SimulationEngine - параллельный прогон сценариев на пуле процессов
+class SimulationEngine:
+    """
+    Используется как контекстный менеджер, чтобы пул процессов создавался один
+    раз на несколько прогонов:
+
+        with SimulationEngine(zoo, workers=4) as engine:
+            base = engine.run(90, seed=1)
+            short = engine.run(90, seed=1, scenario={"keepers": 2})
+
+    Сценарий заменяет параметры из DEFAULTS; keepers и vets по умолчанию равны
+    числу смотрителей и ветеринаров зоопарка. workers=1 - прогон без пула.
+    """
+
+    # Строк таблицы в блоке (постоянный размер блока делает результат независимым от числа процессов)
+    BLOCK_ROWS = 4096
+    # Параметры моделирования по умолчанию
+    DEFAULTS = {
+        "feedings": 3,  # Кормлений в день
+        "feedings_per_keeper": 360,  # Кормлений, которые смотритель успевает за день
+        "treatments_per_vet": 72,  # Осмотров, которые ветеринар успевает за день
+        "hunger": {"Bird": 0.5, "Mammal": 0.4, "Reptile": 0.15},  # Расход сытости за день по виду
+        "default_hunger": 0.4,  # Расход сытости других видов
+        "hungry_level": 0.3,  # Порог голода
+        "sick_chance": 0.001,  # Вероятность заболеть за день (молодое сытое животное)
+        "heal_chance": 0.5,  # Вероятность вылечить животное за осмотр
+        "age_per_day": 12 / 365.25,  # Прирост возраста в месяцах за день
+    }
+
+    # Конструктор класса SimulationEngine
+    def __init__(self, zoo, workers=None, block_rows=BLOCK_ROWS):
+        self.zoo = zoo  # Моделируемый зоопарк (не изменяется)
+        self.workers = workers or os.cpu_count() or 1  # Количество процессов
+        self.block_rows = block_rows  # Строк в блоке
+        self._executor = None  # Пул процессов (создаётся при первом прогоне)
+
+    # Вход в контекстный менеджер
+    def __enter__(self):
+        return self
+
+    # Выход из контекстного менеджера (пул процессов закрывается)
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Метод для закрытия пула процессов
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    # Вспомогательный метод: параметры прогона с учётом сценария
+    def _params(self, scenario, rows, animals):
+        params = dict(self.DEFAULTS)
+        params.update(scenario or {})
+        staff_counts = self.zoo.staff.count_by_class()
+        keepers = params.get("keepers", staff_counts.get(ZooKeeper.__name__, 0))
+        vets = params.get("vets", staff_counts.get(Veterinarian.__name__, 0))
+        # Доля кормлений, на которые хватает смотрителей, и осмотров на одну строку таблицы
+        needed = animals * params["feedings"]
+        params["feed_probability"] = min(1.0, keepers * params["feedings_per_keeper"] / needed) if needed else 1.0
+        params["treatments_per_row"] = vets * params["treatments_per_vet"] / rows if rows else 0.0
+        # Расход сытости по коду типа таблицы
+        params["hunger"] = [params["hunger"].get(animal_class.__name__, params["default_hunger"])
+                            for animal_class in AnimalTable._classes]
+        return params
+
+    # Метод для прогона на days дней
+    def run(self, days, seed=0, scenario=None):
+        started = time.perf_counter()
+        table = self.zoo.animals.table
+        rows = len(table.ids)
+        animals = len(table)
+        params = self._params(scenario, rows, animals)
+        # Состояние в разделяемой памяти: возраст, сытость, болезнь, тип
+        shm = shared_memory.SharedMemory(create=True, size=max(1, rows * 18))
+        try:
+            columns = _columns(shm.buf, rows)
+            try:
+                ages, satiety, sick, type_codes = columns
+                ages[:] = memoryview(table.ages).cast('B').cast('d')
+                satiety[:] = array('d', [1.0]) * rows
+                sick[:] = array('b', bytes(rows))
+                type_codes[:] = memoryview(table.type_codes).cast('B').cast('b')
+                blocks = [(block, start, min(start + self.block_rows, rows))
+                          for block, start in enumerate(range(0, rows, self.block_rows))]
+                arguments = [(shm.name, rows, block, start, end, days, seed, params)
+                             for block, start, end in blocks]
+                if self.workers == 1 or len(blocks) < 2:
+                    outputs = [step_block(*args) for args in arguments]
+                else:
+                    if self._executor is None:
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    outputs = list(self._executor.map(step_block, *zip(*arguments)))
+                # Копии итогового состояния (разделяемая память освобождается)
+                state = [_copy(column) for column in (ages, satiety, sick)]
+            finally:
+                # Освобождённые столбцы не удерживают буфер, поэтому удаляется только кортеж
+                for column in columns:
+                    column.release()
+                del columns
+        finally:
+            shm.close()
+            shm.unlink()
+        # Слияние событий блоков по (день, строка) и перевод строк в ID животных
+        outputs.sort(key=lambda output: output[0])
+        ids = table.ids
+        events = [(day, ids[row], event) for day, row, event in heapq.merge(*(output[1] for output in outputs))]
+        result = SimulationResult(days, seed, events, *state, time.perf_counter() - started, animals)
+        logging.info(f"Моделирование: {result.summary()}")
+        return result
+
+    # Метод для прогона нескольких сценариев (имя -> параметры) с одним зерном
+    def run_scenarios(self, days, scenarios, seed=0):
+        return {name: self.run(days, seed, scenario) for name, scenario in scenarios.items()}